@@ -318,6 +318,7 @@ sudo LANG=C DEBIAN_FRONTEND=noninteractive chroot $FILESYSTEM_ROOT apt-get -y in
     pciutils                \
     iptables-persistent     \
     ebtables                \
+    ipset                   \
     logrotate               \
     curl                    \
     kexec-tools             \
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Offline scale benchmark for bgpcfgd.
+
+The benchmark feeds a synthetic stream of CONFIG_DB events (BGP neighbors, vrfs, allow-lists, static routes)
+through the real bgpcfgd Runner and managers. swsscommon is replaced by fake_swsscommon and vtysh is replaced
+by fake_vtysh, which records received commands and simulates vtysh latency.
+No redis or FRR is required. Run it from src/sonic-bgpcfgd:
+
+    python3 benchmark/bgpcfgd_scale.py --neighbors 1000 --vrfs 10 --allow-lists 10 --static-routes 1000
+
+Static route programming throughput:
+
+    python3 benchmark/bgpcfgd_scale.py --neighbors 0 --vrfs 4 --static-routes 100000 --batch-size 1000
+"""
+import argparse
+import ipaddress
+import json
+import os
+import resource
+import sys
+import time
+import types
+
+import yaml
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BGPCFGD_DIR = os.path.dirname(BENCHMARK_DIR)
+REPO_DIR = os.path.abspath(os.path.join(BGPCFGD_DIR, '..', '..'))
+CONSTANTS_PATH = os.path.join(REPO_DIR, 'files', 'image_config', 'constants', 'constants.yml')
+TEMPLATE_PATH = os.path.join(REPO_DIR, 'dockers', 'docker-fpm-frr', 'frr')
+
+sys.path.insert(0, BGPCFGD_DIR)
+
+import fake_swsscommon
+from fake_vtysh import FakeVtysh
+
+
+def install_fake_swsscommon():
+    """ Make 'from swsscommon import swsscommon' return fake_swsscommon """
+    package = types.ModuleType('swsscommon')
+    package.swsscommon = fake_swsscommon
+    sys.modules['swsscommon'] = package
+    sys.modules['swsscommon.swsscommon'] = fake_swsscommon
+
+
+def load_constants():
+    with open(CONSTANTS_PATH) as fp:
+        return yaml.safe_load(fp)['constants']
+
+
+def generate_events(args):
+    """
+    Generate synthetic CONFIG_DB events
+    :param args: parsed command line arguments
+    :return: list of tuples (db_name, table_name, key, op, data)
+    """
+    events = [
+        ("CONFIG_DB", "DEVICE_METADATA", "localhost", "SET", {
+            "bgp_asn": "65100", "hostname": "sonic", "type": "LeafRouter", "docker_routing_config_mode": "separated",
+        }),
+        ("CONFIG_DB", "LOOPBACK_INTERFACE", "Loopback0", "SET", {}),
+        ("CONFIG_DB", "LOOPBACK_INTERFACE", "Loopback0|10.1.0.32/32", "SET", {}),
+        ("CONFIG_DB", "LOOPBACK_INTERFACE", "Loopback0|fc00:1::32/128", "SET", {}),
+    ]
+    vrfs = ["Vrf%d" % i for i in range(args.vrfs)]
+    base = ipaddress.IPv4Address("10.0.0.0")
+    for i in range(args.neighbors):
+        local_addr = base + 2 * i
+        intf = "Ethernet%d" % i
+        intf_data = {"vrf_name": vrfs[i % len(vrfs)]} if vrfs else {}
+        events.append(("CONFIG_DB", "INTERFACE", intf, "SET", intf_data))
+        events.append(("CONFIG_DB", "INTERFACE", "%s|%s/31" % (intf, local_addr), "SET", {}))
+    for i in range(args.neighbors):
+        local_addr = base + 2 * i
+        peer_addr = local_addr + 1
+        key = "%s|%s" % (vrfs[i % len(vrfs)], peer_addr) if vrfs else str(peer_addr)
+        events.append(("CONFIG_DB", "BGP_NEIGHBOR", key, "SET", {
+            "asn": str(64600 + i % 100),
+            "name": "ARISTA%04dT1" % i,
+            "local_addr": str(local_addr),
+            "holdtime": "10",
+            "keepalive": "3",
+            "admin_status": "up",
+        }))
+    allow_lists = {}
+    for i in range(args.allow_lists):
+        allow_lists[i] = ["%s/32" % (ipaddress.IPv4Address("100.0.0.0") + (i * args.prefixes_per_list + j))
+                          for j in range(args.prefixes_per_list)]
+        events.append(("CONFIG_DB", "BGP_ALLOWED_PREFIXES", "DEPLOYMENT_ID|0|1010:%d" % i, "SET", {
+            "prefixes_v4": ",".join(allow_lists[i]),
+        }))
+    for edit in range(args.allow_list_edits):
+        for i, prefixes in allow_lists.items():
+            # replace one prefix of the allow-list with a new one
+            prefixes[edit % len(prefixes)] = "%s/32" % (ipaddress.IPv4Address("101.0.0.0") + edit)
+            events.append(("CONFIG_DB", "BGP_ALLOWED_PREFIXES", "DEPLOYMENT_ID|0|1010:%d" % i, "SET", {
+                "prefixes_v4": ",".join(prefixes),
+            }))
+    for i in range(args.static_routes):
+        prefix = "%s/32" % (ipaddress.IPv4Address("192.0.0.0") + i)
+        key = "%s|%s" % (vrfs[i % len(vrfs)], prefix) if vrfs else prefix
+        events.append(("CONFIG_DB", "STATIC_ROUTE", key, "SET", {"nexthop": "10.0.0.1"}))
+    return events
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_swsscommon()
+    import bgpcfgd.frr
+    import bgpcfgd.managers_bgp
+    import bgpcfgd.runner
+    from bgpcfgd.config import ConfigMgr
+    from bgpcfgd.directory import Directory
+    from bgpcfgd.main import create_managers
+    from bgpcfgd.stats import g_stats
+    from bgpcfgd.template import TemplateFabric
+
+    vtysh = FakeVtysh(fork_latency=args.fork_latency_ms / 1000.0, line_latency=args.line_latency_us / 1000000.0)
+    bgpcfgd.frr.run_command = vtysh.run_command
+    bgpcfgd.managers_bgp.run_command = vtysh.run_command
+    if args.stats:
+        g_stats.enable()
+
+    # vty sockets are not simulated, so FRR talks to the fake vtysh only
+    frr = bgpcfgd.frr.FRR(["bgpd", "zebra", "staticd"], vty_dir=os.path.join(BENCHMARK_DIR, "no-vty"))
+    common_objs = {
+        'directory': Directory(),
+        'cfg_mgr':   ConfigMgr(frr),
+        'tf':        TemplateFabric(TEMPLATE_PATH),
+        'constants': load_constants(),
+    }
+    runner = bgpcfgd.runner.Runner(common_objs['cfg_mgr'])
+    for mgr in create_managers(common_objs):
+        runner.add_manager(mgr)
+
+    events = generate_events(args)
+    fake_swsscommon.g_event_source.load(events, args.batch_size)
+
+    def stop():
+        bgpcfgd.runner.g_run = False
+    fake_swsscommon.g_event_source.on_exhausted = stop
+
+    forks_before = vtysh.forks
+    start = time.time()
+    runner.run()
+    elapsed = time.time() - start
+
+    report = {
+        'events': len(events),
+        'seconds': round(elapsed, 3),
+        'events_per_second': round(len(events) / elapsed, 1) if elapsed else 0.0,
+        'commits': vtysh.writes,
+        'vtysh_calls': vtysh.forks - forks_before,
+        'bytes_pushed': vtysh.bytes_pushed,
+        'lines_pushed': vtysh.lines_pushed,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    if args.stats:
+        report['stats'] = g_stats.to_entries()
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="bgpcfgd offline scale benchmark")
+    parser.add_argument("--neighbors", type=int, default=1000, help="number of BGP_NEIGHBOR entries")
+    parser.add_argument("--vrfs", type=int, default=0, help="number of vrfs to spread the neighbors and routes")
+    parser.add_argument("--allow-lists", type=int, default=0, help="number of BGP_ALLOWED_PREFIXES entries")
+    parser.add_argument("--prefixes-per-list", type=int, default=10, help="number of prefixes in an allow-list")
+    parser.add_argument("--allow-list-edits", type=int, default=0, help="number of one-prefix edits of every allow-list")
+    parser.add_argument("--static-routes", type=int, default=0, help="number of STATIC_ROUTE entries")
+    parser.add_argument("--batch-size", type=int, default=100, help="number of events delivered at once")
+    parser.add_argument("--fork-latency-ms", type=float, default=5.0, help="simulated latency of a vtysh call")
+    parser.add_argument("--line-latency-us", type=float, default=10.0, help="simulated latency of a config line")
+    parser.add_argument("--stats", action="store_true", help="collect and report bgpcfgd performance counters")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
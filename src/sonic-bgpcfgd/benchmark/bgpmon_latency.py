@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the bgpmon neighbor state detection latency.
+
+A scripted fake FRR changes states of BGP neighbors in several vrfs. Transitions to and from Established are
+logged into a temporary frr.log as %ADJCHANGE messages, the same way as FRR does. Other transitions
+(for example Active <-> Connect) are not logged and can be found only by the periodic request.
+swsssdk is replaced by an in-memory STATE_DB, and 'vtysh -c show bgp vrf all summary json' is answered
+from the fake FRR state. The benchmark reports the delay between a state change and the moment
+when the new state is written into NEIGH_STATE_TABLE. Run it from src/sonic-bgpcfgd:
+
+    python3 benchmark/bgpmon_latency.py --neighbors 500 --vrfs 4 --changes 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import types
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+
+class FakeStateDb(object):
+    """ In-memory STATE_DB, which remembers when every entry was written """
+    def __init__(self):
+        self.entries = {}
+        self.history = {}  # key -> list of (write time, state)
+        self.writes = 0
+        self.lock = threading.Lock()
+
+    def hmset(self, key, value):
+        with self.lock:
+            self.entries[key] = dict(value)
+            self.history.setdefault(key, []).append((time.time(), value.get('state')))
+            self.writes += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.history.setdefault(key, []).append((time.time(), None))
+            self.writes += 1
+
+
+class FakePipeline(object):
+    def __init__(self, db):
+        self.db = db
+        self.ops = []
+
+    def hmset(self, key, value):
+        self.ops.append((self.db.hmset, key, value))
+
+    def delete(self, key):
+        self.ops.append((self.db.delete, key))
+
+    def execute(self):
+        for op in self.ops:
+            op[0](*op[1:])
+        self.ops = []
+
+
+def install_fake_swsssdk(db, namespace_dbs=None):
+    """
+    Make 'import swsssdk' return a module with SonicV2Connector working on the in-memory db
+    :param db: FakeStateDb of the default namespace
+    :param namespace_dbs: dictionary namespace -> FakeStateDb of the namespace
+    """
+    class SonicV2Connector(object):
+        STATE_DB = "STATE_DB"
+
+        def __init__(self, namespace=None):
+            self.db = namespace_dbs[namespace] if namespace else db
+
+        def connect(self, db_name, retry_on=True):
+            pass
+
+        def get_redis_client(self, db_name):
+            return types.SimpleNamespace(pipeline=lambda: FakePipeline(self.db))
+
+        def delete_all_by_pattern(self, db_name, pattern):
+            pass
+    module = types.ModuleType('swsssdk')
+    module.SonicV2Connector = SonicV2Connector
+    sys.modules['swsssdk'] = module
+
+
+class FakeFrr(object):
+    """ Scripted FRR: keeps neighbor states, logs adjacency changes and answers the summary request """
+    def __init__(self, log_path, neighbors, vrfs, vtysh_latency):
+        self.log_path = log_path
+        self.vtysh_latency = vtysh_latency
+        self.vtysh_calls = 0
+        self.lock = threading.Lock()
+        self.states = {}  # (vrf, neighbor) -> state
+        for i in range(neighbors):
+            vrf = "default" if i % vrfs == 0 else "Vrf%d" % (i % vrfs)
+            # every fifth neighbor is not connected
+            state = "Active" if i % 5 == 4 else "Established"
+            self.states[(vrf, "10.%d.%d.%d" % (i // 65536, (i // 256) % 256, i % 256))] = state
+        open(self.log_path, "w").close()
+
+    def summary(self):
+        """ Output of 'show bgp vrf all summary json' """
+        result = {}
+        with self.lock:
+            for (vrf, neighbor), state in self.states.items():
+                af = "ipv6Unicast" if ":" in neighbor else "ipv4Unicast"
+                result.setdefault(vrf, {}).setdefault(af, {"peers": {}})["peers"][neighbor] = {"state": state}
+        return json.dumps(result)
+
+    def getstatusoutput(self, cmd):
+        """ Replacement of subprocess.getstatusoutput() """
+        self.vtysh_calls += 1
+        time.sleep(self.vtysh_latency)
+        if "summary json" in cmd:
+            return 0, self.summary()
+        return 1, "unsupported command"
+
+    def set_state(self, vrf, neighbor, state):
+        """ Change the neighbor state. Transitions to and from Established are logged """
+        with self.lock:
+            old_state = self.states[(vrf, neighbor)]
+            self.states[(vrf, neighbor)] = state
+        if "Established" in (old_state, state):
+            with open(self.log_path, "a") as fp:
+                fp.write("2021/01/01 00:00:00 BGP: %%ADJCHANGE: neighbor %s(Unknown) in vrf %s %s\n"
+                         % (neighbor, vrf, "Up" if state == "Established" else "Down"))
+        return time.time()
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))]
+
+
+def summarize(latencies):
+    return {
+        'count': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'max_ms': round(max(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    db = FakeStateDb()
+    install_fake_swsssdk(db)
+    from bgpmon import bgpmon
+
+    log_dir = tempfile.mkdtemp()
+    frr = FakeFrr(os.path.join(log_dir, "frr.log"), args.neighbors, args.vrfs, args.vtysh_latency_ms / 1000.0)
+    bgpmon.subprocess = types.SimpleNamespace(getstatusoutput=frr.getstatusoutput)
+
+    monitor = bgpmon.BgpMonitor(bgpmon.BgpStateGet(), bgpmon.FrrLogWatcher(frr.log_path))
+    monitor.start()
+    writes_before = db.writes
+
+    rnd = random.Random(args.seed)
+    script = []  # (key, new state, change time, logged)
+    peers = sorted(frr.states.keys())
+
+    def play():
+        for _ in range(args.changes):
+            time.sleep(args.change_interval_ms / 1000.0)
+            if rnd.random() < args.unlogged_ratio:
+                vrf, neighbor = rnd.choice([peer for peer in peers if frr.states[peer] != "Established"])
+                state = "Connect" if frr.states[(vrf, neighbor)] != "Connect" else "Active"
+            else:
+                vrf, neighbor = rnd.choice(peers)
+                state = "Idle" if frr.states[(vrf, neighbor)] == "Established" else "Established"
+            old_state = frr.states[(vrf, neighbor)]
+            key = "NEIGH_STATE_TABLE|%s" % bgpmon.BgpStateGet.peer_name(vrf, neighbor)
+            script.append((key, state, frr.set_state(vrf, neighbor, state), "Established" in (old_state, state)))
+
+    def detected():
+        last_states = dict((key, state) for key, state, _, _ in script)
+        return all(db.entries.get(key, {}).get('state') == state for key, state in last_states.items())
+
+    player = threading.Thread(target=play)
+    player.start()
+    deadline = None
+    while True:
+        time.sleep(bgpmon.LOG_CHECK_INTERVAL)
+        monitor.step()
+        if not player.is_alive():
+            deadline = deadline or time.time() + bgpmon.MAX_POLL_INTERVAL * 2
+            if detected() or time.time() > deadline:
+                break
+    player.join()
+
+    # a change is detected by the first write of the new state after the change,
+    # if it happened before the next change of the same neighbor
+    logged, unlogged, missed = [], [], 0
+    for i, (key, state, changed_at, is_logged) in enumerate(script):
+        next_change_at = next((t for k, _, t, _ in script[i + 1:] if k == key), float('inf'))
+        write_at = next((t for t, s in db.history.get(key, []) if changed_at <= t < next_change_at and s == state), None)
+        if write_at is None:
+            missed += 1
+        else:
+            (logged if is_logged else unlogged).append(write_at - changed_at)
+
+    return {
+        'neighbors': args.neighbors,
+        'changes': args.changes,
+        'logged_changes': summarize(logged),
+        'unlogged_changes': summarize(unlogged),
+        'missed': missed,
+        'vtysh_calls': frr.vtysh_calls,
+        'db_writes': db.writes - writes_before,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="bgpmon neighbor state detection latency benchmark")
+    parser.add_argument("--neighbors", type=int, default=500, help="number of BGP neighbors")
+    parser.add_argument("--vrfs", type=int, default=4, help="number of vrfs including the default vrf")
+    parser.add_argument("--changes", type=int, default=50, help="number of scripted state changes")
+    parser.add_argument("--change-interval-ms", type=float, default=300.0, help="time between two state changes")
+    parser.add_argument("--unlogged-ratio", type=float, default=0.2, help="share of transitions which are not logged")
+    parser.add_argument("--vtysh-latency-ms", type=float, default=20.0, help="simulated latency of a vtysh call")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
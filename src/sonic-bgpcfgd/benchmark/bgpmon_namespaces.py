@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Offline harness for the multi-namespace bgpmon mode.
+
+Every namespace gets a fake FRR endpoint: a json file with the output of 'show bgp vrf all summary json',
+served by a generated shell script, which replaces vtysh and simulates the latency of 'docker exec bgpN vtysh'.
+STATE_DB of every namespace is an in-memory FakeStateDb.
+
+The harness compares one refresh round of all namespaces done one after another with blocking vtysh calls,
+which is what per-namespace bgpmon processes cost in total, with the asyncio mode, where one process requests
+all namespaces concurrently. It also measures how fast a state change in one namespace reaches its STATE_DB
+while all namespaces are monitored. Run it from src/sonic-bgpcfgd:
+
+    python3 benchmark/bgpmon_namespaces.py --namespaces 8 --neighbors 64 --rounds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+
+def create_fake_vtysh(frr_dir, latency):
+    """ Create vtysh replacement, which is called as 'vtysh -n <asic id> -c <cmd>' """
+    path = os.path.join(frr_dir, "vtysh")
+    with open(path, "w") as fp:
+        fp.write("#!/bin/sh\nsleep %f\ncat %s/asic$2.json\n" % (latency, frr_dir))
+    os.chmod(path, 0o755)
+    return path
+
+
+def write_summary(frr_dir, namespace, neighbors, down=()):
+    """ Write the state of the fake FRR of the namespace """
+    peers = {}
+    for i in range(neighbors):
+        peer = "10.0.%d.%d" % (i // 256, i % 256)
+        peers[peer] = {"state": "Idle" if peer in down else "Established"}
+    summary = {"default": {"ipv4Unicast": {"peers": peers}}}
+    path = os.path.join(frr_dir, "%s.json" % namespace)
+    with open(path + ".tmp", "w") as fp:
+        json.dump(summary, fp)
+    os.rename(path + ".tmp", path)
+
+
+def run(args):
+    """ Run the harness and return the report as a dictionary """
+    from bgpmon_latency import FakeStateDb, install_fake_swsssdk
+
+    namespaces = ["asic%d" % i for i in range(args.namespaces)]
+    namespace_dbs = {ns: FakeStateDb() for ns in namespaces}
+    install_fake_swsssdk(FakeStateDb(), namespace_dbs)
+    from bgpmon import bgpmon
+
+    frr_dir = tempfile.mkdtemp()
+    for ns in namespaces:
+        write_summary(frr_dir, ns, args.neighbors)
+    vtysh = [create_fake_vtysh(frr_dir, args.vtysh_latency_ms / 1000.0)]
+
+    # per-namespace monitors: blocking vtysh call of every namespace, one after another
+    sequential = {ns: bgpmon.BgpStateGet(namespace=ns) for ns in namespaces}
+
+    def getstatusoutput(cmd, ns):
+        proc = subprocess.run(vtysh + ["-n", ns[len("asic"):], "-c", bgpmon.SUMMARY_CMD], stdout=subprocess.PIPE)
+        return proc.returncode, proc.stdout.decode()
+
+    start = time.time()
+    for _ in range(args.rounds):
+        for ns, bgp_state_get in sequential.items():
+            bgpmon.subprocess = types.SimpleNamespace(getstatusoutput=lambda cmd, ns=ns: getstatusoutput(cmd, ns))
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+    sequential_round = (time.time() - start) / args.rounds
+
+    # asyncio monitor of all namespaces
+    for db in namespace_dbs.values():
+        db.entries.clear()
+    monitor = bgpmon.AsyncBgpMonitor(namespaces, vtysh=vtysh)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    async def refresh_all():
+        return await asyncio.gather(*[monitor.refresh(ns) for ns in namespaces])
+
+    start = time.time()
+    for _ in range(args.rounds):
+        loop.run_until_complete(refresh_all())
+    async_round = (time.time() - start) / args.rounds
+    populated = all(len(db.entries) == args.neighbors for db in namespace_dbs.values())
+
+    # a neighbor goes down in the last namespace while all namespaces are monitored
+    async def detect():
+        tasks = [asyncio.ensure_future(monitor.monitor_namespace(ns)) for ns in namespaces]
+        await asyncio.sleep(bgpmon.MIN_POLL_INTERVAL)
+        ns, key = namespaces[-1], "NEIGH_STATE_TABLE|10.0.0.1"
+        write_summary(frr_dir, ns, args.neighbors, down=("10.0.0.1",))
+        changed_at = time.time()
+        while namespace_dbs[ns].entries[key]['state'] != "Idle":
+            await asyncio.sleep(0.005)
+        detected_at = time.time()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return detected_at - changed_at
+
+    detection = loop.run_until_complete(detect())
+    loop.close()
+
+    return {
+        'namespaces': args.namespaces,
+        'neighbors_per_namespace': args.neighbors,
+        'processes': {'per_namespace': args.namespaces, 'asyncio': 1},
+        'sequential_round_ms': round(sequential_round * 1000, 1),
+        'asyncio_round_ms': round(async_round * 1000, 1),
+        'speedup': round(sequential_round / async_round, 2) if async_round else 0.0,
+        'all_namespaces_populated': populated,
+        'detection_ms': round(detection * 1000, 1),
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="multi-namespace bgpmon harness")
+    parser.add_argument("--namespaces", type=int, default=8, help="number of namespaces (asics)")
+    parser.add_argument("--neighbors", type=int, default=64, help="number of BGP neighbors in every namespace")
+    parser.add_argument("--rounds", type=int, default=5, help="number of refresh rounds to average")
+    parser.add_argument("--vtysh-latency-ms", type=float, default=50.0, help="simulated latency of a vtysh call")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
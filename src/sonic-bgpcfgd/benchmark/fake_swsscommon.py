@@ -0,0 +1,127 @@
+"""
+Fake swsscommon module for the bgpcfgd offline benchmark.
+It implements the part of swsscommon API which is used by bgpcfgd Runner and managers.
+Events are fed into the subscribers from a scripted EventSource instead of redis.
+"""
+from collections import defaultdict, deque
+
+
+SET_COMMAND = "SET"
+DEL_COMMAND = "DEL"
+
+CFG_DEVICE_METADATA_TABLE_NAME = "DEVICE_METADATA"
+CFG_DEVICE_NEIGHBOR_METADATA_TABLE_NAME = "DEVICE_NEIGHBOR_METADATA"
+CFG_INTF_TABLE_NAME = "INTERFACE"
+CFG_LOOPBACK_INTERFACE_TABLE_NAME = "LOOPBACK_INTERFACE"
+CFG_VLAN_INTF_TABLE_NAME = "VLAN_INTERFACE"
+CFG_LAG_INTF_TABLE_NAME = "PORTCHANNEL_INTERFACE"
+CFG_VOQ_INBAND_INTERFACE_TABLE_NAME = "VOQ_INBAND_INTERFACE"
+CFG_VLAN_SUB_INTF_TABLE_NAME = "VLAN_SUB_INTERFACE"
+CFG_BGP_NEIGHBOR_TABLE_NAME = "BGP_NEIGHBOR"
+CFG_BGP_INTERNAL_NEIGHBOR_TABLE_NAME = "BGP_INTERNAL_NEIGHBOR"
+STATE_INTERFACE_TABLE_NAME = "INTERFACE_TABLE"
+STATE_ADVERTISE_NETWORK_TABLE_NAME = "ADVERTISE_NETWORK_TABLE"
+APP_BGP_PROFILE_TABLE_NAME = "BGP_PROFILE_TABLE"
+
+
+class SonicDBConfig(object):
+    DB_IDS = {
+        "APPL_DB": 0,
+        "CONFIG_DB": 4,
+        "STATE_DB": 6,
+    }
+
+    @staticmethod
+    def getDbId(db_name):
+        return SonicDBConfig.DB_IDS[db_name]
+
+
+class DBConnector(object):
+    def __init__(self, db_name, timeout):
+        self.db_name = db_name
+
+    def getDbId(self):
+        return SonicDBConfig.getDbId(self.db_name)
+
+
+class FieldValuePairs(list):
+    pass
+
+
+class Table(object):
+    """ Table which stores written entries in memory """
+    def __init__(self, conn, table_name):
+        self.conn = conn
+        self.table_name = table_name
+        self.entries = g_event_source.tables[(conn.getDbId(), table_name)]
+
+    def set(self, key, fvs):
+        self.entries[key] = dict(fvs)
+
+
+class SubscriberStateTable(object):
+    """ Subscriber which receives events from the EventSource """
+    def __init__(self, conn, table_name):
+        self.conn = conn
+        self.table_name = table_name
+        self.queue = deque()
+        g_event_source.subscribers[(conn.getDbId(), table_name)] = self
+
+    def getDbConnector(self):
+        return self.conn
+
+    def getTableName(self):
+        return self.table_name
+
+    def pop(self):
+        if not self.queue:
+            return "", "", ()
+        return self.queue.popleft()
+
+
+class Select(object):
+    """ Selector which releases the next batch of scripted events on every call of select() """
+    TIMEOUT = 1
+    ERROR = 2
+    OBJECT = 0
+
+    def addSelectable(self, selectable):
+        pass
+
+    def select(self, timeout):
+        if g_event_source.release():
+            return self.OBJECT, None
+        g_event_source.on_exhausted()
+        return self.TIMEOUT, None
+
+
+class EventSource(object):
+    """ Scripted stream of db events, delivered to the subscribers in batches """
+    def __init__(self):
+        self.batches = deque()
+        self.subscribers = {}
+        self.tables = defaultdict(dict)
+        self.on_exhausted = lambda: None
+
+    def load(self, events, batch_size):
+        """
+        Load events
+        :param events: list of tuples (db_name, table_name, key, op, data)
+        :param batch_size: number of events which are delivered by one select() call
+        """
+        events = list(events)
+        for i in range(0, len(events), batch_size):
+            self.batches.append(events[i:i+batch_size])
+
+    def release(self):
+        """ Put the next batch of events into the subscribers queues. Return False if there are no more events """
+        if not self.batches:
+            return False
+        for db_name, table_name, key, op, data in self.batches.popleft():
+            subscriber = self.subscribers.get((SonicDBConfig.getDbId(db_name), table_name))
+            if subscriber is not None:
+                subscriber.queue.append((key, op, tuple(data.items())))
+        return True
+
+
+g_event_source = EventSource()
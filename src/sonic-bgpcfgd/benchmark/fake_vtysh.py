@@ -0,0 +1,130 @@
+"""
+Fake vtysh for the bgpcfgd offline benchmark.
+FakeVtysh.run_command() replaces bgpcfgd.utils.run_command() for vtysh commands. It records received
+commands, keeps a simplified model of FRR running configuration and simulates latency of vtysh calls.
+"""
+import re
+import time
+from collections import OrderedDict
+
+
+class FakeRunningConfig(object):
+    """ Simplified model of FRR running configuration. Every configuration line is a node of a tree """
+    RE_PREFIX_LIST_SEQ = re.compile(r'^(ip|ipv6) prefix-list (\S+) seq (\d+) ')
+
+    def __init__(self):
+        self.root = OrderedDict()
+        self.prefix_list_seqs = {}  # (family, name, seq) -> prefix-list line
+
+    def apply(self, text):
+        """
+        Apply configuration in the vtysh format
+        :param text: configuration text
+        """
+        stack = [(-1, self.root)]  # stack of (indentation, node)
+        for line in text.split('\n'):
+            s_line = line.strip()
+            if not s_line or s_line.startswith('!') or s_line in ('exit', 'end') or s_line.startswith('exit-'):
+                continue
+            indent = len(line) - len(line.lstrip())
+            while stack[-1][0] >= indent:
+                stack.pop()
+            node = stack[-1][1]
+            if s_line.startswith('no '):
+                self.remove(node, s_line[3:])
+                continue
+            matched = self.RE_PREFIX_LIST_SEQ.match(s_line)
+            if matched:
+                node.pop(self.prefix_list_seqs.get(matched.groups()), None)  # the same seq replaces the entry
+                self.prefix_list_seqs[matched.groups()] = s_line
+            stack.append((indent, node.setdefault(s_line, OrderedDict())))
+
+    def remove(self, node, line):
+        """
+        Remove all lines, which start with line, from the node and its children
+        :param node: configuration node
+        :param line: line to remove
+        """
+        if line in node:
+            del node[line]
+            return
+        for key in list(node.keys()):
+            if key == line or key.startswith(line + ' '):
+                del node[key]
+            else:
+                self.remove(node[key], line)
+
+    def render(self):
+        """ Return the configuration in FRR running configuration format """
+        lines = ["Building configuration...", "", "Current configuration:", "!"]
+        for key, children in self.root.items():
+            lines.append(key)
+            self.render_node(children, 1, lines)
+            lines.append("!")
+        lines.append("end")
+        return "\n".join(lines) + "\n"
+
+    def render_node(self, node, depth, lines):
+        for key, children in node.items():
+            lines.append(" " * depth + key)
+            self.render_node(children, depth + 1, lines)
+            if key.startswith("address-family "):
+                lines.append(" " * depth + "exit-address-family")
+
+
+class FakeVtysh(object):
+    """ vtysh stand-in which records commands and simulates latency """
+    def __init__(self, daemons=("zebra", "bgpd", "staticd"), fork_latency=0.005, line_latency=0.00001):
+        """
+        Initialize the object
+        :param daemons: daemons which are reported by 'show daemons'
+        :param fork_latency: latency of every vtysh call in seconds
+        :param line_latency: latency of applying one configuration line in seconds
+        """
+        self.daemons = daemons
+        self.fork_latency = fork_latency
+        self.line_latency = line_latency
+        self.config = FakeRunningConfig()
+        self.commands = []
+        self.forks = 0
+        self.writes = 0
+        self.bytes_pushed = 0
+        self.lines_pushed = 0
+
+    def run_command(self, command, shell=False, hide_errors=False):
+        """ Replacement of bgpcfgd.utils.run_command() """
+        self.forks += 1
+        self.commands.append(command)
+        if self.fork_latency:
+            time.sleep(self.fork_latency)
+        if command[:2] == ["vtysh", "-f"]:
+            with open(command[2]) as fp:
+                text = fp.read()
+            return self.write(text)
+        if command[:2] == ["vtysh", "-c"]:
+            return self.execute(command[2])
+        return 1, "", "FakeVtysh: unsupported command: %s" % str(command)
+
+    def write(self, text):
+        """ Apply configuration file """
+        lines = [line for line in text.split('\n') if line.strip() and not line.strip().startswith('!')]
+        self.writes += 1
+        self.bytes_pushed += len(text)
+        self.lines_pushed += len(lines)
+        if self.line_latency:
+            time.sleep(self.line_latency * len(lines))
+        self.config.apply(text)
+        return 0, "", ""
+
+    def execute(self, cmd):
+        """ Execute a vtysh -c command """
+        if cmd == "show daemons":
+            return 0, " " + " ".join(self.daemons), ""
+        if cmd.startswith("show running-config"):
+            return 0, self.config.render(), ""
+        if cmd.startswith("clear bgp "):
+            return 0, "", ""
+        if cmd.startswith("show "):
+            return 0, "{}", ""
+        self.config.apply(cmd)
+        return 0, "", ""
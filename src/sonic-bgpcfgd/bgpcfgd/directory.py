@@ -6,9 +6,14 @@ from .log import log_err
 class Directory(object):
     """ This class stores values and notifies callbacks which were registered to be executed as soon
         as some value is changed. This class works as DB cache mostly """
+    WILDCARD = '*'  # path item which matches any key
+
     def __init__(self):
         self.data = defaultdict(dict)  # storage. A key is a slot name, a value is a dictionary with data
         self.notify = defaultdict(lambda: defaultdict(list))  # registered callbacks: slot -> path -> handlers[]
+        self.index = defaultdict(lambda: defaultdict(list))  # subscribed paths: slot -> first path item -> paths[]
+        self.order = defaultdict(dict)  # subscription order of paths: slot -> path -> position
+        self.ready = defaultdict(dict)  # subscribed paths which exist in the storage: slot -> path -> position
 
     @staticmethod
     def get_slot_name(db, table):
@@ -31,8 +36,26 @@ class Directory(object):
             return False, None
         elif path == '':
             return True, self.data[slot]
-        d = self.data[slot]
-        for p in path.split("/"):
+        return self.items_traverse(self.data[slot], path.split("/"))
+
+    @classmethod
+    def items_traverse(cls, d, items):
+        """
+        Traverse a dictionary through a list of keys.
+        The WILDCARD item matches any key which value contains the rest of the items.
+        Example:
+            Directory.items_traverse({ "a": { "b": 1 }, "c": { "d": 2 } }, ["*", "d"]) will return True, 2
+        :param d: dictionary to traverse
+        :param items: list of keys
+        :return: a pair: True if the path was found, object if it was found
+        """
+        for i, p in enumerate(items):
+            if p == cls.WILDCARD and isinstance(d, dict):
+                for value in d.values():
+                    found, obj = cls.items_traverse(value, items[i+1:])
+                    if found:
+                        return True, obj
+                return False, None
             if p not in d:
                 return False, None
             d = d[p]
@@ -72,11 +95,29 @@ class Directory(object):
         slot = self.get_slot_name(db, table)
         self.data[slot][key] = value
         if slot in self.notify:
-            for path in self.notify[slot].keys():
-                if self.path_exist(db, table, path):
+            self.update_ready(slot, key)
+            ready = self.ready[slot]
+            for path in sorted(ready, key=ready.get):  # keep the subscription order
+                if path in ready:  # a handler could remove the path
                     for handler in self.notify[slot][path]:
                         handler()
 
+    def update_ready(self, slot, key):
+        """
+        Refresh the existence of subscribed paths which could be affected by a change of the key.
+        Only paths which start with the key, the slot itself, and wildcard paths are checked
+        :param slot: storage key
+        :param key: changed key
+        """
+        index = self.index[slot]
+        ready = self.ready[slot]
+        for head in (key, '', self.WILDCARD):
+            for path in index.get(head, []):
+                if self.path_traverse(slot, path)[0]:
+                    ready[path] = self.order[slot][path]
+                else:
+                    ready.pop(path, None)
+
     def get(self, db, table, key):
         """
         Get a value from the storage
@@ -109,6 +150,8 @@ class Directory(object):
         if slot in self.data:
             if key in self.data[slot]:
                 del self.data[slot][key]
+                if slot in self.notify:
+                    self.update_ready(slot, key)
             else:
                 log_err("Directory: Can't remove key '%s' from slot '%s'. The key doesn't exist" % (key, slot))
         else:
@@ -123,6 +166,7 @@ class Directory(object):
         slot = self.get_slot_name(db, table)
         if slot in self.data:
             del self.data[slot]
+            self.ready.pop(slot, None)
         else:
             log_err("Directory: Can't remove slot '%s'. The slot doesn't exist" % slot)
 
@@ -156,4 +200,9 @@ class Directory(object):
         """
         for db, table, path in deps:
             slot = self.get_slot_name(db, table)
-            self.notify[slot][path].append(handler)
\ No newline at end of file
+            if path not in self.order[slot]:
+                self.order[slot][path] = len(self.order[slot])
+                self.index[slot][path.split("/")[0]].append(path)
+                if self.path_traverse(slot, path)[0]:
+                    self.ready[slot][path] = self.order[slot][path]
+            self.notify[slot][path].append(handler)
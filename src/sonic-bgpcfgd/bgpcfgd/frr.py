@@ -4,14 +4,30 @@ import time
 import tempfile
 
 from bgpcfgd.log import log_err, log_info, log_warn, log_crit
+from .stats import g_stats
 from .vars import g_debug
 from .utils import run_command
+from .vty import VtyClient
 
 
 class FRR(object):
     """Proxy object with FRR"""
-    def __init__(self, daemons):
+    VTY_DIR = "/var/run/frr"
+    WAIT_MIN_DELAY = 0.01  # first delay between two readiness probes, seconds
+    WAIT_MAX_DELAY = 1.0
+
+    def __init__(self, daemons, vty_dir=VTY_DIR):
+        """
+        Initialize the object
+        :param daemons: list of FRR daemons to work with
+        :param vty_dir: directory with vty unix sockets of FRR daemons
+        """
         self.daemons = daemons
+        self.vty_dir = vty_dir
+
+    def vty_path(self, daemon):
+        """ Return path to the vty unix socket of the daemon """
+        return os.path.join(self.vty_dir, "%s.vty" % daemon)
 
     def wait_for_daemons(self, seconds):
         """
@@ -20,19 +36,62 @@ class FRR(object):
         """
         stop_time = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
         log_info("Start waiting for FRR daemons: %s" % str(datetime.datetime.now()))
+        delay = self.WAIT_MIN_DELAY
         while datetime.datetime.now() < stop_time:
-            ret_code, out, err = run_command(["vtysh", "-c", "show daemons"], hide_errors=True)
-            if ret_code == 0 and all(daemon in out for daemon in self.daemons):
+            if self.daemons_ready():
                 log_info("All required daemons have connected to vtysh: %s" % str(datetime.datetime.now()))
                 return
-            else:
-                log_warn("Can't read daemon status from FRR: %s" % str(err))
-            time.sleep(0.1)  # sleep 100 ms
+            time.sleep(delay)
+            delay = min(delay * 2, self.WAIT_MAX_DELAY)
         raise RuntimeError("FRR daemons hasn't been started in %d seconds" % seconds)
 
+    def daemons_ready(self):
+        """
+        Check that all daemons accept connections on their vty sockets.
+        When the vty socket directory doesn't exist, the daemons are asked through vtysh
+        :return: True if all daemons are ready
+        """
+        if os.path.isdir(self.vty_dir):
+            g_stats.inc("FRR", "vty_probes")
+            return all(VtyClient.probe(self.vty_path(daemon)) for daemon in self.daemons)
+        g_stats.inc("FRR", "forks")
+        ret_code, out, err = run_command(["vtysh", "-c", "show daemons"], hide_errors=True)
+        if ret_code == 0 and all(daemon in out for daemon in self.daemons):
+            return True
+        log_warn("Can't read daemon status from FRR: %s" % str(err))
+        return False
+
+    def execute_batch(self, daemon, commands):
+        """
+        Execute commands in the daemon using one vty session
+        :param daemon: name of the daemon
+        :param commands: list of commands to execute
+        :return: list of tuples (rc, out, err) for every command, or None if the daemon vty socket isn't available
+        """
+        try:
+            client = VtyClient(self.vty_path(daemon))
+            client.connect()
+        except OSError:
+            return None
+        results = []
+        g_stats.inc("FRR", "vty_sessions")
+        with g_stats.timer("FRR", "vty_batch"):
+            try:
+                client.execute("enable")
+                for command in commands:
+                    rc, out = client.execute(command)
+                    results.append((rc, out, ""))
+            except OSError as exc:
+                results.extend((1, "", str(exc)) for _ in commands[len(results):])
+            finally:
+                client.close()
+        return results
+
     @staticmethod
     def get_config():
-        ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
+        g_stats.inc("FRR", "forks")
+        with g_stats.timer("FRR", "get_config"):
+            ret_code, out, err = run_command(["vtysh", "-c", "show running-config"])
         if ret_code != 0:
             log_crit("can't update running config: rc=%d out='%s' err='%s'" % (ret_code, out, err))
             return ""
@@ -45,7 +104,10 @@ class FRR(object):
         with open(tmp_filename, 'w') as fp:
             fp.write("%s\n" % config_text)
         command = ["vtysh", "-f", tmp_filename]
-        ret_code, out, err = run_command(command)
+        g_stats.inc("FRR", "forks")
+        g_stats.inc("FRR", "bytes_written", len(config_text) + 1)
+        with g_stats.timer("FRR", "write"):
+            ret_code, out, err = run_command(command)
         if ret_code != 0:
             err_tuple = tmp_filename, ret_code, out, err
             log_err("ConfigMgr::commit(): can't push configuration from file='%s', rc='%d', stdout='%s', stderr='%s'" % err_tuple)
@@ -54,15 +116,25 @@ class FRR(object):
                 os.remove(tmp_filename)
         return ret_code == 0
 
-    @staticmethod
-    def restart_peer_groups(peer_groups):
+    def restart_peer_groups(self, peer_groups):
         """ Restart peer-groups which support BBR
+        All peer-groups are restarted in one bgpd vty session. If it isn't available, vtysh is used for every peer-group
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
+        peer_groups = sorted(set(peer_groups))
+        if not peer_groups:
+            return True
+        commands = ["clear bgp peer-group %s soft in" % peer_group for peer_group in peer_groups]
+        results = self.execute_batch("bgpd", commands)
+        if results is None:
+            results = []
+            for command in commands:
+                g_stats.inc("FRR", "forks")
+                with g_stats.timer("FRR", "restart_peer_group"):
+                    results.append(run_command(["vtysh", "-c", command]))
         res = True
-        for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
+        for peer_group, (rc, out, err) in zip(peer_groups, results):
             if rc != 0:
                 log_value = peer_group, rc, out, err
                 log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
@@ -19,6 +19,7 @@ from .managers_setsrc import ZebraSetSrc
 from .managers_static_rt import StaticRouteMgr
 from .managers_rm import RouteMapMgr
 from .runner import Runner, signal_handler
+from .stats import g_stats, dump_signal_handler
 from .template import TemplateFabric
 from .utils import read_constants
 from .frr import FRR
@@ -36,7 +37,22 @@ def do_work():
         'tf':        TemplateFabric(),
         'constants': read_constants(),
     }
-    managers = [
+    stats_cfg = common_objs['constants'].get('bgp', {}).get('bgpcfgd_stats', {})
+    if stats_cfg.get('enabled', False):
+        g_stats.enable(interval=stats_cfg.get('interval', 60))
+    runner = Runner(common_objs['cfg_mgr'])
+    for mgr in create_managers(common_objs):
+        runner.add_manager(mgr)
+    runner.run()
+
+
+def create_managers(common_objs):
+    """
+    Create all bgpcfgd managers
+    :param common_objs: common object dictionary
+    :return: list of managers
+    """
+    return [
         # Config DB managers
         BGPDataBaseMgr(common_objs, "CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME),
         BGPDataBaseMgr(common_objs, "CONFIG_DB", swsscommon.CFG_DEVICE_NEIGHBOR_METADATA_TABLE_NAME),
@@ -65,10 +81,6 @@ def do_work():
         AdvertiseRouteMgr(common_objs, "STATE_DB", swsscommon.STATE_ADVERTISE_NETWORK_TABLE_NAME),
         RouteMapMgr(common_objs, "APPL_DB", swsscommon.APP_BGP_PROFILE_TABLE_NAME),
     ]
-    runner = Runner(common_objs['cfg_mgr'])
-    for mgr in managers:
-        runner.add_manager(mgr)
-    runner.run()
 
 
 def main():
@@ -77,6 +89,7 @@ def main():
         syslog.openlog('bgpcfgd')
         signal.signal(signal.SIGTERM, signal_handler)
         signal.signal(signal.SIGINT, signal_handler)
+        signal.signal(signal.SIGUSR1, dump_signal_handler)
         do_work()
     except KeyboardInterrupt:
         log_notice("Keyboard interrupt")
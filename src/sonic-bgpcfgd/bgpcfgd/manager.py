@@ -1,6 +1,7 @@
 from swsscommon import swsscommon
 
 from .log import log_debug, log_err
+from .stats import g_stats
 
 
 class Manager(object):
@@ -20,6 +21,7 @@ class Manager(object):
         self.db_name = database
         self.table_name = table_name
         self.set_queue = []
+        self.stats_name = "%s|%s" % (self.__class__.__name__, table_name)
         self.directory.subscribe(deps, self.on_deps_change)  # subscribe this class method on directory changes
 
     def get_database(self):
@@ -38,29 +40,46 @@ class Manager(object):
         :param data: associated data of the event. Empty for 'DEL' operation.
         """
         if op == swsscommon.SET_COMMAND:
+            g_stats.inc(self.stats_name, 'set_events')
             if self.directory.available_deps(self.deps):  # all required dependencies are set in the Directory?
-                res = self.set_handler(key, data)
+                with g_stats.timer(self.stats_name, 'set_handler'):
+                    res = self.set_handler(key, data)
                 if not res:  # set handler returned False, which means it is not ready to process is. Save it for later.
                     log_debug("'SET' handler returned NOT_READY for the Manager: %s" % self.__class__)
                     self.set_queue.append((key, data))
             else:
                 log_debug("Not all dependencies are met for the Manager: %s" % self.__class__)
                 self.set_queue.append((key, data))
+            g_stats.gauge(self.stats_name, 'set_queue_depth', len(self.set_queue))
         elif op == swsscommon.DEL_COMMAND:
-            self.del_handler(key)
+            g_stats.inc(self.stats_name, 'del_events')
+            with g_stats.timer(self.stats_name, 'del_handler'):
+                self.del_handler(key)
         else:
             log_err("Invalid operation '%s' for key '%s'" % (op, key))
 
+    def handler_bulk(self, events):
+        """
+        This method is executed on a batch of add/remove events, which were received together.
+        By default the events are processed one by one. Managers can override it to process the batch at once
+        :param events: list of tuples (key, op, data)
+        """
+        for key, op, data in events:
+            self.handler(key, op, data)
+
     def on_deps_change(self):
         """ This method is being executed on every dependency change """
         if not self.directory.available_deps(self.deps):
             return
         new_queue = []
         for key, data in self.set_queue:
-            res = self.set_handler(key, data)
+            g_stats.inc(self.stats_name, 'set_retries')
+            with g_stats.timer(self.stats_name, 'set_handler'):
+                res = self.set_handler(key, data)
             if not res:
                 new_queue.append((key, data))
         self.set_queue = new_queue
+        g_stats.gauge(self.stats_name, 'set_queue_depth', len(self.set_queue))
 
     def set_handler(self, key, data):
         """ Placeholder for 'SET' command """
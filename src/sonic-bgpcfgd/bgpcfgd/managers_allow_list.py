@@ -21,6 +21,7 @@ class BGPAllowListMgr(Manager):
     ROUTE_MAP_ENTRY_WITHOUT_COMMUNITY_START = 30000
     ROUTE_MAP_ENTRY_WITHOUT_COMMUNITY_END = 65530
     PREFIX_LIST_POS = 1 # the position of the ip prefix in the permit string.
+    PREFIX_LIST_MAX_SEQ = 4294967295  # the maximum sequence number of a prefix-list entry in FRR
 
     V4 = "v4"  # constant for af enum: V4
     V6 = "v6"  # constant for af enum: V6
@@ -242,6 +243,10 @@ class BGPAllowListMgr(Manager):
             log_debug("BGPAllowListMgr::__update_prefix_list. the prefix-list '%s' exists and correct" % pl_name)
             return []
         family = self.__af_to_family(af)
+        if exist:
+            cmds = self.__update_prefix_list_entries(af, pl_name, allow_list, constant_list)
+            if cmds is not None:
+                return cmds
         cmds = []
         seq_no = 10
         if exist:
@@ -251,6 +256,62 @@ class BGPAllowListMgr(Manager):
             seq_no += 10
         return cmds
 
+    def __update_prefix_list_entries(self, af, pl_name, allow_list, constant_list):
+        """
+        Update entries of an existing prefix-list incrementally.
+        Entries which are not in the allow_list are removed by their sequence numbers,
+        new entries are added after the last entry of the prefix-list. Other entries are not touched.
+        :param af: "v4" to update ipv4 prefix-list, "v6" to update ipv6 prefix-list
+        :param pl_name: prefix-list name
+        :param allow_list: prefix-list entries
+        :param constant_list: a constant list which must be on top of the prefix-list
+        :return: list of commands, or None if the prefix-list can't be updated incrementally.
+                 For example when the constant entries were changed
+        """
+        family = self.__af_to_family(af)
+        entries = self.__get_prefix_list_entries(af, pl_name)
+        constant_list = self.__normalize_ipnetwork(af, constant_list)
+        if [rule for _, rule in entries[:len(constant_list)]] != constant_list:
+            log_debug("BGPAllowListMgr::__update_prefix_list_entries. constant entries of '%s' were changed" % pl_name)
+            return None
+        current = {}
+        for seq_no, rule in entries[len(constant_list):]:
+            current.setdefault(rule, []).append(seq_no)
+        expected = set(self.__normalize_ipnetwork(af, allow_list))
+        cmds = []
+        for rule, seq_numbers in current.items():
+            if rule not in expected:
+                for seq_no in seq_numbers:
+                    cmds.append('no %s prefix-list %s seq %d %s' % (family, pl_name, seq_no, rule))
+        seq_no = entries[-1][0] if entries else 0
+        for rule in self.__normalize_ipnetwork(af, allow_list):
+            if rule not in current:
+                seq_no += 10
+                cmds.append('%s prefix-list %s seq %d %s' % (family, pl_name, seq_no, rule))
+                current[rule] = [seq_no]
+        if seq_no > self.PREFIX_LIST_MAX_SEQ:
+            log_debug("BGPAllowListMgr::__update_prefix_list_entries. no free sequence numbers in '%s'" % pl_name)
+            return None
+        return cmds
+
+    def __get_prefix_list_entries(self, af, pl_name):
+        """
+        Extract entries of a prefix-list from the running configuration
+        :param af: address family of the prefix-list
+        :param pl_name: prefix-list name
+        :return: a list of tuples (sequence number, normalized rule) sorted by the sequence number
+        """
+        family = self.__af_to_family(af)
+        match_string = '%s prefix-list %s seq ' % (family, pl_name)
+        entries = []
+        for line in self.cfg_mgr.get_text():
+            if line.startswith(match_string):
+                found = line[len(match_string):].strip().split(' ')
+                entries.append((int(found[0]), " ".join(found[1:])))
+        entries.sort()
+        rules = self.__normalize_ipnetwork(af, [rule for _, rule in entries])
+        return [(seq_no, rule) for (seq_no, _), rule in zip(entries, rules)]
+
     def __remove_prefix_list(self, af, pl_name):
         """
         Remove prefix-list in the address-family af.
@@ -652,7 +713,6 @@ class BGPAllowListMgr(Manager):
         :param deployment_id: deployment_id number
         :return: a list of peer-groups which a used by devices with requested deployment_id number
         """
-        self.cfg_mgr.update()
         peer_groups = self.__extract_peer_group_names()
         pg_2_rm = self.__get_peer_group_to_route_map(peer_groups)
         rm_2_call = self.__get_route_map_calls(set(pg_2_rm.values()))
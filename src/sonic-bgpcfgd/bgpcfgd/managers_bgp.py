@@ -1,4 +1,3 @@
-import json
 from swsscommon import swsscommon
 
 import jinja2
@@ -373,26 +372,37 @@ class BGPPeerMgrBase(Manager):
     def load_peers():
         """
         Load peers from FRR.
+        Peers of all vrfs are extracted from the bgpd running configuration with one vtysh call
         :return: set of peers, which are already installed in FRR
         """
-        command = ["vtysh", "-c", "show bgp vrfs json"]
+        command = ["vtysh", "-c", "show running-config bgpd"]
         ret_code, out, err = run_command(command)
-        if ret_code == 0:
-            js_vrf = json.loads(out)
-            vrfs = js_vrf['vrfs'].keys()
-        else:
-            log_crit("Can't read bgp vrfs: %s" % err)
-            raise Exception("Can't read bgp vrfs: %s" % err)
-        peers = set()
-        for vrf in vrfs:
-            command = ["vtysh", "-c", 'show bgp vrf %s neighbors json' % str(vrf)]
-            ret_code, out, err = run_command(command)
-            if ret_code == 0:
-                js_bgp = json.loads(out)
-                for nbr in js_bgp.keys():
-                    peers.add((vrf, nbr))
-            else:
-                log_crit("Can't read vrf '%s' neighbors: %s" % (vrf, str(err)))
-                raise Exception("Can't read vrf '%s' neighbors: %s" % (vrf, str(err)))
-
-        return peers
+        if ret_code != 0:
+            log_crit("Can't read bgpd running configuration: %s" % err)
+            raise Exception("Can't read bgpd running configuration: %s" % err)
+        return BGPPeerMgrBase.parse_peers(out)
+
+    @staticmethod
+    def parse_peers(config):
+        """
+        Extract peers from the bgpd running configuration.
+        Only 'router bgp' and 'neighbor' lines are parsed. Peer-groups are not peers and they are skipped
+        :param config: bgpd running configuration as a string
+        :return: set of pairs (vrf, peer)
+        """
+        neighbors = set()
+        peer_groups = set()
+        vrf = None
+        for line in config.split('\n'):
+            if line.startswith('router bgp '):
+                items = line.split()
+                vrf = items[4] if len(items) > 4 and items[3] == 'vrf' else 'default'
+            elif not line.startswith(' '):
+                vrf = None
+            elif vrf is not None and line.startswith(' neighbor '):
+                items = line.split()
+                if len(items) == 3 and items[2] == 'peer-group':
+                    peer_groups.add((vrf, items[1]))
+                elif len(items) > 2:
+                    neighbors.add((vrf, items[1]))
+        return neighbors - peer_groups
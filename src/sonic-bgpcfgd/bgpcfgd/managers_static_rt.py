@@ -1,6 +1,8 @@
 import traceback
+from collections import OrderedDict
 from .log import log_crit, log_err, log_debug
 from .manager import Manager
+from .stats import g_stats
 from .template import TemplateFabric
 import socket
 from swsscommon import swsscommon
@@ -32,6 +34,85 @@ class StaticRouteMgr(Manager):
 
     def set_handler(self, key, data):
         vrf, ip_prefix = self.split_key(key)
+        had_routes = bool(self.static_routes.get(vrf))
+        cmd_list = self.route_set_commands(vrf, ip_prefix, data)
+        if cmd_list is None:
+            return False
+
+        # Enable redistribution of static routes when it is the first one get set
+        cmd_list.extend(self.redistribution_commands(vrf, had_routes))
+
+        if cmd_list:
+            self.cfg_mgr.push_list(cmd_list)
+            log_debug("Static route {} is scheduled for updates".format(key))
+        else:
+            log_debug("Nothing to update for static route {}".format(key))
+
+        return True
+
+
+    def del_handler(self, key):
+        vrf, ip_prefix = self.split_key(key)
+        had_routes = bool(self.static_routes.get(vrf))
+        cmd_list = self.route_del_commands(vrf, ip_prefix)
+
+        # Disable redistribution of static routes when it is the last one to delete
+        cmd_list.extend(self.redistribution_commands(vrf, had_routes))
+
+        if cmd_list:
+            self.cfg_mgr.push_list(cmd_list)
+            log_debug("Static route {} is scheduled for updates".format(key))
+        else:
+            log_debug("Nothing to update for static route {}".format(key))
+
+    def handler_bulk(self, events):
+        """
+        Process a batch of STATIC_ROUTE events, which were received together.
+        Commands of all routes of a vrf are pushed as one block, and redistribution of static routes
+        is enabled or disabled once per vrf for the whole batch
+        :param events: list of tuples (key, op, data)
+        """
+        vrf_cmds = OrderedDict()  # vrf -> list of route commands
+        vrf_had_routes = {}       # vrf -> True if the vrf had static routes before the batch
+        with g_stats.timer(self.stats_name, 'handler_bulk'):
+            for key, op, data in events:
+                vrf, ip_prefix = self.split_key(key)
+                if vrf not in vrf_had_routes:
+                    vrf_had_routes[vrf] = bool(self.static_routes.get(vrf))
+                if op == swsscommon.SET_COMMAND:
+                    g_stats.inc(self.stats_name, 'set_events')
+                    cmd_list = self.route_set_commands(vrf, ip_prefix, data)
+                    if cmd_list is None:
+                        self.set_queue.append((key, data))
+                        continue
+                elif op == swsscommon.DEL_COMMAND:
+                    g_stats.inc(self.stats_name, 'del_events')
+                    cmd_list = self.route_del_commands(vrf, ip_prefix)
+                else:
+                    log_err("Invalid operation '%s' for key '%s'" % (op, key))
+                    continue
+                vrf_cmds.setdefault(vrf, []).extend(cmd_list)
+
+            cmd_list = []
+            for vrf, had_routes in vrf_had_routes.items():
+                cmd_list.extend(vrf_cmds.get(vrf, []))
+                cmd_list.extend(self.redistribution_commands(vrf, had_routes))
+        g_stats.gauge(self.stats_name, 'set_queue_depth', len(self.set_queue))
+
+        if cmd_list:
+            self.cfg_mgr.push_list(cmd_list)
+            log_debug("%d static route events in %d vrfs are scheduled for updates" % (len(events), len(vrf_cmds)))
+        else:
+            log_debug("Nothing to update for %d static route events" % len(events))
+
+    def route_set_commands(self, vrf, ip_prefix, data):
+        """
+        Generate commands to set the static route and save the route
+        :param vrf: vrf name of the route
+        :param ip_prefix: ip prefix of the route
+        :param data: data of STATIC_ROUTE entry
+        :return: list of commands, or None if the entry is invalid
+        """
         is_ipv6 = TemplateFabric.is_ipv6(ip_prefix)
 
         arg_list    = lambda v: v.split(',') if len(v.strip()) != 0 else None
@@ -48,47 +129,48 @@ class StaticRouteMgr(Manager):
             cmd_list = self.static_route_commands(ip_nh_set, cur_nh_set, ip_prefix, vrf, route_tag, cur_route_tag)
         except Exception as exc:
             log_crit("Got an exception %s: Traceback: %s" % (str(exc), traceback.format_exc()))
-            return False
-
-        # Enable redistribution of static routes when it is the first one get set
-        if not self.static_routes.get(vrf, {}):
-            if self.directory.path_exist("CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME, "localhost/bgp_asn"):
-                cmd_list.extend(self.enable_redistribution_command(vrf))
-            else:
-                self.vrf_pending_redistribution.add(vrf)
-
-        if cmd_list:
-            self.cfg_mgr.push_list(cmd_list)
-            log_debug("Static route {} is scheduled for updates".format(key))
-        else:
-            log_debug("Nothing to update for static route {}".format(key))
+            return None
 
         self.static_routes.setdefault(vrf, {})[ip_prefix] = (ip_nh_set, route_tag)
 
-        return True
-
+        return cmd_list
 
-    def del_handler(self, key):
-        vrf, ip_prefix = self.split_key(key)
+    def route_del_commands(self, vrf, ip_prefix):
+        """
+        Generate commands to remove the static route and forget the route
+        :param vrf: vrf name of the route
+        :param ip_prefix: ip prefix of the route
+        :return: list of commands
+        """
         is_ipv6 = TemplateFabric.is_ipv6(ip_prefix)
 
         ip_nh_set = IpNextHopSet(is_ipv6)
         cur_nh_set, route_tag = self.static_routes.get(vrf, {}).get(ip_prefix, (IpNextHopSet(is_ipv6), self.ROUTE_ADVERTISE_DISABLE_TAG))
         cmd_list = self.static_route_commands(ip_nh_set, cur_nh_set, ip_prefix, vrf, route_tag, route_tag)
 
-        # Disable redistribution of static routes when it is the last one to delete
-        if self.static_routes.get(vrf, {}).keys() == {ip_prefix}:
-            if self.directory.path_exist("CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME, "localhost/bgp_asn"):
-                cmd_list.extend(self.disable_redistribution_command(vrf))
-            self.vrf_pending_redistribution.discard(vrf)
+        self.static_routes.setdefault(vrf, {}).pop(ip_prefix, None)
 
-        if cmd_list:
-            self.cfg_mgr.push_list(cmd_list)
-            log_debug("Static route {} is scheduled for updates".format(key))
-        else:
-            log_debug("Nothing to update for static route {}".format(key))
+        return cmd_list
 
-        self.static_routes.setdefault(vrf, {}).pop(ip_prefix, None)
+    def redistribution_commands(self, vrf, had_routes):
+        """
+        Generate commands to enable redistribution of static routes when the vrf got its first static route,
+        and to disable it when the last static route of the vrf was removed
+        :param vrf: vrf name
+        :param had_routes: True if the vrf had static routes before the update
+        :return: list of commands
+        """
+        has_routes = bool(self.static_routes.get(vrf))
+        bgp_asn_exists = self.directory.path_exist("CONFIG_DB", swsscommon.CFG_DEVICE_METADATA_TABLE_NAME, "localhost/bgp_asn")
+        if has_routes and not had_routes:
+            if bgp_asn_exists:
+                return self.enable_redistribution_command(vrf)
+            self.vrf_pending_redistribution.add(vrf)
+        elif had_routes and not has_routes:
+            self.vrf_pending_redistribution.discard(vrf)
+            if bgp_asn_exists:
+                return self.disable_redistribution_command(vrf)
+        return []
 
     @staticmethod
     def split_key(key):
@@ -2,6 +2,7 @@ from collections import defaultdict
 from swsscommon import swsscommon
 
 from .log import log_debug, log_crit
+from .stats import g_stats
 
 
 g_run = True
@@ -27,6 +28,7 @@ class Runner(object):
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
         self.subscribers = set()
+        self.stats_table = None
 
     def add_manager(self, manager):
         """
@@ -46,25 +48,44 @@ class Runner(object):
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
             self.subscribers.add(subscriber)
             self.selector.addSelectable(subscriber)
-        self.callbacks[db][table_name].append(manager.handler)
+        self.callbacks[db][table_name].append(manager.handler_bulk)
 
     def run(self):
         """ Main loop """
         while g_run:
             state, _ = self.selector.select(Runner.SELECT_TIMEOUT)
+            self.process_stats()
             if state == self.selector.TIMEOUT:
                 continue
             elif state == self.selector.ERROR:
                 raise Exception("Received error from select")
 
             for subscriber in self.subscribers:
+                events = []
                 while True:
                     key, op, fvs = subscriber.pop()
                     if not key:
                         break
                     log_debug("Received message : '%s'" % str((key, op, fvs)))
-                    for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
-                        callback(key, op, dict(fvs))
-            rc = self.cfg_manager.commit()
+                    events.append((key, op, dict(fvs)))
+                if not events:
+                    continue
+                g_stats.inc("Runner", "events", len(events))
+                for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
+                    callback(events)
+            with g_stats.timer("Runner", "commit"):
+                rc = self.cfg_manager.commit()
             if not rc:
+                g_stats.inc("Runner", "failed_commits")
                 log_crit("Runner::commit was unsuccessful")
+
+    def process_stats(self):
+        """ Dump the performance counters if it was requested, and publish them to STATE_DB periodically """
+        if g_stats.dump_requested:
+            g_stats.dump()
+        if g_stats.publish_required():
+            if self.stats_table is None:
+                self.stats_table = swsscommon.Table(swsscommon.DBConnector("STATE_DB", 0), g_stats.TABLE_NAME)
+            for key, values in g_stats.to_entries().items():
+                self.stats_table.set(key, swsscommon.FieldValuePairs(list(values.items())))
+            g_stats.mark_published()
@@ -0,0 +1,153 @@
+import bisect
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from .log import log_notice
+
+
+class Histogram(object):
+    """ Latency histogram with fixed buckets """
+    BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]  # upper bounds of buckets in seconds
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # the last bucket is for values above the last bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """
+        Add a measurement to the histogram
+        :param value: measured latency in seconds
+        """
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        """ Return the histogram as a dictionary of strings. Latencies are in milliseconds """
+        res = {
+            'count': str(self.count),
+            'avg_ms': "%.3f" % (self.total * 1000 / self.count if self.count else 0.0),
+            'max_ms': "%.3f" % (self.max * 1000),
+        }
+        for bound, count in zip(self.BUCKETS, self.counts):
+            res['le_%gms' % (bound * 1000)] = str(count)
+        res['gt_%gms' % (self.BUCKETS[-1] * 1000)] = str(self.counts[-1])
+        return res
+
+
+class Stats(object):
+    """ Performance counters of bgpcfgd. All methods are no-op until the object is enabled """
+    TABLE_NAME = "BGPCFGD_STATS"
+
+    def __init__(self):
+        self.enabled = False
+        self.interval = 60
+        self.last_publish = 0.0
+        self.dump_requested = False
+        self.reset()
+
+    def reset(self):
+        """ Reset all collected counters """
+        self.counters = defaultdict(lambda: defaultdict(int))  # name -> counter -> value
+        self.gauges = defaultdict(dict)  # name -> gauge -> value
+        self.histograms = defaultdict(lambda: defaultdict(Histogram))  # name -> histogram -> Histogram
+
+    def enable(self, interval=60):
+        """
+        Start collecting counters
+        :param interval: interval in seconds between two publications of the counters to STATE_DB
+        """
+        self.enabled = True
+        self.interval = interval
+        self.last_publish = time.time()
+
+    def inc(self, name, counter, value=1):
+        """
+        Increment a counter
+        :param name: name of the counter group. For example manager name
+        :param counter: name of the counter
+        :param value: increment
+        """
+        if self.enabled:
+            self.counters[name][counter] += value
+
+    def gauge(self, name, gauge, value):
+        """
+        Set current value of a gauge. For example queue depth
+        :param name: name of the gauge group
+        :param gauge: name of the gauge
+        :param value: value of the gauge
+        """
+        if self.enabled:
+            self.gauges[name][gauge] = value
+
+    def observe(self, name, histogram, value):
+        """
+        Add a latency measurement
+        :param name: name of the histogram group
+        :param histogram: name of the histogram
+        :param value: latency in seconds
+        """
+        if self.enabled:
+            self.histograms[name][histogram].observe(value)
+
+    @contextmanager
+    def timer(self, name, histogram):
+        """
+        Measure latency of the code inside of the 'with' block
+        :param name: name of the histogram group
+        :param histogram: name of the histogram
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.histograms[name][histogram].observe(time.time() - start)
+
+    def to_entries(self):
+        """
+        Convert collected counters into STATE_DB entries
+        :return: dictionary: key -> dictionary with entry values
+        """
+        entries = defaultdict(dict)
+        for name, counters in self.counters.items():
+            entries[name].update({counter: str(value) for counter, value in counters.items()})
+        for name, gauges in self.gauges.items():
+            entries[name].update({gauge: str(value) for gauge, value in gauges.items()})
+        for name, histograms in self.histograms.items():
+            for histogram_name, histogram in histograms.items():
+                entries["%s|%s" % (name, histogram_name)] = histogram.to_dict()
+        return entries
+
+    def publish_required(self):
+        """ Return True if the counters should be published now """
+        return self.enabled and time.time() - self.last_publish >= self.interval
+
+    def mark_published(self):
+        """ Remember the time when the counters were published """
+        self.last_publish = time.time()
+
+    def request_dump(self):
+        """ Schedule dumping of the counters to syslog. Safe to call from a signal handler """
+        self.dump_requested = True
+
+    def dump(self):
+        """ Write the counters to syslog """
+        self.dump_requested = False
+        for key, values in sorted(self.to_entries().items()):
+            log_notice("bgpcfgd stats %s: %s" % (key, ", ".join("%s=%s" % item for item in values.items())))
+
+
+g_stats = Stats()
+
+
+def dump_signal_handler(_, __):  # dump_signal_handler(signum, frame)
+    """ signal handler which schedules dumping of the counters """
+    g_stats.request_dump()
@@ -5,6 +5,15 @@ import jinja2
 import netaddr
 
 from .log import log_err
+from .stats import g_stats
+
+
+class TimedTemplate(jinja2.Template):
+    """ Jinja2 template which measures rendering latency """
+    def render(self, *args, **kwargs):
+        with g_stats.timer("TemplateFabric", self.name if self.name else "<string>"):
+            return super(TimedTemplate, self).render(*args, **kwargs)
+
 
 class TemplateFabric(object):
     """ Fabric for rendering jinja2 templates """
@@ -12,6 +21,7 @@ class TemplateFabric(object):
         j2_template_paths = [template_path]
         j2_loader = jinja2.FileSystemLoader(j2_template_paths)
         j2_env = jinja2.Environment(loader=j2_loader, trim_blocks=False)
+        j2_env.template_class = TimedTemplate
         j2_env.filters['ipv4'] = self.is_ipv4
         j2_env.filters['ipv6'] = self.is_ipv6
         j2_env.filters['pfx_filter'] = self.pfx_filter
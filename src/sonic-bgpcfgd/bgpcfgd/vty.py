@@ -0,0 +1,73 @@
+import socket
+
+
+class VtyClient(object):
+    """ Client of vty unix socket of a FRR daemon. It speaks the same protocol as vtysh """
+    CMD_SUCCESS = 0
+    REPLY_END = b'\0\0\0'  # every reply ends with three zero bytes followed by the command status byte
+
+    def __init__(self, path, timeout=30.0):
+        """
+        Initialize the object
+        :param path: path to the vty unix socket of the daemon. For example /var/run/frr/bgpd.vty
+        :param timeout: timeout of socket operations in seconds
+        """
+        self.path = path
+        self.timeout = timeout
+        self.sock = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def connect(self):
+        """ Connect to the daemon """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except Exception:
+            sock.close()
+            raise
+        self.sock = sock
+
+    def close(self):
+        """ Close the connection """
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def execute(self, command):
+        """
+        Execute a command in the daemon
+        :param command: command to execute
+        :return: tuple: command status (0 on success), command output
+        """
+        self.sock.sendall(command.encode() + b'\0')
+        reply = bytearray()
+        while len(reply) < 4 or reply[-4:-1] != self.REPLY_END:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("vty connection to '%s' was closed" % self.path)
+            reply += chunk
+        return reply[-1], reply[:-4].decode(errors='replace')
+
+    @staticmethod
+    def probe(path):
+        """
+        Check that the daemon accepts connections on its vty socket
+        :param path: path to the vty unix socket of the daemon
+        :return: True if the daemon accepted the connection
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(1.0)
+        try:
+            sock.connect(path)
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.close()
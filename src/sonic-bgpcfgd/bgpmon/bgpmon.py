@@ -10,30 +10,50 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     BGP related items that needs to be updated in a periodic manner in the
     future, then more can be added into this process.
 
-    The script check if there are any bgp activities by monitoring the bgp
-    frr.log file timestamp.  If activity is detected, then it will request bgp
-    neighbor state via vtysh cli interface. This bgp activity monitoring is
-    done periodically (every 15 second). When triggered, it looks specifically
-    for the neighbor state in the json output of show ip bgp neighbors json
-    and update the state DB for each neighbor accordingly.
+    The script follows the bgp frr.log file incrementally and looks for the
+    neighbor adjacency change messages (%ADJCHANGE). As soon as such message
+    is found, it requests bgp neighbor state of all vrfs via vtysh cli
+    interface, at most once per second: changes logged within a second of
+    the last request are handled together by the next one. Neighbor state transitions which are not logged by FRR are
+    caught by a periodic request with adaptive interval: the interval is reset
+    to 1 second on every detected change and it grows twice on every request
+    without changes, up to 15 seconds. When triggered, it looks for the
+    neighbor state of every address family in the json output of
+    show bgp vrf all summary json and update the state DB for each neighbor
+    accordingly. Neighbors of the default vrf are stored with the neighbor ip
+    address as the key, neighbors of other vrfs with the key vrf|ip address.
     In order to not disturb and hold on to the State DB access too long and
     removal of the stale neighbors (neighbors that was there previously on
     previous get request but no longer there in the current get request), a
     "previous" neighbor dictionary will be kept and used to determine if there
     is a need to perform update or the peer is stale to be removed from the
     state DB
+
+    On multi-ASIC systems one bgpmon process can serve the FRR instances of
+    several namespaces (bgpmon -n asic0 -n asic1 ... or bgpmon --all-namespaces).
+    In this mode the requests to FRR are done concurrently with asyncio
+    subprocesses, and every namespace has its own STATE_DB connection and
+    pipeline.
 """
+import argparse
+import asyncio
 import subprocess
 import json
 import os
+import re
 import syslog
 import swsssdk
 import time
 
 PIPE_BATCH_MAX_COUNT = 50
+FRR_LOG_PATH = "/var/log/frr/frr.log"
+LOG_CHECK_INTERVAL = 0.2  # seconds between two reads of the frr.log
+MIN_POLL_INTERVAL = 1     # seconds
+MAX_POLL_INTERVAL = 15    # seconds
+SUMMARY_CMD = "show bgp vrf all summary json"
 
 class BgpStateGet:
-    def __init__(self):
+    def __init__(self, namespace=None):
         # set peer_l stores the Neighbor peer Ip address
         # dic peer_state stores the Neighbor peer state entries
         # set new_peer_l stores the new snapshot of Neighbor peer ip address
@@ -42,50 +62,44 @@ class BgpStateGet:
         self.peer_state = {}
         self.new_peer_l = set()
         self.new_peer_state = {}
-        self.cached_timestamp = 0
-        self.db = swsssdk.SonicV2Connector()
+        self.namespace = namespace
+        self.db = swsssdk.SonicV2Connector(namespace=namespace) if namespace else swsssdk.SonicV2Connector()
         self.db.connect(self.db.STATE_DB, False)
         client = self.db.get_redis_client(self.db.STATE_DB)
         self.pipe = client.pipeline()
         self.db.delete_all_by_pattern(self.db.STATE_DB, "NEIGH_STATE_TABLE|*" )
 
-    # A quick way to check if there are anything happening within BGP is to
-    # check its log file has any activities. This is by checking its modified
-    # timestamp against the cached timestamp that we keep and if there is a
-    # difference, there is activity detected. In case the log file got wiped
-    # out, it will default back to constant pulling every 15 seconds
-    def bgp_activity_detected(self):
-        try:
-            timestamp = os.stat("/var/log/frr/frr.log").st_mtime
-            if timestamp != self.cached_timestamp:
-                self.cached_timestamp = timestamp
-                return True
-            else:
-                return False
-        except (IOError, OSError):
-            return True
+    # Neighbors of the default vrf are identified by the ip address only,
+    # to keep the keys of the NEIGH_STATE_TABLE backward compatible
+    @staticmethod
+    def peer_name(vrf, peer):
+        return peer if vrf == "default" else "%s|%s" % (vrf, peer)
 
-    def update_new_peer_states(self, peer_dict):
-        peer_l = peer_dict["peers"].keys()
-        self.new_peer_l.update(peer_l)
-        for peer in peer_l:
-            self.new_peer_state[peer] = peer_dict["peers"][peer]["state"]
+    def update_new_peer_states(self, peer_dict, vrf="default"):
+        for peer, value in peer_dict["peers"].items():
+            name = self.peer_name(vrf, peer)
+            self.new_peer_l.add(name)
+            self.new_peer_state[name] = value["state"]
 
-    # Get a new snapshot of BGP neighbors and store them in the "new" location
+    # Get a new snapshot of BGP neighbors of all vrfs and address families and store them in the "new" location
     def get_all_neigh_states(self):
-        cmd = "vtysh -c 'show bgp summary json'"
+        cmd = "vtysh -c '%s'" % SUMMARY_CMD
         rc, output = subprocess.getstatusoutput(cmd)
         if rc:
             syslog.syslog(syslog.LOG_ERR, "*ERROR* Failed with rc:{} when execute: {}".format(rc, cmd))
             return
+        self.load_neigh_states(output)
 
+    # Store the neighbors from the output of show bgp vrf all summary json in the "new" location
+    def load_neigh_states(self, output):
         peer_info = json.loads(output)
         # cmd ran successfully, safe to Clean the "new" set/dict for new snapshot
         self.new_peer_l.clear()
         self.new_peer_state.clear()
-        for key, value in peer_info.items():
-            if key == "ipv4Unicast" or key == "ipv6Unicast":
-                self.update_new_peer_states(value)
+        for vrf, af_info in peer_info.items():
+            for value in af_info.values():
+                if isinstance(value, dict) and "peers" in value:
+                    self.update_new_peer_states(value, vrf)
 
     # This method will take the caller's dictionary which contains the peer state operation
     # That need to be updated in StateDB using Redis pipeline.
@@ -113,8 +127,11 @@ class BgpStateGet:
         self.pipe.execute()
         data.clear()
 
+    # Update the state DB with the difference between the "new" snapshot and the previous one.
+    # Returns the number of changed entries
     def update_neigh_states(self):
         data = {}
+        changes = 0
         for peer in self.new_peer_l:
             key = "NEIGH_STATE_TABLE|%s" % peer
             if peer in self.peer_l:
@@ -124,6 +141,7 @@ class BgpStateGet:
                     state = self.new_peer_state[peer]
                     data[key] = {'state':state}
                     self.peer_state[peer] = state
+                    changes += 1
                 # remove this neighbor from old set since it is accounted for
                 self.peer_l.remove(peer)
             else:
@@ -131,6 +149,7 @@ class BgpStateGet:
                 state = self.new_peer_state[peer]
                 data[key] = {'state':state}
                 self.peer_state[peer] = state
+                changes += 1
             if len(data) > PIPE_BATCH_MAX_COUNT:
                 self.flush_pipe(data)
         # Check for stale state entries to be cleaned up
@@ -138,6 +157,7 @@ class BgpStateGet:
             # remove this from the stateDB and the current neighbor state entry
             del_key = "NEIGH_STATE_TABLE|%s" % peer
             data[del_key] = None
+            changes += 1
             if peer in self.peer_state:
                 del self.peer_state[peer]
             if len(data) > PIPE_BATCH_MAX_COUNT:
@@ -147,23 +167,199 @@ class BgpStateGet:
             self.flush_pipe(data)
         # Save the new set
         self.peer_l = self.new_peer_l.copy()
+        return changes
+
+
+class FrrLogWatcher:
+    """ Follows the FRR log file and extracts bgp neighbor adjacency changes from the new lines """
+    # %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T1) in vrf default Up
+    # %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T1) in vrf default Down BGP Notification send
+    ADJCHANGE_RE = re.compile(r"%ADJCHANGE: neighbor ([^\s(]+)(?:\(\S*\))? in vrf (\S+) (Up|Down)")
+
+    def __init__(self, path=FRR_LOG_PATH):
+        self.path = path
+        self.inode = None
+        self.offset = 0
+        self.partial = b""
+
+    # Skip the existing content of the log. Its information is obtained by the first full request
+    def start(self):
+        try:
+            st = os.stat(self.path)
+            self.inode, self.offset = st.st_ino, st.st_size
+        except (IOError, OSError):
+            self.inode, self.offset = None, 0
+        self.partial = b""
+
+    # Read lines added to the log since the last call.
+    # Returns list of tuples (vrf, neighbor, Up|Down), or None if the log file can't be read
+    def read_changes(self):
+        try:
+            st = os.stat(self.path)
+            if st.st_ino != self.inode or st.st_size < self.offset:
+                # the log file was rotated or truncated
+                self.inode, self.offset, self.partial = st.st_ino, 0, b""
+            if st.st_size == self.offset:
+                return []
+            with open(self.path, "rb") as fp:
+                fp.seek(self.offset)
+                data = fp.read()
+        except (IOError, OSError):
+            return None
+        self.offset += len(data)
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        changes = []
+        for line in lines:
+            if b"%ADJCHANGE" not in line:
+                continue
+            m = self.ADJCHANGE_RE.search(line.decode("utf-8", "replace"))
+            if m:
+                changes.append((m.group(2), m.group(1), m.group(3)))
+        return changes
+
+
+class BgpMonitor:
+    """ Decides when the neighbor states should be requested from FRR """
+    def __init__(self, bgp_state_get, log_watcher):
+        self.bgp_state_get = bgp_state_get
+        self.log_watcher = log_watcher
+        self.interval = MIN_POLL_INTERVAL
+        self.next_poll = 0
+        self.last_refresh = 0
+        # an adjacency change was logged since the last request
+        self.adj_pending = False
+
+    # Request the neighbor states and update the state DB. Returns the number of changed entries
+    def refresh(self):
+        self.bgp_state_get.get_all_neigh_states()
+        return self.bgp_state_get.update_neigh_states()
+
+    def start(self):
+        self.log_watcher.start()
+        self.refresh()
+        self.last_refresh = time.time()
+        self.next_poll = self.last_refresh + self.interval
+
+    # One iteration of the main loop. Returns the number of changed entries
+    def step(self):
+        adj_changes = self.log_watcher.read_changes()
+        now = time.time()
+        if adj_changes:
+            # the states are requested at most once per MIN_POLL_INTERVAL, so that a storm of
+            # flapping sessions is coalesced into one request per interval
+            self.adj_pending = True
+            self.next_poll = min(self.next_poll, self.last_refresh + MIN_POLL_INTERVAL)
+        if now < self.next_poll:
+            return 0
+        changes = self.refresh()
+        self.last_refresh = now
+        if self.adj_pending or changes:
+            self.interval = MIN_POLL_INTERVAL
+        else:
+            self.interval = min(self.interval * 2, MAX_POLL_INTERVAL)
+        self.adj_pending = False
+        self.next_poll = now + self.interval
+        return changes
+
+    def run(self):
+        self.start()
+        while True:
+            time.sleep(LOG_CHECK_INTERVAL)
+            self.step()
+
+class AsyncBgpMonitor:
+    """ Monitors FRR instances of several namespaces from one process """
+    def __init__(self, namespaces, vtysh=("vtysh",)):
+        # vtysh is the command prefix used to reach FRR. In a namespace 'asicN' it is called with '-n N'
+        self.vtysh = list(vtysh)
+        self.bgp_state_gets = {ns: BgpStateGet(namespace=ns) for ns in namespaces}
+        self.intervals = {ns: MIN_POLL_INTERVAL for ns in namespaces}
+
+    def vtysh_args(self, namespace, cmd):
+        args = list(self.vtysh)
+        if namespace:
+            args += ["-n", namespace[len("asic"):] if namespace.startswith("asic") else namespace]
+        return args + ["-c", cmd]
+
+    # Run vtysh without blocking the other namespaces. Returns tuple (rc, output)
+    async def run_vtysh(self, namespace, cmd):
+        proc = await asyncio.create_subprocess_exec(*self.vtysh_args(namespace, cmd),
+                                                    stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.DEVNULL)
+        output, _ = await proc.communicate()
+        return proc.returncode, output.decode()
+
+    # Request the neighbor states of the namespace and update its STATE_DB. Returns the number of changed entries
+    async def refresh(self, namespace):
+        bgp_state_get = self.bgp_state_gets[namespace]
+        rc, output = await self.run_vtysh(namespace, SUMMARY_CMD)
+        if rc:
+            syslog.syslog(syslog.LOG_ERR, "*ERROR* Failed with rc:{} when execute: {} in namespace {}".format(rc, SUMMARY_CMD, namespace))
+            return 0
+        bgp_state_get.load_neigh_states(output)
+        # the redis pipeline of the namespace is flushed in a worker thread, not to delay the other namespaces
+        return await asyncio.get_running_loop().run_in_executor(None, bgp_state_get.update_neigh_states)
+
+    async def monitor_namespace(self, namespace):
+        while True:
+            changes = await self.refresh(namespace)
+            if changes:
+                self.intervals[namespace] = MIN_POLL_INTERVAL
+            else:
+                self.intervals[namespace] = min(self.intervals[namespace] * 2, MAX_POLL_INTERVAL)
+            await asyncio.sleep(self.intervals[namespace])
+
+    # Monitor the namespace and restart monitoring after a failure, without affecting the other namespaces
+    async def watch_namespace(self, namespace):
+        while True:
+            try:
+                await self.monitor_namespace(namespace)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, "*ERROR* Monitoring of namespace {} failed, restarting: {}".format(namespace, str(e)))
+                self.intervals[namespace] = MIN_POLL_INTERVAL
+                await asyncio.sleep(MIN_POLL_INTERVAL)
+
+    async def run(self):
+        await asyncio.gather(*[self.watch_namespace(ns) for ns in self.bgp_state_gets], return_exceptions=True)
+
+
+def get_namespaces(args):
+    if args.all_namespaces:
+        from sonic_py_common import multi_asic
+        return multi_asic.get_namespace_list()
+    return args.namespace
+
 
 def main():
+    parser = argparse.ArgumentParser(description="populate bgp neighbor states in the state DB")
+    parser.add_argument("-n", "--namespace", action="append", default=[], help="namespace to monitor. Could be repeated")
+    parser.add_argument("--all-namespaces", action="store_true", help="monitor all namespaces of the system")
+    args = parser.parse_args()
 
     syslog.syslog(syslog.LOG_INFO, "bgpmon service started")
     bgp_state_get = None
+    monitor = None
     try:
-        bgp_state_get = BgpStateGet()
+        namespaces = get_namespaces(args)
+        if any(namespaces):
+            swsssdk.SonicDBConfig.load_sonic_global_db_config()
+            monitor = AsyncBgpMonitor(namespaces)
+        else:
+            bgp_state_get = BgpStateGet()
     except Exception as e:
         syslog.syslog(syslog.LOG_ERR, "{}: error exit 1, reason {}".format("THIS_MODULE", str(e)))
         exit(1)
 
-    # periodically obtain the new neighbor information and update if necessary
-    while True:
-        time.sleep(15)
-        if bgp_state_get.bgp_activity_detected():
-            bgp_state_get.get_all_neigh_states()
-            bgp_state_get.update_neigh_states()
+    if monitor is not None:
+        # watch the FRR instances of all namespaces concurrently from this process
+        asyncio.get_event_loop().run_until_complete(monitor.run())
+        return
+
+    # obtain the new neighbor information on neighbor changes and periodically, and update if necessary
+    BgpMonitor(bgp_state_get, FrrLogWatcher()).run()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,45 @@
+import json
+import os
+import subprocess
+import sys
+
+BENCHMARK_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmark'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_vtysh import FakeRunningConfig, FakeVtysh
+
+
+def test_fake_running_config():
+    config = FakeRunningConfig()
+    config.apply("router bgp 65100\n  neighbor 10.0.0.1 remote-as 64600\n  address-family ipv4\n    neighbor 10.0.0.1 activate\n  exit-address-family")
+    config.apply("ip prefix-list PL seq 10 permit 10.0.0.0/8\nip prefix-list PL seq 20 permit 20.0.0.0/8")
+    config.apply("ip prefix-list PL seq 10 deny 10.0.0.0/8")
+    text = config.render()
+    assert " neighbor 10.0.0.1 remote-as 64600" in text
+    assert "  neighbor 10.0.0.1 activate" in text
+    assert "ip prefix-list PL seq 10 deny 10.0.0.0/8" in text
+    assert "ip prefix-list PL seq 10 permit 10.0.0.0/8" not in text
+    config.apply("router bgp 65100\n  no neighbor 10.0.0.1\nno ip prefix-list PL")
+    text = config.render()
+    assert "10.0.0.1" not in text
+    assert "prefix-list" not in text
+
+def test_fake_vtysh():
+    vtysh = FakeVtysh(fork_latency=0, line_latency=0)
+    assert vtysh.run_command(["vtysh", "-c", "show daemons"]) == (0, " zebra bgpd staticd", "")
+    assert vtysh.run_command(["vtysh", "-c", "ip route 10.0.0.0/24 10.1.1.1"])[0] == 0
+    rc, out, _ = vtysh.run_command(["vtysh", "-c", "show running-config"])
+    assert rc == 0
+    assert "ip route 10.0.0.0/24 10.1.1.1" in out
+    assert vtysh.forks == 3
+
+def test_bgpcfgd_scale():
+    command = [
+        sys.executable, os.path.join(BENCHMARK_DIR, "bgpcfgd_scale.py"),
+        "--neighbors", "20", "--vrfs", "2", "--allow-lists", "2", "--static-routes", "20",
+        "--fork-latency-ms", "0", "--line-latency-us", "0",
+    ]
+    report = json.loads(subprocess.check_output(command))
+    assert report["events"] == 86
+    assert report["commits"] > 0
+    assert report["bytes_pushed"] > 0
@@ -9,6 +9,11 @@ from swsscommon import swsscommon
 import bgpcfgd.managers_bgp
 
 TEMPLATE_PATH = os.path.abspath('../../dockers/docker-fpm-frr/frr')
+RUNNING_CONFIG_PATH = os.path.abspath('tests/data/load_peers/running-config.conf')
+
+def load_running_config():
+    with open(RUNNING_CONFIG_PATH) as fp:
+        return fp.read()
 
 def constructor():
     cfg_mgr = MagicMock()
@@ -21,8 +26,7 @@ def constructor():
     }
 
     return_value_map = {
-        "['vtysh', '-c', 'show bgp vrfs json']": (0, "{\"vrfs\": {\"default\": {}}}", ""),
-        "['vtysh', '-c', 'show bgp vrf default neighbors json']": (0, "{\"10.10.10.1\": {}, \"20.20.20.1\": {}, \"fc00:10::1\": {}}", "")
+        "['vtysh', '-c', 'show running-config bgpd']": (0, load_running_config(), ""),
     }
 
     bgpcfgd.managers_bgp.run_command = lambda cmd: return_value_map[str(cmd)]
@@ -110,3 +114,43 @@ def test_del_handler_nonexist_peer(mocked_log_warn):
     m = constructor()
     m.del_handler("40.40.40.1")
     mocked_log_warn.assert_called_with("Peer '(default|40.40.40.1)' has not been found")
+
+def test_load_peers():
+    calls = []
+    def run_command(cmd):
+        calls.append(cmd)
+        return 0, load_running_config(), ""
+    with patch('bgpcfgd.managers_bgp.run_command', run_command):
+        peers = bgpcfgd.managers_bgp.BGPPeerMgrBase.load_peers()
+    assert calls == [["vtysh", "-c", "show running-config bgpd"]]
+    assert peers == {
+        ("default", "10.10.10.1"),
+        ("default", "20.20.20.1"),
+        ("default", "fc00:10::1"),
+        ("Vnet1", "30.30.30.1"),
+        ("Vnet2", "Ethernet8"),
+    }
+
+def test_load_peers_error():
+    with patch('bgpcfgd.managers_bgp.run_command', return_value=(1, "", "error")), \
+         patch('bgpcfgd.managers_bgp.log_crit') as mocked_log_crit:
+        try:
+            bgpcfgd.managers_bgp.BGPPeerMgrBase.load_peers()
+            assert False, "Expect exception"
+        except Exception as e:
+            assert str(e) == "Can't read bgpd running configuration: error"
+        mocked_log_crit.assert_called_with("Can't read bgpd running configuration: error")
+
+def test_parse_peers_scale():
+    lines = ["router bgp 65100", " neighbor PEER_V4 peer-group"]
+    for i in range(4000):
+        lines.append(" neighbor 10.%d.%d.1 remote-as 64600" % (i // 256, i % 256))
+        lines.append(" neighbor 10.%d.%d.1 peer-group PEER_V4" % (i // 256, i % 256))
+    for vrf in range(100):
+        lines.append("!")
+        lines.append("router bgp 65100 vrf Vrf%d" % vrf)
+        lines.append(" neighbor 20.0.%d.1 remote-as 64601" % vrf)
+    peers = bgpcfgd.managers_bgp.BGPPeerMgrBase.parse_peers("\n".join(lines))
+    assert len(peers) == 4100
+    assert ("Vrf99", "20.0.99.1") in peers
+    assert ("default", "PEER_V4") not in peers
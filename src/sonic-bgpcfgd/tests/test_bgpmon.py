@@ -0,0 +1,198 @@
+import asyncio
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+with patch.dict("sys.modules", swsssdk=MagicMock()):
+    from bgpmon import bgpmon
+
+
+SUMMARY = {
+    "default": {
+        "ipv4Unicast": {"peers": {"10.0.0.1": {"state": "Established"}, "10.0.0.3": {"state": "Active"}}},
+        "ipv6Unicast": {"peers": {"fc00::2": {"state": "Established"}}},
+        "l2VpnEvpn": {"peers": {"10.0.0.1": {"state": "Established"}}},
+    },
+    "Vrf1": {
+        "ipv4Unicast": {"peers": {"10.0.0.1": {"state": "Idle"}}},
+    },
+    "Vrf2": {},
+}
+
+
+def constructor():
+    bgp_state_get = bgpmon.BgpStateGet()
+    bgp_state_get.pipe = MagicMock()
+    return bgp_state_get
+
+
+@patch.object(bgpmon.subprocess, 'getstatusoutput', return_value=(0, json.dumps(SUMMARY)))
+def test_get_all_neigh_states(mocked_getstatusoutput):
+    bgp_state_get = constructor()
+    bgp_state_get.get_all_neigh_states()
+    mocked_getstatusoutput.assert_called_once_with("vtysh -c 'show bgp vrf all summary json'")
+    assert bgp_state_get.new_peer_state == {
+        "10.0.0.1": "Established",
+        "10.0.0.3": "Active",
+        "fc00::2": "Established",
+        "Vrf1|10.0.0.1": "Idle",
+    }
+
+
+@patch.object(bgpmon.subprocess, 'getstatusoutput', return_value=(0, json.dumps(SUMMARY)))
+def test_update_neigh_states_only_changed(mocked_getstatusoutput):
+    bgp_state_get = constructor()
+    bgp_state_get.get_all_neigh_states()
+    assert bgp_state_get.update_neigh_states() == 4
+    assert bgp_state_get.pipe.hmset.call_count == 4
+    bgp_state_get.pipe.reset_mock()
+
+    summary = json.loads(json.dumps(SUMMARY))
+    summary["Vrf1"]["ipv4Unicast"]["peers"]["10.0.0.1"]["state"] = "Established"
+    del summary["default"]["ipv4Unicast"]["peers"]["10.0.0.3"]
+    mocked_getstatusoutput.return_value = (0, json.dumps(summary))
+    bgp_state_get.get_all_neigh_states()
+    assert bgp_state_get.update_neigh_states() == 2
+    bgp_state_get.pipe.hmset.assert_called_once_with("NEIGH_STATE_TABLE|Vrf1|10.0.0.1", {'state': "Established"})
+    bgp_state_get.pipe.delete.assert_called_once_with("NEIGH_STATE_TABLE|10.0.0.3")
+    bgp_state_get.pipe.reset_mock()
+
+    bgp_state_get.get_all_neigh_states()
+    assert bgp_state_get.update_neigh_states() == 0
+    bgp_state_get.pipe.hmset.assert_not_called()
+    bgp_state_get.pipe.delete.assert_not_called()
+
+
+def test_log_watcher(tmp_path):
+    log_path = str(tmp_path / "frr.log")
+    with open(log_path, "w") as fp:
+        fp.write("BGP: %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T1) in vrf default Up\n")
+    watcher = bgpmon.FrrLogWatcher(log_path)
+    watcher.start()
+    assert watcher.read_changes() == []  # the existing content is skipped
+
+    with open(log_path, "a") as fp:
+        fp.write("BGP: 10.0.0.1 [FSM] Timer (keepalive timer expire)\n")
+        fp.write("BGP: %ADJCHANGE: neighbor 10.0.0.1(ARISTA01T1) in vrf default Down BGP Notification send\n")
+        fp.write("BGP: %ADJCHANGE: neighbor fc00::2(Unknown) in vrf Vrf1 ")
+    assert watcher.read_changes() == [("default", "10.0.0.1", "Down")]
+
+    with open(log_path, "a") as fp:
+        fp.write("Up\n")
+    assert watcher.read_changes() == [("Vrf1", "fc00::2", "Up")]
+
+    os.rename(log_path, log_path + ".1")  # the log is rotated
+    with open(log_path, "w") as fp:
+        fp.write("BGP: %ADJCHANGE: neighbor 10.0.0.5 in vrf default Up\n")
+    assert watcher.read_changes() == [("default", "10.0.0.5", "Up")]
+
+    os.remove(log_path)
+    assert watcher.read_changes() is None
+
+
+def test_monitor_adaptive_interval():
+    bgp_state_get = MagicMock()
+    log_watcher = MagicMock()
+    monitor = bgpmon.BgpMonitor(bgp_state_get, log_watcher)
+    bgp_state_get.update_neigh_states.return_value = 0
+    log_watcher.read_changes.return_value = []
+    with patch.object(bgpmon.time, 'time', return_value=1000.0):
+        monitor.start()
+    assert monitor.next_poll == 1000.0 + bgpmon.MIN_POLL_INTERVAL
+
+    # nothing is requested until the next poll or a logged change
+    with patch.object(bgpmon.time, 'time', return_value=1000.5):
+        monitor.step()
+    assert bgp_state_get.get_all_neigh_states.call_count == 1
+
+    # polls without changes back off up to MAX_POLL_INTERVAL
+    now = 1000.0
+    intervals = []
+    for _ in range(6):
+        now = monitor.next_poll
+        with patch.object(bgpmon.time, 'time', return_value=now):
+            monitor.step()
+        intervals.append(monitor.interval)
+    assert intervals == [2, 4, 8, 15, 15, 15]
+
+    # a logged adjacency change is handled immediately and resets the interval
+    log_watcher.read_changes.return_value = [("default", "10.0.0.1", "Down")]
+    bgp_state_get.update_neigh_states.return_value = 1
+    calls = bgp_state_get.get_all_neigh_states.call_count
+    now += 2
+    with patch.object(bgpmon.time, 'time', return_value=now):
+        assert monitor.step() == 1
+    assert bgp_state_get.get_all_neigh_states.call_count == calls + 1
+    assert monitor.interval == bgpmon.MIN_POLL_INTERVAL
+
+    # further changes within MIN_POLL_INTERVAL are coalesced into one request
+    for offset in (0.2, 0.4, 0.6, 0.8):
+        with patch.object(bgpmon.time, 'time', return_value=now + offset):
+            assert monitor.step() == 0
+    assert bgp_state_get.get_all_neigh_states.call_count == calls + 1
+    log_watcher.read_changes.return_value = []
+    bgp_state_get.update_neigh_states.return_value = 0
+    with patch.object(bgpmon.time, 'time', return_value=now + bgpmon.MIN_POLL_INTERVAL):
+        monitor.step()
+    assert bgp_state_get.get_all_neigh_states.call_count == calls + 2
+    assert monitor.interval == bgpmon.MIN_POLL_INTERVAL
+
+
+def test_async_monitor_vtysh_args():
+    monitor = bgpmon.AsyncBgpMonitor(["asic0", "asic12"])
+    assert monitor.vtysh_args("asic12", "show bgp summary") == ["vtysh", "-n", "12", "-c", "show bgp summary"]
+    assert monitor.vtysh_args("", "show bgp summary") == ["vtysh", "-c", "show bgp summary"]
+
+
+def test_async_monitor_refresh(tmp_path):
+    # fake vtysh prints the summary of the asic given by '-n <id>'
+    for asic_id, state in (("0", "Established"), ("1", "Idle")):
+        summary = {"default": {"ipv4Unicast": {"peers": {"10.0.0.1": {"state": state}}}}}
+        (tmp_path / ("asic%s.json" % asic_id)).write_text(json.dumps(summary))
+    vtysh = tmp_path / "vtysh"
+    vtysh.write_text("#!/bin/sh\ncat %s/asic$2.json\n" % tmp_path)
+    vtysh.chmod(0o755)
+
+    monitor = bgpmon.AsyncBgpMonitor(["asic0", "asic1"], vtysh=[str(vtysh)])
+    for bgp_state_get in monitor.bgp_state_gets.values():
+        bgp_state_get.pipe = MagicMock()
+
+    async def refresh_all():
+        return await asyncio.gather(monitor.refresh("asic0"), monitor.refresh("asic1"))
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(refresh_all()) == [1, 1]
+        assert loop.run_until_complete(refresh_all()) == [0, 0]
+    finally:
+        loop.close()
+    monitor.bgp_state_gets["asic0"].pipe.hmset.assert_called_once_with("NEIGH_STATE_TABLE|10.0.0.1", {'state': "Established"})
+    monitor.bgp_state_gets["asic1"].pipe.hmset.assert_called_once_with("NEIGH_STATE_TABLE|10.0.0.1", {'state': "Idle"})
+
+
+def test_async_monitor_namespace_failure():
+    monitor = bgpmon.AsyncBgpMonitor(["asic0", "asic1"])
+    refreshes = {"asic0": 0, "asic1": 0}
+
+    async def refresh(namespace):
+        refreshes[namespace] += 1
+        if namespace == "asic0" and refreshes[namespace] <= 2:
+            raise ValueError("broken vtysh output")
+        return 0
+
+    async def run_monitor():
+        # the failures of asic0 don't stop the monitoring of asic1, asic0 is monitored again after them
+        task = asyncio.ensure_future(monitor.run())
+        while refreshes["asic0"] < 4 or refreshes["asic1"] < 4:
+            await asyncio.sleep(0.001)
+        task.cancel()
+
+    monitor.refresh = refresh
+    loop = asyncio.new_event_loop()
+    try:
+        with patch.object(bgpmon, 'MIN_POLL_INTERVAL', 0.001), patch.object(bgpmon, 'MAX_POLL_INTERVAL', 0.001), \
+                patch.object(bgpmon.syslog, 'syslog') as mocked_syslog:
+            loop.run_until_complete(asyncio.wait_for(run_monitor(), 5))
+    finally:
+        loop.close()
+    assert mocked_syslog.call_count == 2
@@ -55,3 +55,45 @@ def test_directory(mocked_log_err):
     # Test remove_slot() with nonexist table
     directory.remove_slot("db_name", "table_nonexist")
     mocked_log_err.assert_called_with("Directory: Can't remove slot 'db_name__table_nonexist'. The slot doesn't exist")
+
+def test_directory_notify():
+    directory = Directory()
+    calls = []
+    directory.subscribe([("db_name", "table", "key1/attr")], lambda: calls.append("key1"))
+    directory.subscribe([("db_name", "table", "")], lambda: calls.append("slot"))
+    directory.subscribe([("db_name", "table", "*/wild")], lambda: calls.append("wild"))
+    directory.subscribe([("db_name", "other", "")], lambda: calls.append("other"))
+
+    directory.put("db_name", "table", "key2", {"attr": "value"})
+    assert calls == ["slot"]
+
+    calls.clear()
+    directory.put("db_name", "table", "key1", {"attr": "value"})
+    assert calls == ["key1", "slot"]
+
+    calls.clear()
+    directory.put("db_name", "table", "key3", {"wild": "value"})
+    assert calls == ["key1", "slot", "wild"]
+
+    calls.clear()
+    directory.remove("db_name", "table", "key1")
+    directory.put("db_name", "table", "key2", {})
+    assert calls == ["slot", "wild"]
+
+    calls.clear()
+    directory.remove_slot("db_name", "table")
+    directory.put("db_name", "table", "key4", {})
+    assert calls == ["slot"]
+
+def test_directory_notify_scale():
+    directory = Directory()
+    calls = []
+    for i in range(5000):
+        directory.subscribe([("db_name", "table", "key%d/attr" % i)], lambda i=i: calls.append(i))
+    with patch.object(directory, 'path_traverse', wraps=directory.path_traverse) as mocked_path_traverse:
+        for i in range(0, 5000, 2):
+            directory.put("db_name", "table", "key%d" % i, {"attr": "value"})
+        # only subscriptions for the changed key are checked on every put
+        assert mocked_path_traverse.call_count == 2500
+    assert len(calls) == sum(range(1, 2501))
+    assert calls[-2500:] == list(range(0, 5000, 2))
@@ -1,5 +1,9 @@
+import socket
+import threading
+import time
 from unittest.mock import patch
 import bgpcfgd.frr
+import bgpcfgd.vty
 import pytest
 
 def test_constructor():
@@ -66,3 +70,95 @@ def test_restart_peer_groups_fail(mocked_log_crit):
     res = f.restart_peer_groups(["pg_1", "pg_2"])
     assert not res, "Expect False return value"
     mocked_log_crit.assert_called_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='some output', err='some error'")
+
+class FakeVtyServer(object):
+    """ Fake vty unix socket of a FRR daemon. It records received commands """
+    def __init__(self, path, replies=None):
+        self.path = path
+        self.replies = replies or {}  # command -> (status, output)
+        self.commands = []
+        self.sessions = 0
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(5)
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.sessions += 1
+            buf = b''
+            with conn:
+                while True:
+                    data = conn.recv(4096)
+                    if not data:
+                        break
+                    buf += data
+                    while b'\0' in buf:
+                        command, buf = buf.split(b'\0', 1)
+                        command = command.decode()
+                        self.commands.append(command)
+                        status, output = self.replies.get(command, (0, ""))
+                        conn.sendall(output.encode() + b'\0\0\0' + bytes([status]))
+
+    def close(self):
+        self.sock.close()
+
+def test_vty_client(tmp_path):
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"), {"show version": (0, "FRRouting 7.5" * 10000)})
+    with bgpcfgd.vty.VtyClient(server.path) as client:
+        assert client.execute("show version") == (0, "FRRouting 7.5" * 10000)
+    assert bgpcfgd.vty.VtyClient.probe(server.path)
+    server.close()
+    assert not bgpcfgd.vty.VtyClient.probe(str(tmp_path / "zebra.vty"))
+
+def test_wait_for_daemons_vty(tmp_path):
+    forks = []
+    bgpcfgd.frr.run_command = lambda cmd, **kwargs: forks.append(cmd) or (1, "", "")
+    f = bgpcfgd.frr.FRR(["bgpd", "zebra"], vty_dir=str(tmp_path))
+    servers = [FakeVtyServer(str(tmp_path / "bgpd.vty"))]
+    timer = threading.Timer(0.3, lambda: servers.append(FakeVtyServer(str(tmp_path / "zebra.vty"))))
+    timer.start()
+    start = time.time()
+    f.wait_for_daemons(5)
+    elapsed = time.time() - start
+    timer.join()
+    assert 0.3 <= elapsed < 1.0  # exponential backoff detects the daemon soon after it started
+    assert forks == []  # no vtysh calls
+    for server in servers:
+        server.close()
+
+def test_wait_for_daemons_vty_fail(tmp_path):
+    f = bgpcfgd.frr.FRR(["bgpd"], vty_dir=str(tmp_path))
+    with pytest.raises(RuntimeError):
+        f.wait_for_daemons(1)
+
+@patch('bgpcfgd.frr.log_crit')
+def test_restart_peer_groups_vty(mocked_log_crit, tmp_path):
+    forks = []
+    bgpcfgd.frr.run_command = lambda cmd, **kwargs: forks.append(cmd) or (0, "", "")
+    server = FakeVtyServer(str(tmp_path / "bgpd.vty"), {
+        "clear bgp peer-group pg_2 soft in": (1, "% Unknown peer-group"),
+    })
+    f = bgpcfgd.frr.FRR(["bgpd"], vty_dir=str(tmp_path))
+    res = f.restart_peer_groups(["pg_3", "pg_1", "pg_2", "pg_1"])
+    assert not res, "Expect False return value"
+    assert server.sessions == 1
+    assert server.commands == [
+        "enable",
+        "clear bgp peer-group pg_1 soft in",
+        "clear bgp peer-group pg_2 soft in",
+        "clear bgp peer-group pg_3 soft in",
+    ]
+    assert forks == []
+    mocked_log_crit.assert_called_once_with("Can't restart bgp peer-group 'pg_2'. rc='1', out='% Unknown peer-group', err=''")
+    server.close()
+
+def test_restart_peer_groups_empty():
+    bgpcfgd.frr.run_command = lambda cmd: pytest.fail("Unexpected call %s" % cmd)
+    f = bgpcfgd.frr.FRR(["abc", "cde"])
+    assert f.restart_peer_groups([])
@@ -821,3 +821,94 @@ def test_set_tag_change():
             "ip route 10.1.0.0/24 10.0.0.57 tag 2",
         ]
     )
+
+def bulk_test(mgr, events):
+    pushed = []
+    mgr.cfg_mgr.push_list = lambda cmds: pushed.append(cmds)
+    mgr.handler_bulk(events)
+    return pushed
+
+def test_bulk_set_several_vrfs():
+    mgr = constructor()
+    pushed = bulk_test(mgr, [
+        ("10.1.0.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.57"}),
+        ("vrfRED|10.1.1.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.59"}),
+        ("10.1.2.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.57"}),
+        ("vrfRED|10.1.3.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.61"}),
+    ])
+    assert pushed == [[
+        "ip route 10.1.0.0/24 10.0.0.57 tag 1",
+        "ip route 10.1.2.0/24 10.0.0.57 tag 1",
+        "route-map STATIC_ROUTE_FILTER permit 10",
+        " match tag 1",
+        "router bgp 65100",
+        " address-family ipv4",
+        "  redistribute static route-map STATIC_ROUTE_FILTER",
+        " address-family ipv6",
+        "  redistribute static route-map STATIC_ROUTE_FILTER",
+        "ip route 10.1.1.0/24 10.0.0.59 vrf vrfRED tag 1",
+        "ip route 10.1.3.0/24 10.0.0.61 vrf vrfRED tag 1",
+        "route-map STATIC_ROUTE_FILTER permit 10",
+        " match tag 1",
+        "router bgp 65100 vrf vrfRED",
+        " address-family ipv4",
+        "  redistribute static route-map STATIC_ROUTE_FILTER",
+        " address-family ipv6",
+        "  redistribute static route-map STATIC_ROUTE_FILTER",
+    ]]
+    assert set(mgr.static_routes["default"].keys()) == {"10.1.0.0/24", "10.1.2.0/24"}
+    assert set(mgr.static_routes["vrfRED"].keys()) == {"10.1.1.0/24", "10.1.3.0/24"}
+
+def test_bulk_replace_last_route():
+    mgr = constructor()
+    bulk_test(mgr, [("vrfRED|10.1.1.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.59"})])
+    # the vrf never becomes empty at the end of the batch, so redistribution is not touched
+    pushed = bulk_test(mgr, [
+        ("vrfRED|10.1.1.0/24", swsscommon.DEL_COMMAND, {}),
+        ("vrfRED|10.1.2.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.61"}),
+    ])
+    assert pushed == [[
+        "no ip route 10.1.1.0/24 10.0.0.59 vrf vrfRED tag 1",
+        "ip route 10.1.2.0/24 10.0.0.61 vrf vrfRED tag 1",
+    ]]
+
+def test_bulk_del_all():
+    mgr = constructor()
+    bulk_test(mgr, [
+        ("vrfRED|10.1.1.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.59"}),
+        ("vrfRED|10.1.2.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.61"}),
+    ])
+    pushed = bulk_test(mgr, [
+        ("vrfRED|10.1.1.0/24", swsscommon.DEL_COMMAND, {}),
+        ("vrfRED|10.1.2.0/24", swsscommon.DEL_COMMAND, {}),
+    ])
+    assert pushed == [[
+        "no ip route 10.1.1.0/24 10.0.0.59 vrf vrfRED tag 1",
+        "no ip route 10.1.2.0/24 10.0.0.61 vrf vrfRED tag 1",
+        "router bgp 65100 vrf vrfRED",
+        " address-family ipv4",
+        "  no redistribute static route-map STATIC_ROUTE_FILTER",
+        " address-family ipv6",
+        "  no redistribute static route-map STATIC_ROUTE_FILTER",
+        "no route-map STATIC_ROUTE_FILTER",
+    ]]
+    assert not mgr.static_routes["vrfRED"]
+
+def test_bulk_invalid_route():
+    mgr = constructor(skip_bgp_asn=True)
+    pushed = bulk_test(mgr, [
+        ("10.1.0.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.57,10.0.0.59", "ifname": "PortChannel0001"}),
+        ("10.1.1.0/24", swsscommon.SET_COMMAND, {"nexthop": "10.0.0.57"}),
+    ])
+    assert pushed == [["ip route 10.1.1.0/24 10.0.0.57 tag 1"]]
+    assert mgr.set_queue == [("10.1.0.0/24", {"nexthop": "10.0.0.57,10.0.0.59", "ifname": "PortChannel0001"})]
+    assert mgr.vrf_pending_redistribution == {"default"}
+
+def test_bulk_scale():
+    mgr = constructor()
+    events = [("Vrf%d|10.%d.%d.0/24" % (i % 10, i // 256, i % 256), swsscommon.SET_COMMAND, {"nexthop": "10.255.0.1"}) for i in range(10000)]
+    pushed = bulk_test(mgr, events)
+    assert len(pushed) == 1
+    assert sum(1 for cmd in pushed[0] if cmd.startswith("ip route ")) == 10000
+    assert sum(1 for cmd in pushed[0] if cmd.startswith("router bgp ")) == 10
+    assert sum(len(routes) for routes in mgr.static_routes.values()) == 10000
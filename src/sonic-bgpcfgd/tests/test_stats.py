@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from bgpcfgd.stats import Histogram, Stats
+
+
+def test_histogram():
+    h = Histogram()
+    h.observe(0.0005)
+    h.observe(0.002)
+    h.observe(0.002)
+    h.observe(10.0)
+    res = h.to_dict()
+    assert res['count'] == '4'
+    assert res['max_ms'] == '10000.000'
+    assert res['le_1ms'] == '1'
+    assert res['le_5ms'] == '2'
+    assert res['le_5000ms'] == '0'
+    assert res['gt_5000ms'] == '1'
+
+def test_stats_disabled():
+    s = Stats()
+    s.inc("mgr", "events")
+    s.gauge("mgr", "queue", 10)
+    s.observe("mgr", "latency", 0.1)
+    with s.timer("mgr", "timer"):
+        pass
+    assert s.to_entries() == {}
+    assert not s.publish_required()
+
+def test_stats_enabled():
+    s = Stats()
+    s.enable(interval=0)
+    s.inc("mgr", "events")
+    s.inc("mgr", "events", 2)
+    s.gauge("mgr", "queue", 10)
+    with s.timer("mgr", "set_handler"):
+        pass
+    entries = s.to_entries()
+    assert entries["mgr"] == {"events": "3", "queue": "10"}
+    assert entries["mgr|set_handler"]["count"] == "1"
+    assert s.publish_required()
+    s.mark_published()
+
+@patch('bgpcfgd.stats.log_notice')
+def test_stats_dump(mocked_log_notice):
+    s = Stats()
+    s.enable()
+    s.inc("mgr", "events")
+    s.request_dump()
+    assert s.dump_requested
+    s.dump()
+    assert not s.dump_requested
+    mocked_log_notice.assert_called_once_with("bgpcfgd stats mgr: events=1")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the frrcfgd vtysh command channel (BgpdClientMgr).
+
+Fake FRR daemons (fake_frr.FakeVtyDaemon) listen on vty sockets in a temporary directory and execute
+every command with a fixed latency. Several threads run CONFIG_DB-like updates through
+run_vtysh_command() for tables of different daemons, while proxy clients send show commands through
+bgpd_client_sock. Every mode reports the total time, the update latency and the number of writes
+received by the daemons:
+  serialized: one command per write and one lock for all daemons, like the channel worked before
+  pipelined:  one write per batch of commands, per-daemon locks and concurrent proxy clients
+Run it from src/sonic-frr-mgmt-framework:
+
+    python3 benchmark/bgpd_client_channel.py --updates 50 --latency-ms 2
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import types
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_swsssdk
+from fake_frr import FakeVtyDaemon
+
+TABLE_COMMANDS = {
+    'BGP_NEIGHBOR': ["configure terminal", "router bgp 65100", "neighbor 10.0.0.%d remote-as 65200",
+                     "neighbor 10.0.0.%d description peer", "neighbor 10.0.0.%d timers 3 9"],
+    'OSPFV2_ROUTER_AREA_NETWORK': ["configure terminal", "router ospf", "network 10.%d.0.0/16 area 0"],
+    'STATIC_ROUTE': ["configure terminal", "ip route 20.%d.0.0/16 10.0.0.1"],
+    'PIM_INTERFACE': ["configure terminal", "interface Ethernet%d", "ip pim"],
+}
+
+
+def install_fake_swsssdk():
+    module = types.ModuleType('swsssdk')
+    module.ConfigDBConnector = fake_swsssdk.ConfigDBConnector
+    sys.modules['swsssdk'] = module
+
+
+def proxy_request(addr, data):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(addr)
+    data = data.encode()
+    sock.sendall(struct.pack('>I', len(data)) + data)
+    while sock.recv(65536):
+        pass
+    sock.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))] if values else 0.0
+
+
+def run_mode(mode, args):
+    from frrcfgd.frrcfgd import BgpdClientMgr
+    vty_dir = tempfile.mkdtemp()
+    daemons = [FakeVtyDaemon(name, vty_dir, args.latency_ms / 1000.0) for name in BgpdClientMgr.ALL_DAEMONS]
+    BgpdClientMgr.FRR_VTY_ADDR = os.path.join(vty_dir, '%s.vty')
+    BgpdClientMgr.PROXY_SERVER_ADDR = os.path.join(vty_dir, 'bgpd_client_sock')
+    mgr = BgpdClientMgr()
+    if mode == 'serialized':
+        mgr.MAX_BATCH_SIZE = 1
+        shared_lock = threading.RLock()
+        mgr.daemon_locks = {daemon: shared_lock for daemon in mgr.daemon_locks}
+    mgr.start()
+
+    latencies = []
+    lat_lock = threading.Lock()
+
+    def updates(table):
+        for idx in range(args.updates):
+            command = 'vtysh ' + ' '.join("-c '%s'" % (cmd % idx if '%d' in cmd else cmd) for cmd in TABLE_COMMANDS[table])
+            start = time.time()
+            mgr.run_vtysh_command(table, command, None)
+            with lat_lock:
+                latencies.append(time.time() - start)
+
+    def shows():
+        for idx in range(args.proxy_requests):
+            proxy_request(mgr.PROXY_SERVER_ADDR, '[bgpd]' + '\n'.join('show bgp neighbors 10.0.0.%d' % n for n in range(args.show_lines)))
+
+    threads = [threading.Thread(target=updates, args=(table,)) for table in TABLE_COMMANDS]
+    threads += [threading.Thread(target=shows) for _ in range(args.proxy_clients)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    stats = mgr.get_batch_stats()
+    mgr.shutdown()
+    report = {
+        'seconds': round(elapsed, 3),
+        'update_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'update_p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'daemon_writes': sum(daemon.writes for daemon in daemons),
+        'batches': {daemon: {'batches': s['batches'], 'commands': s['commands'],
+                             'avg_ms': round(s['total_latency'] / s['batches'] * 1000, 2),
+                             'max_ms': round(s['max_latency'] * 1000, 2)} for daemon, s in sorted(stats.items())},
+    }
+    for daemon in daemons:
+        daemon.stop()
+    shutil.rmtree(vty_dir, ignore_errors=True)
+    return report
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_swsssdk()
+    return {mode: run_mode(mode, args) for mode in ('serialized', 'pipelined')}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="frrcfgd vtysh command channel benchmark")
+    parser.add_argument("--updates", type=int, default=50, help="number of updates of every table")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="time a fake daemon spends on a command")
+    parser.add_argument("--proxy-clients", type=int, default=2, help="number of concurrent proxy clients")
+    parser.add_argument("--proxy-requests", type=int, default=5, help="number of requests of every proxy client")
+    parser.add_argument("--show-lines", type=int, default=10, help="number of show commands in a proxy request")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
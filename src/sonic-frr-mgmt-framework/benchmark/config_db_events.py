@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of CONFIG_DB event delivery in frrcfgd ExtConfigDBConnector.
+
+A local redis-server with keyspace notifications enabled is started in a temporary directory.
+A writer updates entries of tables handled by frrcfgd (several updates of every key) and of a table
+which is not handled. Every update is hset of new fields followed by hdel of a stale field, like
+ConfigDBConnector.set_entry() does it, so it fires two notifications. The benchmark measures the time until the handlers have received the final
+data of every key, the time until all notifications were processed, the number of redis round trips
+and the number of handler calls for:
+  legacy:  psubscribe to the whole CONFIG_DB keyspace, one hgetall per notification
+  batched: psubscribe to the handled tables only, notifications drained in batches,
+           deduplicated by key and fetched with one pipeline per batch
+swsssdk is replaced by fake_swsssdk. Requires redis-server in PATH and the redis python package.
+Run it from src/sonic-frr-mgmt-framework:
+
+    python3 benchmark/config_db_events.py --keys 5000 --updates-per-key 3
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+
+import redis
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_swsssdk
+
+HANDLED_TABLES = ['BGP_GLOBALS', 'BGP_NEIGHBOR', 'BGP_NEIGHBOR_AF', 'ROUTE_MAP', 'PREFIX']
+
+
+class CountingRedis(redis.Redis):
+    """ Redis client, which counts round trips to the server """
+    round_trips = 0
+
+    def execute_command(self, *args, **options):
+        CountingRedis.round_trips += 1
+        return super(CountingRedis, self).execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super(CountingRedis, self).pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        def counting_execute(*args, **kwargs):
+            CountingRedis.round_trips += 1
+            return execute(*args, **kwargs)
+        pipe.execute = counting_execute
+        return pipe
+
+
+class LocalRedis(object):
+    """ redis-server, which listens on a unix socket in a temporary directory """
+    def __init__(self, redis_server):
+        self.dir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.dir, "redis.sock")
+        self.proc = subprocess.Popen([redis_server, "--port", "0", "--unixsocket", self.socket,
+                                      "--notify-keyspace-events", "KA", "--save", "", "--appendonly", "no",
+                                      "--dir", self.dir], stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            if os.path.exists(self.socket):
+                break
+            time.sleep(0.05)
+
+    def client(self, cls=redis.Redis):
+        return cls(unix_socket_path=self.socket, decode_responses=True)
+
+    def stop(self):
+        self.proc.terminate()
+        self.proc.wait()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def install_fake_swsssdk():
+    module = types.ModuleType('swsssdk')
+    module.ConfigDBConnector = fake_swsssdk.ConfigDBConnector
+    sys.modules['swsssdk'] = module
+
+
+def legacy_connector_class(ExtConfigDBConnector):
+    """ ExtConfigDBConnector with the event delivery used before the batched one """
+    class LegacyExtConfigDBConnector(ExtConfigDBConnector):
+        def sub_msg_handler(self, msg_item):
+            if msg_item['type'] == 'pmessage':
+                key = msg_item['channel'].split(':', 1)[1]
+                try:
+                    (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
+                    if table in self.handlers:
+                        client = self.get_redis_client(self.db_name)
+                        data = self.raw_to_typed(client.hgetall(key), table)
+                        self._ConfigDBConnector__fire(table, row, data)
+                except ValueError:
+                    pass
+
+        def listen(self):
+            self.pubsub = self.get_redis_client(self.db_name).pubsub()
+            self.pubsub.psubscribe(**{"__keyspace@{}__:*".format(self.get_dbid(self.db_name)): self.sub_msg_handler})
+            self.sub_thread = self.pubsub.run_in_thread(sleep_time=0.01)
+    return LegacyExtConfigDBConnector
+
+
+def run_mode(mode, local_redis, args):
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    writer = local_redis.client()
+    writer.flushall()
+    fake_swsssdk.ConfigDBConnector.redis_client = local_redis.client(CountingRedis)
+
+    cls = legacy_connector_class(ExtConfigDBConnector) if mode == 'legacy' else ExtConfigDBConnector
+    config_db = cls()
+    received = {}
+    calls = [0]
+    last_call = [0.0]
+    done = threading.Event()
+    expected_version = str(args.updates_per_key - 1)
+
+    def handler(table, key, data):
+        calls[0] += 1
+        last_call[0] = time.time()
+        received[(table, key)] = data['version'] if data else None
+        if len(received) == args.keys and all(v == expected_version for v in received.values()):
+            done.set()
+
+    for table in HANDLED_TABLES:
+        config_db.subscribe(table, handler)
+    config_db.listen()
+    time.sleep(0.1)  # let the subscription settle
+    CountingRedis.round_trips = 0
+
+    start = time.time()
+    pipe = writer.pipeline(transaction=False)
+    for version in range(args.updates_per_key):
+        for i in range(args.keys):
+            table = HANDLED_TABLES[i % len(HANDLED_TABLES)]
+            key = "%s|default|10.%d.%d.%d" % (table, i // 65536, (i // 256) % 256, i % 256)
+            pipe.hset(key, mapping={'version': str(version), 'admin_status': 'up', 'asn': str(65000 + i % 1000),
+                                    'stale_field_%d' % version: '1'})
+            pipe.hdel(key, 'stale_field_%d' % (version - 1))
+            if i % 1000 == 999:
+                pipe.execute()
+        for i in range(args.unhandled_keys):
+            pipe.hset("PORT|Ethernet%d" % i, mapping={'version': str(version), 'mtu': '9100', 'stale_field_%d' % version: '1'})
+        pipe.execute()
+    write_time = time.time() - start
+    completed = done.wait(args.timeout)
+    elapsed = time.time() - start
+    # wait until the remaining notifications are processed
+    while time.time() - last_call[0] < 0.5:
+        time.sleep(0.1)
+
+    config_db.sub_thread.stop()
+    config_db.sub_thread.join(5)
+    return {
+        'completed': completed,
+        'seconds': round(elapsed, 3),
+        'all_processed_seconds': round(last_call[0] - start, 3),
+        'write_seconds': round(write_time, 3),
+        'notifications': (2 * args.keys + args.unhandled_keys) * args.updates_per_key,
+        'handler_calls': calls[0],
+        'redis_round_trips': CountingRedis.round_trips,
+    }
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_swsssdk()
+    local_redis = LocalRedis(args.redis_server)
+    try:
+        return {mode: run_mode(mode, local_redis, args) for mode in ('legacy', 'batched')}
+    finally:
+        local_redis.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="frrcfgd CONFIG_DB event delivery benchmark")
+    parser.add_argument("--keys", type=int, default=5000, help="number of entries of the handled tables")
+    parser.add_argument("--updates-per-key", type=int, default=3, help="number of updates of every entry")
+    parser.add_argument("--unhandled-keys", type=int, default=1000, help="number of entries of a not handled table")
+    parser.add_argument("--timeout", type=float, default=120.0, help="time to wait for the handlers")
+    parser.add_argument("--redis-server", default="redis-server", help="path to redis-server")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
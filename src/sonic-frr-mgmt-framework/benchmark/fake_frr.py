@@ -0,0 +1,77 @@
+"""
+Fake FRR daemons for the frrcfgd offline benchmarks.
+FakeVtyDaemon listens on a vty unix socket and speaks the protocol used by vtysh: every command is
+terminated by a zero byte and every reply by three zero bytes followed by the return code.
+Commands of one connection are executed one after another with a configurable latency, like FRR does.
+Commands starting with fail_prefix return error code 1, commands starting with slow_prefix take
+slow_latency seconds.
+"""
+import os
+import socket
+import threading
+import time
+
+
+class FakeVtyDaemon(object):
+    def __init__(self, name, vty_dir, latency=0.0, fail_prefix='fail', slow_prefix='slow', slow_latency=1.0):
+        self.name = name
+        self.path = os.path.join(vty_dir, '%s.vty' % name)
+        self.latency = latency
+        self.fail_prefix = fail_prefix
+        self.slow_prefix = slow_prefix
+        self.slow_latency = slow_latency
+        self.commands = []  # (receive time, command)
+        self.writes = 0  # number of reads, which returned at least one command
+        self.lock = threading.Lock()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen(16)
+        self.thread = threading.Thread(target=self.accept_loop, daemon=True)
+        self.thread.start()
+
+    def accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve, args=(conn,), daemon=True).start()
+
+    def serve(self, conn):
+        buf = b''
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                buf += data
+                *commands, buf = buf.split(b'\0')
+                if commands:
+                    with self.lock:
+                        self.writes += 1
+                for command in commands:
+                    command = command.decode()
+                    with self.lock:
+                        self.commands.append((time.time(), command))
+                    if command.startswith(self.slow_prefix):
+                        time.sleep(self.slow_latency)
+                    elif self.latency:
+                        time.sleep(self.latency)
+                    ret_code = 1 if command.startswith(self.fail_prefix) else 0
+                    try:
+                        conn.sendall(('%s: %s' % (self.name, command)).encode() + b'\0\0\0' + bytes([ret_code]))
+                    except OSError:
+                        # client closed the connection
+                        return
+
+    def received(self):
+        """ Commands received by the daemon, except the initial enable command """
+        with self.lock:
+            return [command for _, command in self.commands if command != 'enable']
+
+    def stop(self):
+        self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,63 @@
+"""
+Fake swsssdk module for the frrcfgd offline benchmarks.
+ConfigDBConnector implements the part of swsssdk API, which is used by ExtConfigDBConnector,
+on top of a redis client given by the benchmark. It lets the benchmarks run against a local redis-server.
+"""
+
+
+class ConfigDBConnector(object):
+    TABLE_NAME_SEPARATOR = '|'
+    KEY_SEPARATOR = '|'
+    redis_client = None  # redis client of the local redis-server, set by the benchmark
+
+    def __init__(self, **kwargs):
+        self.handlers = {}
+        self.db_name = 'CONFIG_DB'
+
+    def connect(self, wait_for_init=True, retry_on=False):
+        pass
+
+    def get_dbid(self, db_name):
+        return 0
+
+    def get_redis_client(self, db_name):
+        return self.redis_client
+
+    def subscribe(self, table, handler):
+        self.handlers[table] = handler
+
+    def serialize_key(self, key):
+        if isinstance(key, tuple):
+            return self.KEY_SEPARATOR.join(key)
+        return str(key)
+
+    def deserialize_key(self, key):
+        tokens = key.split(self.KEY_SEPARATOR)
+        return tuple(tokens) if len(tokens) > 1 else key
+
+    def raw_to_typed(self, raw_data):
+        if raw_data is None:
+            return None
+        typed_data = {}
+        for raw_key, value in raw_data.items():
+            if raw_key.endswith('@'):
+                typed_data[raw_key[:-1]] = value.split(',')
+            else:
+                typed_data[raw_key] = value
+        return typed_data
+
+    def get_table(self, table):
+        client = self.get_redis_client(self.db_name)
+        data = {}
+        for key in client.keys(table + self.TABLE_NAME_SEPARATOR + '*'):
+            row = key.split(self.TABLE_NAME_SEPARATOR, 1)[1]
+            data[self.deserialize_key(row)] = self.raw_to_typed(client.hgetall(key))
+        return data
+
+    def get_entry(self, table, key):
+        client = self.get_redis_client(self.db_name)
+        return self.raw_to_typed(client.hgetall(table + self.TABLE_NAME_SEPARATOR + self.serialize_key(key))) or {}
+
+    def __fire(self, table, key, data):
+        handler = self.handlers[table]
+        handler(table, key, data)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the frrcfgd command generation from key maps.
+
+Synthetic updates of BGP_NEIGHBOR, BGP_NEIGHBOR_AF and ROUTE_MAP entries are turned into vtysh commands with
+BGPKeyMapList.run_command(). Commands are collected instead of being sent to FRR. The benchmark compares:
+  legacy:   key map list is built from the table key map for every update and every map entry is parsed
+            and checked against the update, commands are formatted every time
+  compiled: key map lists are compiled once per table, only map entries referring to the updated attributes
+            are checked, and commands of the common handler are cached
+and verifies that both produce the same commands. Run it from src/sonic-frr-mgmt-framework:
+
+    python3 benchmark/key_map_dispatch.py --entries 2000 --rounds 3
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import types
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_swsssdk
+
+swsssdk = types.ModuleType('swsssdk')
+swsssdk.ConfigDBConnector = fake_swsssdk.ConfigDBConnector
+sys.modules['swsssdk'] = swsssdk
+
+import syslog
+from frrcfgd import frrcfgd
+
+
+class LegacyBGPKeyMapList(frrcfgd.BGPKeyMapList):
+    """ BGPKeyMapList with the command generation used before the compiled one """
+    def __init__(self, key_map_list, table_name, table_key=None):
+        super(LegacyBGPKeyMapList, self).__init__(key_map_list, table_name, table_key)
+        for _, key_map in self:
+            key_map.cmd_cache = None
+
+    def run_command(self, daemon, table, data, prefix_list=None, *upper_vals):
+        start_idx = len(upper_vals)
+        ret_val = False
+        run_cmd_cnt = 0
+        for db_field, key_map in self:
+            merge_vals = False
+            if type(db_field) is not list and type(db_field) is not tuple:
+                db_field = [db_field]
+            elif type(db_field) is tuple:
+                db_field = list(db_field)
+                merge_vals = True
+
+            idx = 0
+            req_idx_list = []
+            key_list_list = []
+            opt_idx_list = set()
+            run_cmd = True
+            for dkey in db_field:
+                optional = False
+                if len(dkey) > 0 and dkey[0] == '+':
+                    if len(dkey) > 1 and dkey[1] == '+':
+                        opt_idx_list.add(idx)
+                        dkey = dkey[2:]
+                    else:
+                        dkey = dkey[1:]
+                    optional = True
+                else:
+                    req_idx_list.append(idx)
+                key_list = []
+                for k in dkey.split('&'):
+                    if k in data and isinstance(data[k], frrcfgd.CachedDataWithOp):
+                        key_list.append(k)
+                if not optional and len(key_list) == 0:
+                    run_cmd = False
+                    break
+                if len(key_list) == 0:
+                    if len(key_list_list) == 0:
+                        key_list_list.append([None])
+                    else:
+                        for k_lst in key_list_list:
+                            k_lst.append(None)
+                else:
+                    new_list = []
+                    if len(key_list_list) == 0:
+                        for k in key_list:
+                            key_list_list.append([k])
+                    else:
+                        for k_lst in key_list_list:
+                            if len(key_list) == 1:
+                                k_lst.append(key_list[0])
+                            else:
+                                for k in key_list:
+                                    new_list.append(k_lst + [k])
+                    if len(new_list) > 0:
+                        key_list_list = new_list
+                idx += 1
+            if not run_cmd:
+                continue
+
+            cmd_list_list = []
+            for key_list in key_list_list:
+                upd_id_list = set()
+                del_id_list = set()
+                no_chg_id_list = set()
+                idx = 0
+                for dkey in key_list:
+                    if dkey is not None:
+                        dval = data[dkey]
+                        if dval.op == frrcfgd.CachedDataWithOp.OP_NONE:
+                            no_chg_id_list.add(idx)
+                        elif dval.op == frrcfgd.CachedDataWithOp.OP_ADD or dval.op == frrcfgd.CachedDataWithOp.OP_UPDATE:
+                            upd_id_list.add(idx)
+                        elif dval.op == frrcfgd.CachedDataWithOp.OP_DELETE:
+                            del_id_list.add(idx)
+                    idx += 1
+                cmd_list = []
+                if len(del_id_list) > 0:
+                    data_val_op = self.get_cmd_data(key_list, req_idx_list, opt_idx_list, data, del_id_list, no_chg_id_list, merge_vals, True)
+                    if data_val_op is not None:
+                        cmd = key_map.get_command(daemon, data_val_op[1], start_idx, *(upper_vals + data_val_op[0]))
+                        if cmd is not None:
+                            cmd_list += cmd
+                        else:
+                            syslog.syslog(syslog.LOG_ERR, 'failed to get del cmd from value: %s' % data_val_op[0])
+                if len(upd_id_list) > 0:
+                    data_val_op = self.get_cmd_data(key_list, req_idx_list, opt_idx_list, data, upd_id_list, no_chg_id_list, merge_vals, False)
+                    if data_val_op is not None:
+                        cmd = key_map.get_command(daemon, data_val_op[1], start_idx, *(upper_vals + data_val_op[0]))
+                        if cmd is not None:
+                            cmd_list += cmd
+                        else:
+                            syslog.syslog(syslog.LOG_ERR, 'failed to get upd cmd from value: %s' % str(data_val_op[0]))
+                if len(cmd_list) > 0:
+                    cmd_list_list.append(cmd_list)
+            cmd_list = []
+            for chk_list in cmd_list_list:
+               if self.is_cmd_list_covered(cmd_list, chk_list):
+                   cmd_list = chk_list
+            failed = False
+            if len(cmd_list) > 0:
+                run_cmd_cnt += 1
+                cmd_prefix = 'vtysh '
+                for pfx in prefix_list:
+                    cmd_prefix += "-c '%s' " % pfx
+                for cmd in cmd_list:
+                    ignore_fail = False
+                    if type(cmd) is tuple:
+                        cmd, ignore_fail = cmd
+                    if not frrcfgd.g_run_command(table, cmd_prefix + "-c '%s'" % cmd, True, key_map.daemons, ignore_fail):
+                        syslog.syslog(syslog.LOG_ERR, 'failed running FRR command: %s' % cmd)
+                        failed = True
+                        break
+                if not failed:
+                    ret_val = True
+            if not failed:
+                for key_list in key_list_list:
+                    for dkey in key_list:
+                        if dkey in data:
+                            data[dkey].status = frrcfgd.CachedDataWithOp.STAT_SUCC
+        if run_cmd_cnt == 0:
+            return True
+        return ret_val
+
+
+class FakeDaemon(object):
+    """ Daemon data used by command handlers """
+    def __init__(self):
+        self.comm_set_list = {}
+        self.extcomm_set_list = {}
+        self.as_path_set_list = {}
+
+
+def make_updates(args):
+    """ Return list of (table, key map, table key, prefix list, upper values, data) of the synthetic updates """
+    def data(attrs):
+        return {k: frrcfgd.CachedDataWithOp(v, frrcfgd.CachedDataWithOp.OP_ADD) for k, v in attrs.items()}
+    prefix = ['configure terminal', 'router bgp 65100']
+    af_prefix = prefix + ['address-family ipv4 unicast']
+    updates = []
+    for i in range(args.entries):
+        peer = '10.%d.%d.%d' % (i // 65536, (i // 256) % 256, i % 256)
+        nbr_map = frrcfgd.BGPConfigDaemon.tbl_to_key_map['BGP_NEIGHBOR']
+        updates.append(('BGP_NEIGHBOR', nbr_map, None, prefix, (peer,),
+                        data({'asn': str(65200 + i % 4), 'peer_group_name': 'PG%d' % (i % 4), 'name': 'peer%d' % i,
+                              'admin_status': 'true', 'keepalive': '30', 'holdtime': '90', 'bfd': 'true'})))
+        af_map = frrcfgd.BGPConfigDaemon.tbl_to_key_map['BGP_NEIGHBOR_AF']
+        updates.append(('BGP_NEIGHBOR_AF', af_map, {'admin_status': 'ipv4'}, af_prefix, (peer,),
+                        data({'admin_status': 'true', 'send_community': 'both', 'route_map_in': 'RM_IN',
+                              'route_map_out': 'RM_OUT', 'soft_reconfiguration_in': 'true'})))
+        rm_map = frrcfgd.BGPConfigDaemon.tbl_to_key_map['ROUTE_MAP']
+        updates.append(('ROUTE_MAP', rm_map, {}, ['configure terminal', 'route-map RM%d permit 10' % (i % 100)], (),
+                        data({'route_operation': 'permit', 'set_local_pref': str(100 + i % 10), 'match_tag': str(i % 50),
+                              'set_origin': 'IGP', 'match_as_path': 'AS_PATH_%d' % (i % 20)})))
+    return updates
+
+
+def run_mode(mode, updates, args):
+    commands = []
+    frrcfgd.g_run_command = lambda table, command, use_bgpd_client, daemons, ignore_fail=False: commands.append(command) or True
+    daemon = FakeDaemon()
+    registry = {}
+    start = time.time()
+    for _ in range(args.rounds):
+        for table, key_map_list, tbl_key, prefix, upper_vals, data in updates:
+            if mode == 'legacy':
+                key_map = LegacyBGPKeyMapList(key_map_list, table, tbl_key)
+            else:
+                reg_key = (table, tuple(sorted(tbl_key.items())) if tbl_key else None)
+                key_map = registry.get(reg_key)
+                if key_map is None:
+                    key_map = registry[reg_key] = frrcfgd.BGPKeyMapList(key_map_list, table, tbl_key)
+            key_map.run_command(daemon, table, data, prefix, *upper_vals)
+    elapsed = time.time() - start
+    return elapsed, commands
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    syslog.syslog = lambda *args: None
+    updates = make_updates(args)
+    report = {'updates': len(updates) * args.rounds}
+    results = {}
+    for mode in ('legacy', 'compiled'):
+        elapsed, commands = run_mode(mode, updates, args)
+        results[mode] = commands
+        report[mode] = {'seconds': round(elapsed, 3), 'commands': len(commands),
+                        'us_per_update': round(elapsed / report['updates'] * 1e6, 1)}
+    report['same_commands'] = results['legacy'] == results['compiled']
+    report['speedup'] = round(report['legacy']['seconds'] / report['compiled']['seconds'], 2)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="frrcfgd key map command generation benchmark")
+    parser.add_argument("--entries", type=int, default=2000, help="number of neighbors and route-map updates")
+    parser.add_argument("--rounds", type=int, default=3, help="number of times every update is processed")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of prefix-set, neighbor-set, community-set and AS path set updates in frrcfgd.
+
+A prefix set and a neighbor set of --entries entries, a community set and an AS path set of --members members
+are configured, then --edits random edits are applied to them: action of a prefix is changed, a prefix is
+deleted or added, addresses of the neighbor set and members of the community and AS path sets are replaced.
+Commands are recorded instead of being sent to FRR and applied to a model of FRR prefix-lists, which numbers
+entries configured without a sequence number and matches them by content like FRR does. The benchmark compares:
+  legacy:      commands generated like before: a changed prefix is deleted and added again without sequence
+               number, a changed set is deleted and all its members are added again one command at a time
+  incremental: BGPConfigDaemon handlers, which emit only changed entries, without sequence number, and
+               send the changes of a set or prefix in one vtysh command
+and reports the vtysh calls, FRR commands, FRR time estimated from --vtysh-call-ms and --command-ms,
+prefix-list entries moved to another sequence number and whether the modeled FRR prefix-lists match CONFIG_DB
+at the end. The incremental mode also reports the time spent in the frrcfgd handlers.
+swsssdk is replaced by fake_swsssdk. Requires redis-server in PATH and the redis python package.
+Run it from src/sonic-frr-mgmt-framework:
+
+    python3 benchmark/policy_diff.py --entries 10000 --edits 500
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_swsssdk
+from config_db_events import LocalRedis, install_fake_swsssdk
+
+VTYSH_ARG = re.compile(r"-c '([^']*)'")
+PREFIX_LIST_CMD = re.compile(r'^(no )?ip prefix-list (\S+)(?: seq (\d+))?(?: (permit|deny) (.+))?$')
+
+
+class FrrPrefixLists(object):
+    """ Model of FRR prefix-lists: name -> {prefix: (seq, action)} """
+    def __init__(self):
+        self.lists = {}
+        self.max_seq = {}
+
+    def apply(self, command):
+        match = PREFIX_LIST_CMD.match(command)
+        if match is None:
+            return
+        is_del, name, seq, action, prefix = match.groups()
+        entries = self.lists.setdefault(name, {})
+        if is_del:
+            if action is None:
+                self.lists.pop(name, None)
+                self.max_seq.pop(name, None)
+            elif prefix in entries and (seq is not None or entries[prefix][1] == action):
+                del(entries[prefix])
+            return
+        if seq is None:
+            if prefix in entries and entries[prefix][1] == action:
+                return
+            # sequence number of entry configured without one
+            max_seq = self.max_seq.get(name, 0)
+            seq = max_seq - max_seq % 5 + 5
+        entries[prefix] = (int(seq), action)
+        self.max_seq[name] = max(self.max_seq.get(name, 0), int(seq))
+
+    def seq_of(self, name):
+        return {prefix: seq for prefix, (seq, _) in self.lists.get(name, {}).items()}
+
+    def content(self, name):
+        return sorted((prefix, action) for prefix, (_, action) in self.lists.get(name, {}).items())
+
+
+class LegacyPolicyConfig(object):
+    """ Commands generated for policy tables like frrcfgd did before the incremental update """
+    def __init__(self, run_command):
+        self.run_command = run_command
+        self.prefixes = {}
+        self.sets = {}
+
+    def set_prefix(self, name, prefix, action):
+        if prefix in self.prefixes.get(name, {}):
+            self.run_command(["no ip prefix-list %s %s %s" % (name, self.prefixes[name][prefix], prefix)])
+        if action is None:
+            self.prefixes[name].pop(prefix, None)
+            return
+        self.run_command(["ip prefix-list %s %s %s" % (name, action, prefix)])
+        self.prefixes.setdefault(name, {})[prefix] = action
+
+    def set_members(self, list_cmd, name, members):
+        if name in self.sets:
+            self.run_command(["no %s %s" % (list_cmd, name)])
+        for member in members:
+            self.run_command(["%s %s permit %s" % (list_cmd, name, member)])
+        self.sets[name] = list(members)
+
+
+class ConfigDaemonDriver(object):
+    """ Policy table updates given to BGPConfigDaemon table handlers """
+    def __init__(self, daemon):
+        self.handlers = dict(daemon.table_handler_list)
+        self.handlers['PREFIX_SET']('PREFIX_SET', 'PS', {'mode': 'IPv4'})
+
+    def set_prefix(self, name, prefix, action):
+        key = '%s|%s|exact' % (name, prefix)
+        self.handlers['PREFIX']('PREFIX', key, None if action is None else {'action': action})
+
+    def set_members(self, list_cmd, name, members):
+        if list_cmd == 'ip prefix-list':
+            self.handlers['NEIGHBOR_SET']('NEIGHBOR_SET', name[:-len('_neighbor')], {'address': list(members)})
+        elif list_cmd == 'bgp community-list standard':
+            self.handlers['COMMUNITY_SET']('COMMUNITY_SET', name, {'set_type': 'STANDARD', 'match_action': 'ANY',
+                                                                   'community_member': list(members)})
+        else:
+            self.handlers['AS_PATH_SET']('AS_PATH_SET', name, {'as_path_set_member': list(members)})
+
+
+def make_edits(args):
+    """ Return initial config and list of edits as (kind, arguments) """
+    rnd = random.Random(args.seed)
+    prefix = lambda i: '%d.%d.%d.0/24' % (10 + i // 65536, (i // 256) % 256, i % 256)
+    address = lambda i: '172.%d.%d.%d/32' % (16 + i // 65536, (i // 256) % 256, i % 256)
+    prefixes = {prefix(i): rnd.choice(['permit', 'deny']) for i in range(args.entries)}
+    neighbors = [address(i) for i in range(args.entries)]
+    communities = ['65100:%d' % i for i in range(args.members)]
+    as_paths = ['^%d_' % (65000 + i) for i in range(args.members)]
+    initial = [('prefix', 'PS', p, a) for p, a in prefixes.items()]
+    initial += [('members', 'ip prefix-list', 'NS_neighbor', list(neighbors)),
+                ('members', 'bgp community-list standard', 'CS', list(communities)),
+                ('members', 'bgp as-path access-list', 'AS', list(as_paths))]
+    next_idx = args.entries
+    edits = []
+    for _ in range(args.edits):
+        kind = rnd.choice(['prefix_action', 'prefix_del', 'prefix_add', 'neighbors', 'communities', 'as_paths'])
+        if kind == 'prefix_action':
+            pfx = rnd.choice(list(prefixes))
+            prefixes[pfx] = 'deny' if prefixes[pfx] == 'permit' else 'permit'
+            edits.append(('prefix', 'PS', pfx, prefixes[pfx]))
+        elif kind == 'prefix_del':
+            pfx = rnd.choice(list(prefixes))
+            del prefixes[pfx]
+            edits.append(('prefix', 'PS', pfx, None))
+        elif kind == 'prefix_add':
+            pfx = prefix(next_idx)
+            prefixes[pfx] = 'permit'
+            edits.append(('prefix', 'PS', pfx, 'permit'))
+        else:
+            members, list_cmd, name, make = {'neighbors': (neighbors, 'ip prefix-list', 'NS_neighbor', address),
+                                             'communities': (communities, 'bgp community-list standard', 'CS',
+                                                             lambda i: '65100:%d' % i),
+                                             'as_paths': (as_paths, 'bgp as-path access-list', 'AS',
+                                                          lambda i: '^%d_' % (65000 + i))}[kind]
+            for _ in range(rnd.randint(1, args.max_set_changes)):
+                members[rnd.randrange(len(members))] = make(next_idx)
+                next_idx += 1
+            edits.append(('members', list_cmd, name, list(members)))
+        next_idx += 1
+    expected = {'PS': sorted((p, a) for p, a in prefixes.items()),
+                'NS_neighbor': sorted((n, 'permit') for n in neighbors)}
+    return initial, edits, expected
+
+
+def run_mode(mode, initial, edits, expected, args):
+    from frrcfgd import frrcfgd
+    frr = FrrPrefixLists()
+    stats = {'vtysh_calls': 0, 'frr_commands': 0}
+
+    def record(commands):
+        stats['vtysh_calls'] += 1
+        stats['frr_commands'] += len(commands)
+        for command in commands:
+            frr.apply(command)
+
+    def record_vtysh(table, command, use_bgpd_client, daemons, ignore_fail=False):
+        record([cmd for cmd in VTYSH_ARG.findall(command) if cmd != 'configure terminal'])
+        return True
+
+    frrcfgd.g_run_command = record_vtysh
+    if mode == 'legacy':
+        config = LegacyPolicyConfig(record)
+    else:
+        config = ConfigDaemonDriver(frrcfgd.BGPConfigDaemon())
+
+    def apply(change):
+        if change[0] == 'prefix':
+            config.set_prefix(*change[1:])
+        else:
+            config.set_members(*change[1:])
+
+    for change in initial:
+        apply(change)
+    stats.update(vtysh_calls=0, frr_commands=0)
+    seq_before = {name: frr.seq_of(name) for name in expected}
+    start = time.time()
+    for change in edits:
+        apply(change)
+    elapsed = time.time() - start
+    moved = 0
+    for name in expected:
+        seq_after = frr.seq_of(name)
+        moved += sum(1 for prefix, seq in seq_after.items() if prefix in seq_before[name] and seq_before[name][prefix] != seq)
+    report = {
+        'vtysh_calls': stats['vtysh_calls'],
+        'frr_commands': stats['frr_commands'],
+        'frr_seconds_estimate': round((stats['vtysh_calls'] * args.vtysh_call_ms +
+                                       stats['frr_commands'] * args.command_ms) / 1000.0, 3),
+        'moved_prefix_entries': moved,
+        'frr_matches_config_db': all(frr.content(name) == content for name, content in expected.items()),
+    }
+    if mode != 'legacy':
+        report['handler_seconds'] = round(elapsed, 3)
+    return report
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    import syslog
+    syslog.syslog = lambda *args: None
+    install_fake_swsssdk()
+    local_redis = LocalRedis(args.redis_server)
+    try:
+        local_redis.client().flushall()
+        fake_swsssdk.ConfigDBConnector.redis_client = local_redis.client()
+        initial, edits, expected = make_edits(args)
+        report = {'edits': len(edits)}
+        for mode in ('legacy', 'incremental'):
+            report[mode] = run_mode(mode, initial, edits, expected, args)
+        return report
+    finally:
+        local_redis.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="frrcfgd policy set update benchmark")
+    parser.add_argument("--entries", type=int, default=10000, help="number of entries of prefix set and neighbor set")
+    parser.add_argument("--members", type=int, default=1000, help="number of members of community and AS path set")
+    parser.add_argument("--edits", type=int, default=500, help="number of random edits")
+    parser.add_argument("--max-set-changes", type=int, default=5, help="maximum number of members replaced by a set edit")
+    parser.add_argument("--vtysh-call-ms", type=float, default=2.0, help="estimated time of a vtysh call")
+    parser.add_argument("--command-ms", type=float, default=0.05, help="estimated time FRR spends on a command")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random edits")
+    parser.add_argument("--redis-server", default="redis-server", help="path to redis-server")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the frrcfgd startup in unified config mode.
+
+A local redis-server is filled with a synthetic CONFIG_DB: VRFs, BGP globals of every VRF, peer groups,
+thousands of BGP neighbors and their address families. Fake FRR daemons (fake_frr.FakeVtyDaemon) listen on
+vty sockets in a temporary directory and execute every command with a fixed latency. The benchmark measures
+construction of BGPConfigDaemon, which reads the config and replays it into FRR, for:
+  legacy: every table is read with get_table() twice, every replayed entry is sent to FRR on its own and
+          applying a peer group or a neighbor re-applies their dependent entries read from CONFIG_DB
+  bulk:   all tables are read with one scan and one pipeline, entries are replayed once in dependency order
+          and the replayed config is sent to every daemon as one batch
+swsssdk is replaced by fake_swsssdk. Requires redis-server in PATH and the redis python package.
+Run it from src/sonic-frr-mgmt-framework:
+
+    python3 benchmark/unified_bootstrap.py --neighbors 2000 --vrfs 4
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_swsssdk
+from config_db_events import CountingRedis, LocalRedis, install_fake_swsssdk
+from fake_frr import FakeVtyDaemon
+
+
+def fill_config_db(client, args):
+    pipe = client.pipeline(transaction=False)
+    pipe.hset('DEVICE_METADATA|localhost', mapping={'docker_routing_config_mode': 'unified', 'bgp_asn': '65100'})
+    vrfs = ['default'] + ['Vrf%d' % i for i in range(1, args.vrfs)]
+    for vrf in vrfs:
+        if vrf != 'default':
+            pipe.hset('VRF|%s' % vrf, mapping={'fallback': 'false'})
+        pipe.hset('BGP_GLOBALS|%s' % vrf, mapping={'local_asn': '65100', 'router_id': '10.255.0.1',
+                                                   'holdtime': '180', 'keepalive': '60'})
+        pipe.hset('BGP_GLOBALS_AF|%s|ipv4_unicast' % vrf, mapping={'max_ebgp_paths': '8'})
+        for pg in range(args.peer_groups):
+            pipe.hset('BGP_PEER_GROUP|%s|PG%d' % (vrf, pg), mapping={'asn': str(65200 + pg), 'admin_status': 'up'})
+            pipe.hset('BGP_PEER_GROUP_AF|%s|PG%d|ipv4_unicast' % (vrf, pg), mapping={'admin_status': 'true'})
+    for i in range(args.neighbors):
+        vrf = vrfs[i % len(vrfs)]
+        peer = '10.%d.%d.%d' % (i // 65536, (i // 256) % 256, i % 256)
+        pipe.hset('BGP_NEIGHBOR|%s|%s' % (vrf, peer), mapping={'peer_group_name': 'PG%d' % (i % args.peer_groups),
+                                                              'asn': str(65200 + i % args.peer_groups),
+                                                              'admin_status': 'up', 'name': 'peer%d' % i})
+        pipe.hset('BGP_NEIGHBOR_AF|%s|%s|ipv4_unicast' % (vrf, peer), mapping={'admin_status': 'true',
+                                                                               'send_community': 'both'})
+        if i % 1000 == 999:
+            pipe.execute()
+    pipe.execute()
+
+
+def legacy_daemon_class(frrcfgd):
+    """ BGPConfigDaemon with the config replay used before the bulk one """
+    class LegacyBGPConfigDaemon(frrcfgd.BGPConfigDaemon):
+        def _BGPConfigDaemon__replay_config(self, all_tables):
+            replay_start = time.time()
+            for table, _ in self.table_handler_list:
+                for key, data in self.config_db.get_table(table).items():
+                    upd_data = {}
+                    for upd_key, upd_val in data.items():
+                        upd_data[upd_key] = frrcfgd.CachedDataWithOp(upd_val, frrcfgd.CachedDataWithOp.OP_ADD)
+                    self.bgp_message.put((self.config_db.serialize_key(key), False, table, upd_data))
+                    upd_data_list = []
+                    self._BGPConfigDaemon__update_bgp(upd_data_list)
+                    for table1, key1, data1 in upd_data_list:
+                        table_key = frrcfgd.ExtConfigDBConnector.get_table_key(table1, key1)
+                        self._BGPConfigDaemon__update_cache_data(table_key, data1)
+            self.init_time['replay'] = time.time() - replay_start
+    return LegacyBGPConfigDaemon
+
+
+def run_mode(mode, local_redis, args):
+    from frrcfgd import frrcfgd
+    vty_dir = tempfile.mkdtemp()
+    daemons = [FakeVtyDaemon(name, vty_dir, args.latency_ms / 1000.0) for name in frrcfgd.BgpdClientMgr.ALL_DAEMONS]
+    frrcfgd.BgpdClientMgr.FRR_VTY_ADDR = os.path.join(vty_dir, '%s.vty')
+    frrcfgd.BgpdClientMgr.PROXY_SERVER_ADDR = os.path.join(vty_dir, 'bgpd_client_sock')
+    frrcfgd.bgpd_client = frrcfgd.BgpdClientMgr()
+    get_tables = frrcfgd.ExtConfigDBConnector.get_tables
+    if mode == 'legacy':
+        frrcfgd.ExtConfigDBConnector.get_tables = lambda self, table_list: {table: self.get_table(table) for table in table_list}
+        cls = legacy_daemon_class(frrcfgd)
+    else:
+        cls = frrcfgd.BGPConfigDaemon
+    fake_swsssdk.ConfigDBConnector.redis_client = local_redis.client(CountingRedis)
+    CountingRedis.round_trips = 0
+
+    start = time.time()
+    daemon = cls()
+    elapsed = time.time() - start
+
+    frrcfgd.ExtConfigDBConnector.get_tables = get_tables
+    stats = frrcfgd.bgpd_client.get_batch_stats()
+    frrcfgd.bgpd_client.shutdown()
+    report = {
+        'seconds': round(elapsed, 3),
+        'phases': {phase: round(sec, 3) for phase, sec in daemon.init_time.items()},
+        'redis_round_trips': CountingRedis.round_trips,
+        'frr_commands': sum(len(d.received()) for d in daemons),
+        'frr_writes': sum(d.writes for d in daemons) - len(daemons),
+        'batches': sum(s['batches'] for s in stats.values()),
+    }
+    for d in daemons:
+        d.stop()
+    shutil.rmtree(vty_dir, ignore_errors=True)
+    return report
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_swsssdk()
+    local_redis = LocalRedis(args.redis_server)
+    try:
+        writer = local_redis.client()
+        writer.flushall()
+        fill_config_db(writer, args)
+        return {mode: run_mode(mode, local_redis, args) for mode in ('legacy', 'bulk')}
+    finally:
+        local_redis.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="frrcfgd unified mode startup benchmark")
+    parser.add_argument("--neighbors", type=int, default=2000, help="number of BGP neighbors")
+    parser.add_argument("--vrfs", type=int, default=4, help="number of vrfs including the default vrf")
+    parser.add_argument("--peer-groups", type=int, default=4, help="number of peer groups in every vrf")
+    parser.add_argument("--latency-ms", type=float, default=0.05, help="time a fake daemon spends on a command")
+    parser.add_argument("--redis-server", default="redis-server", help="path to redis-server")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,8 @@ import logging
 import netaddr
 import io
 import struct
+import bisect
+from collections import OrderedDict
 
 class CachedDataWithOp:
     OP_NONE = 0
@@ -43,9 +45,85 @@ class CachedDataWithOp:
         return '(%s, %s)' % (self.data, op_str)
 
 bgpd_client = None
+# per-table handler statistics, collected only when enabled
+handler_stats = None
+
+class HandlerStats(object):
+    """Per-table counters and latency histograms of CONFIG_DB update handling.
+    Phases: event - from reading a batch of updates from CONFIG_DB until the handler of an entry is called,
+    handler - whole table handler, cache - update of cached table data, command - generation of FRR
+    commands, daemon - running commands by bgpd client or vtysh.
+    """
+    PHASES = ['event', 'handler', 'cache', 'command', 'daemon']
+    # upper bounds of histogram buckets in milliseconds, the last bucket has no bound
+    BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000]
+    STATE_TABLE = 'FRRCFGD_HANDLER_STATS'
+    CLIENT_STATE_TABLE = 'FRRCFGD_BGPD_CLIENT_STATS'
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.thread_data = threading.local()
+        self.start_time = time.time()
+    def record(self, table, phase, latency):
+        bucket = bisect.bisect_left(self.BUCKETS_MS, latency * 1000)
+        with self.lock:
+            phase_stats = self.tables.setdefault(table, {}).get(phase, None)
+            if phase_stats is None:
+                phase_stats = self.tables[table][phase] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                                           'hist': [0] * (len(self.BUCKETS_MS) + 1)}
+            phase_stats['count'] += 1
+            phase_stats['total'] += latency
+            phase_stats['hist'][bucket] += 1
+            if latency > phase_stats['max']:
+                phase_stats['max'] = latency
+    def record_daemon(self, table, latency):
+        # time spent in daemons is also accumulated per thread to be excluded from command generation
+        self.thread_data.daemon_time = self.get_daemon_time() + latency
+        self.record(table, 'daemon', latency)
+    def get_daemon_time(self):
+        return getattr(self.thread_data, 'daemon_time', 0.0)
+    def get_stats(self):
+        with self.lock:
+            return {table: {phase: dict(stats, hist = list(stats['hist'])) for phase, stats in phase_list.items()}
+                    for table, phase_list in self.tables.items()}
+    @staticmethod
+    def to_fields(phase_list):
+        fields = {}
+        for phase, stats in phase_list.items():
+            fields['%s_count' % phase] = str(stats['count'])
+            fields['%s_avg_ms' % phase] = '%.3f' % (stats['total'] * 1000 / stats['count'])
+            fields['%s_max_ms' % phase] = '%.3f' % (stats['max'] * 1000)
+            fields['%s_hist' % phase] = ','.join([str(cnt) for cnt in stats['hist']])
+        return fields
+    def dump(self, state_db = None):
+        """Log statistics of all tables and write them to STATE_DB if connector is given"""
+        stats = self.get_stats()
+        syslog.syslog(syslog.LOG_INFO, 'handler statistics of %d tables in %.1f seconds, histogram buckets(ms): %s' %
+                      (len(stats), time.time() - self.start_time, ','.join([str(b) for b in self.BUCKETS_MS])))
+        for table in sorted(stats, key = lambda t: -stats[t].get('handler', {'total': 0.0})['total']):
+            syslog.syslog(syslog.LOG_INFO, '%s: %s' % (table, ' '.join(['%s=%s' % (k, v) for k, v in
+                                                                        sorted(self.to_fields(stats[table]).items())])))
+        client_stats = bgpd_client.get_batch_stats() if bgpd_client is not None else {}
+        for daemon, daemon_stats in sorted(client_stats.items()):
+            syslog.syslog(syslog.LOG_INFO, 'bgpd client %s: %s' % (daemon, daemon_stats))
+        if state_db is None:
+            return
+        for table, phase_list in stats.items():
+            state_db.set_entry(self.STATE_TABLE, table, self.to_fields(phase_list))
+        for daemon, daemon_stats in client_stats.items():
+            state_db.set_entry(self.CLIENT_STATE_TABLE, daemon, {k: str(v) for k, v in daemon_stats.items()})
 
 def g_run_command(table, command, use_bgpd_client, daemons, ignore_fail = False):
     syslog.syslog(syslog.LOG_DEBUG, "execute command {} for table {}.".format(command, table))
+    stats = handler_stats
+    if stats is None:
+        return g_run_command_impl(table, command, use_bgpd_client, daemons, ignore_fail)
+    start_time = time.time()
+    ret_val = g_run_command_impl(table, command, use_bgpd_client, daemons, ignore_fail)
+    stats.record_daemon(table, time.time() - start_time)
+    return ret_val
+
+def g_run_command_impl(table, command, use_bgpd_client, daemons, ignore_fail):
     if not command.startswith('vtysh '):
         use_bgpd_client = False
     if use_bgpd_client:
@@ -75,6 +153,14 @@ def extract_cmd_daemons(cmd_str):
 class BgpdClientMgr(threading.Thread):
     VTYSH_MARK = 'vtysh '
     PROXY_SERVER_ADDR = '/etc/frr/bgpd_client_sock'
+    PROXY_LISTEN_BACKLOG = 16
+    FRR_VTY_ADDR = '/run/frr/%s.vty'
+    # reply of every command is terminated by 3 zero bytes followed by return code
+    VTY_REPLY_END = b'\0\0\0'
+    # max number of commands sent to daemon in one write
+    MAX_BATCH_SIZE = 256
+    # seconds to wait for reply of daemon
+    VTY_TIMEOUT = 120
     ALL_DAEMONS = ['bgpd', 'zebra', 'staticd', 'bfdd', 'ospfd', 'pimd']
     TABLE_DAEMON = {
             'DEVICE_METADATA': ['bgpd'],
@@ -142,33 +228,36 @@ class BgpdClientMgr(threading.Thread):
                 raise
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         sock.bind(BgpdClientMgr.PROXY_SERVER_ADDR)
-        sock.listen(1)
+        sock.listen(BgpdClientMgr.PROXY_LISTEN_BACKLOG)
         return sock
-    @staticmethod
-    def __get_reply(sock):
-        reply_msg = None
-        ret_code = None
-        msg_buf = io.StringIO()
-        while True:
+    def __get_replies(self, daemon, count):
+        # replies are read from per-daemon buffer, because one read could return replies of several
+        # pipelined commands
+        sock = self.client_socks[daemon]
+        msg_buf = self.recv_bufs[daemon]
+        replies = []
+        while len(replies) < count:
+            end_idx = msg_buf.find(self.VTY_REPLY_END)
+            if end_idx >= 0 and len(msg_buf) > end_idx + len(self.VTY_REPLY_END):
+                ret_code = msg_buf[end_idx + len(self.VTY_REPLY_END)]
+                replies.append((ret_code, msg_buf[:end_idx].decode(errors = 'replace')))
+                del msg_buf[:end_idx + len(self.VTY_REPLY_END) + 1]
+                continue
             try:
                 rd_msg = sock.recv(16384)
-                msg_buf.write(rd_msg.decode())
             except socket.timeout:
                 syslog.syslog(syslog.LOG_ERR, 'socket reading timeout')
                 break
-            if len(rd_msg) < 4:
-                rd_msg = msg_buf.getvalue()
-                if len(rd_msg) < 4:
-                    continue
-            msg_tail = rd_msg[-4:]
-            if isinstance(msg_tail, str):
-                msg_tail = bytes(msg_tail, 'utf-8')
-            if msg_tail[0] == 0 and msg_tail[1] == 0 and msg_tail[2] == 0:
-                ret_code = msg_tail[3]
-                reply_msg = msg_buf.getvalue()[:-4]
+            except socket.error as msg:
+                syslog.syslog(syslog.LOG_ERR, 'failed to read from frr daemon %s: %s' % (daemon, msg))
                 break
-        msg_buf.close()
-        return (ret_code, reply_msg)
+            if len(rd_msg) == 0:
+                syslog.syslog(syslog.LOG_ERR, 'connection closed by frr daemon %s' % daemon)
+                break
+            msg_buf += rd_msg
+        while len(replies) < count:
+            replies.append((None, None))
+        return replies
     @staticmethod
     def __send_data(sock, data):
         if isinstance(data, str):
@@ -176,9 +265,10 @@ class BgpdClientMgr(threading.Thread):
         sock.sendall(data)
     def __create_frr_client(self):
         self.client_socks = {}
+        self.recv_bufs = {}
         for daemon in self.ALL_DAEMONS:
             sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            serv_addr = '/run/frr/%s.vty' % daemon
+            serv_addr = self.FRR_VTY_ADDR % daemon
             retry_cnt = 0
             while True:
                 try:
@@ -194,8 +284,9 @@ class BgpdClientMgr(threading.Thread):
                         return False
                     time.sleep(2)
                     continue
-            sock.settimeout(120)
+            sock.settimeout(self.VTY_TIMEOUT)
             self.client_socks[daemon] = sock
+            self.recv_bufs[daemon] = bytearray()
         for daemon, sock in self.client_socks.items():
             syslog.syslog(syslog.LOG_DEBUG, 'send initial enable command to %s' % daemon)
             try:
@@ -203,7 +294,7 @@ class BgpdClientMgr(threading.Thread):
             except socket.error as msg:
                 syslog.syslog(syslog.LOG_ERR, 'failed to send initial enable command to %s' % daemon)
                 return False
-            ret_code, reply = self.__get_reply(sock)
+            ret_code, reply = self.__get_replies(daemon, 1)[0]
             if ret_code is None:
                 syslog.syslog(syslog.LOG_ERR, 'failed to get command response for enable command from %s' % daemon)
                 return False
@@ -212,13 +303,43 @@ class BgpdClientMgr(threading.Thread):
                 syslog.syslog(syslog.LOG_ERR, reply)
                 return False
         return True
+    def __reconnect_frr_client(self, daemon):
+        """Replace connection to daemon, which failed to take commands or to reply all of them. Replies
+        still owed by the daemon would otherwise be paired with the following commands. Must be called
+        with lock of the daemon held"""
+        self.client_socks[daemon].close()
+        self.recv_bufs[daemon] = bytearray()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.client_socks[daemon] = sock
+        try:
+            sock.connect(self.FRR_VTY_ADDR % daemon)
+            sock.settimeout(self.VTY_TIMEOUT)
+            self.__send_data(sock, 'enable\0')
+        except socket.error as msg:
+            # closed socket fails the next command, which tries to reconnect again
+            syslog.syslog(syslog.LOG_ERR, 'failed to reconnect to frr daemon %s: %s' % (daemon, msg))
+            sock.close()
+            return False
+        ret_code, _ = self.__get_replies(daemon, 1)[0]
+        if ret_code != 0:
+            syslog.syslog(syslog.LOG_ERR, 'enable command failed after reconnecting to frr daemon %s' % daemon)
+            sock.close()
+            return False
+        syslog.syslog(syslog.LOG_INFO, 'reconnected to frr daemon %s' % daemon)
+        return True
     def __init__(self):
         super(BgpdClientMgr, self).__init__(name = 'VTYSH sub-process manager')
         if not self.__create_frr_client():
             syslog.syslog(syslog.LOG_ERR, 'failed to create socket to FRR daemon')
             raise RuntimeError('connect to FRR daemon failed')
         self.proxy_running = True
-        self.lock = threading.Lock()
+        # every daemon connection has its own lock, so that commands for different daemons could
+        # be run in parallel
+        self.daemon_locks = {daemon: threading.Lock() for daemon in self.client_socks}
+        self.stats_lock = threading.Lock()
+        self.batch_stats = {}
+        # (daemons, command list) collected between begin_config_batch and commit_config_batch
+        self.config_batch = None
         self.proxy_sock = self.__create_proxy_socket()
         self.cmd_to_daemon = []
         for pat, daemons in self.VTYSH_CMD_DAEMON:
@@ -245,33 +366,85 @@ class BgpdClientMgr(threading.Thread):
                 if len(cmn_daemons) == 0:
                     return []
         return list(cmn_daemons)
-    def __proc_command(self, command, daemons):
-        syslog.syslog(syslog.LOG_DEBUG, 'VTYSH CMD: %s daemons: %s' % (command, daemons))
-        resp = ''
-        ret_val = False
+    def __update_batch_stats(self, daemon, cmd_count, latency):
+        with self.stats_lock:
+            stats = self.batch_stats.setdefault(daemon, {'batches': 0, 'commands': 0, 'total_latency': 0.0,
+                                                         'max_latency': 0.0, 'last_latency': 0.0})
+            stats['batches'] += 1
+            stats['commands'] += cmd_count
+            stats['total_latency'] += latency
+            stats['max_latency'] = max(stats['max_latency'], latency)
+            stats['last_latency'] = latency
+        syslog.syslog(syslog.LOG_DEBUG, '[%s] batch of %d commands done in %.3f ms' % (daemon, cmd_count, latency * 1000))
+    def get_batch_stats(self):
+        """Return per-daemon batch counters: number of batches and commands, total, max and last
+        batch latency in seconds"""
+        with self.stats_lock:
+            return {daemon: dict(stats) for daemon, stats in self.batch_stats.items()}
+    def __proc_batch(self, cmd_list, daemons, results, res_idx):
+        """Send commands to every daemon in one write and collect replies into results starting from
+        index res_idx. Daemons work on the batch in parallel. Must be called with locks of daemons held.
+        Return list of daemons, which failed to take the commands or to reply all of them"""
+        start_time = time.time()
+        data = ''.join(cmd + '\0' for cmd in cmd_list)
+        sent_daemons = []
+        failed_daemons = []
         for daemon in daemons:
-            sock = self.client_socks.get(daemon, None)
-            if sock is None:
-                syslog.syslog(syslog.LOG_ERR, 'daemon %s is not connected' % daemon)
-                continue
             try:
-                self.__send_data(sock, command + '\0')
+                self.__send_data(self.client_socks[daemon], data)
+                sent_daemons.append(daemon)
             except socket.error as msg:
-                syslog.syslog(syslog.LOG_ERR, 'failed to send command to frr daemon: %s' % msg)
-                return (False, None)
-            ret_code, reply = self.__get_reply(sock)
-            if ret_code is None or ret_code != 0:
+                syslog.syslog(syslog.LOG_ERR, 'failed to send command to frr daemon %s: %s' % (daemon, msg))
+                failed_daemons.append(daemon)
+        for daemon in sent_daemons:
+            replies = self.__get_replies(daemon, len(cmd_list))
+            self.__update_batch_stats(daemon, len(cmd_list), time.time() - start_time)
+            for idx, (ret_code, reply) in enumerate(replies, res_idx):
+                succ, resp = results[idx]
                 if ret_code is None:
                     syslog.syslog(syslog.LOG_ERR, 'failed to get reply from frr daemon')
                     continue
-                else:
+                if ret_code != 0:
                     syslog.syslog(syslog.LOG_DEBUG, '[%s] command return code: %d' % (daemon, ret_code))
                     syslog.syslog(syslog.LOG_DEBUG, reply)
-            else:
-                # command is running successfully by at least one daemon
-                ret_val = True
-            resp += reply
-        return (ret_val, resp)
+                else:
+                    # command is running successfully by at least one daemon
+                    succ = True
+                results[idx] = (succ, (resp or '') + reply)
+            if replies[-1][0] is None:
+                failed_daemons.append(daemon)
+        for daemon in failed_daemons:
+            self.__reconnect_frr_client(daemon)
+        return failed_daemons
+    def __proc_commands(self, cmd_list, daemons):
+        """Run commands by daemons. Return list of (success, reply) for each command, reply is None if
+        no daemon replied. Command succeeds if it was run successfully by at least one daemon.
+        Locks of the daemons are held for the whole command list, so that commands of other callers
+        are not run in the middle of it, while commands are written in batches of MAX_BATCH_SIZE.
+        Remaining commands are not sent to a daemon, which failed, because its new connection is not
+        in the node set up by the previous commands"""
+        syslog.syslog(syslog.LOG_DEBUG, 'VTYSH CMD: %s daemons: %s' % (cmd_list, daemons))
+        results = [(False, None) for _ in cmd_list]
+        conn_daemons = []
+        for daemon in daemons:
+            if daemon not in self.client_socks:
+                syslog.syslog(syslog.LOG_ERR, 'daemon %s is not connected' % daemon)
+            elif daemon not in conn_daemons:
+                conn_daemons.append(daemon)
+        # locks are always taken in the same order to avoid deadlock with other clients
+        locks = [self.daemon_locks[daemon] for daemon in sorted(conn_daemons)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            for idx in range(0, len(cmd_list), self.MAX_BATCH_SIZE):
+                if not conn_daemons:
+                    break
+                failed_daemons = self.__proc_batch(cmd_list[idx:idx + self.MAX_BATCH_SIZE], conn_daemons, results, idx)
+                conn_daemons = [daemon for daemon in conn_daemons if daemon not in failed_daemons]
+        finally:
+            for lock in locks:
+                lock.release()
+        return results
     def run_vtysh_command(self, table, command, daemons):
         if not command.startswith(self.VTYSH_MARK):
             syslog.syslog(syslog.LOG_ERR, 'command %s is not for vtysh config' % command)
@@ -286,20 +459,70 @@ class BgpdClientMgr(threading.Thread):
         if daemons is None or len(daemons) == 0:
             syslog.syslog(syslog.LOG_ERR, 'no common daemon list found for given commands')
             return False
-        ret_val = True
-        with self.lock:
-            for cmd in cmd_list:
-                succ, _ = self.__proc_command(cmd.strip(), daemons)
-                if not succ:
-                    ret_val = False
-        return ret_val
+        cmd_list = [cmd.strip() for cmd in cmd_list]
+        if self.config_batch is not None:
+            self.config_batch.append((daemons, cmd_list))
+            return True
+        results = self.__proc_commands(cmd_list, daemons)
+        return all(succ for succ, _ in results)
+    def begin_config_batch(self):
+        """Start collecting commands given to run_vtysh_command instead of running them. Collected
+        commands are sent to FRR by commit_config_batch"""
+        self.config_batch = []
+    def get_config_batch_size(self):
+        """Return number of requests collected since begin_config_batch"""
+        return len(self.config_batch) if self.config_batch is not None else 0
+    def commit_config_batch(self):
+        """Send all collected commands to FRR as one configuration per daemon. Commands keep their
+        order within every daemon and all daemons are configured in parallel. Return list of results
+        of collected requests in the order they were given to run_vtysh_command. Request succeeds if
+        all its commands were run successfully by at least one of its daemons"""
+        batch = self.config_batch
+        self.config_batch = None
+        if not batch:
+            return []
+        daemon_cmds = {}
+        for entry_idx, (daemons, cmd_list) in enumerate(batch):
+            for daemon in daemons:
+                daemon_cmds.setdefault(daemon, []).extend((entry_idx, cmd) for cmd in cmd_list)
+        # entry index ==> command index ==> success
+        entry_succ = {}
+        entry_succ_lock = threading.Lock()
+        def configure_daemon(daemon, cmds):
+            results = self.__proc_commands([cmd for _, cmd in cmds], [daemon])
+            with entry_succ_lock:
+                cmd_cnt = {}
+                for (entry_idx, _), (succ, _) in zip(cmds, results):
+                    cmd_idx = cmd_cnt.get(entry_idx, 0)
+                    cmd_cnt[entry_idx] = cmd_idx + 1
+                    succ_list = entry_succ.setdefault(entry_idx, {})
+                    succ_list[cmd_idx] = succ_list.get(cmd_idx, False) or succ
+        threads = [threading.Thread(target = configure_daemon, args = (daemon, cmds)) for daemon, cmds in daemon_cmds.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        fail_cnt = 0
+        entry_results = []
+        for entry_idx, (daemons, cmd_list) in enumerate(batch):
+            succ_list = entry_succ.get(entry_idx, {})
+            entry_ok = True
+            for cmd_idx, cmd in enumerate(cmd_list):
+                if not succ_list.get(cmd_idx, False):
+                    syslog.syslog(syslog.LOG_ERR, 'command execution failure. Command: "%s" daemons: %s' % (cmd, daemons))
+                    fail_cnt += 1
+                    entry_ok = False
+            entry_results.append(entry_ok)
+        syslog.syslog(syslog.LOG_INFO, 'configured %d commands of %d requests to daemons %s, %d failed' %
+                      (sum(len(cmds) for cmds in daemon_cmds.values()), len(batch), list(daemon_cmds), fail_cnt))
+        return entry_results
     @staticmethod
     def __read_all(sock, data_len):
-        in_buf = io.StringIO()
+        in_buf = io.BytesIO()
         left_len = data_len
         while left_len > 0:
             data = sock.recv(left_len)
-            if data is None:
+            if not data:
                 break
             in_buf.write(data)
             left_len -= len(data)
@@ -314,8 +537,39 @@ class BgpdClientMgr(threading.Thread):
             finally:
                 sock.close()
             self.join()
+        self.proxy_sock.close()
         for _, sock in self.client_socks.items():
             sock.close()
+    def __serve_client(self, conn_sock, clnt_addr):
+        try:
+            syslog.syslog(syslog.LOG_DEBUG, 'client connection from %s' % clnt_addr)
+            data = self.__read_all(conn_sock, 4)
+            if len(data) == 4:
+                data_len = struct.unpack('>I', data)[0]
+                in_cmd = self.__read_all(conn_sock, data_len)
+                if len(in_cmd) == data_len:
+                    daemons, in_cmd = extract_cmd_daemons(in_cmd.decode())
+                    in_lines = in_cmd.splitlines()
+                    if daemons is None:
+                        daemons = self.__get_cmd_daemons(in_lines)
+                    if daemons is not None and len(daemons) > 0:
+                        results = self.__proc_commands([line.strip() for line in in_lines], daemons)
+                        for _, reply in results:
+                            if reply is not None:
+                                self.__send_data(conn_sock, reply)
+                            else:
+                                syslog.syslog(syslog.LOG_ERR, 'failed running VTYSH command')
+                    else:
+                        syslog.syslog(syslog.LOG_ERR, 'could not find common daemons for input commands')
+                else:
+                    syslog.syslog(syslog.LOG_ERR, 'read data of length %d is not expected length %d' % (data_len, len(in_cmd)))
+            else:
+                syslog.syslog(syslog.LOG_ERR, 'invalid data length %d' % len(data))
+        except socket.error as msg:
+            syslog.syslog(syslog.LOG_ERR, 'socket writing failed: %s' % msg)
+        finally:
+            syslog.syslog(syslog.LOG_DEBUG, 'closing data socket from client')
+            conn_sock.close()
     def run(self):
         syslog.syslog(syslog.LOG_DEBUG, 'entering VTYSH proxy thread')
         while self.proxy_running:
@@ -324,36 +578,12 @@ class BgpdClientMgr(threading.Thread):
             if not self.proxy_running:
                 conn_sock.close()
                 break
-            try:
-                syslog.syslog(syslog.LOG_DEBUG, 'client connection from %s' % clnt_addr)
-                data = self.__read_all(conn_sock, 4)
-                if len(data) == 4:
-                    data_len = struct.unpack('>I', data)[0]
-                    in_cmd = self.__read_all(conn_sock, data_len)
-                    if len(in_cmd) == data_len:
-                        daemons, in_cmd = extract_cmd_daemons(in_cmd)
-                        in_lines = in_cmd.splitlines()
-                        if daemons is None:
-                            daemons = self.__get_cmd_daemons(in_lines)
-                        if daemons is not None and len(daemons) > 0:
-                            with self.lock:
-                                for line in in_lines:
-                                    _, reply = self.__proc_command(line.strip(), daemons)
-                                    if reply is not None:
-                                        self.__send_data(conn_sock, reply)
-                                    else:
-                                        syslog.syslog(syslog.LOG_ERR, 'failed running VTYSH command')
-                        else:
-                            syslog.syslog(syslog.LOG_ERR, 'could not find common daemons for input commands')
-                    else:
-                        syslog.syslog(syslog.LOG_ERR, 'read data of length %d is not expected length %d' % (data_len, len(in_cmd)))
-                else:
-                    syslog.syslog(syslog.LOG_ERR, 'invalid data length %d' % len(data))
-            except socket.error as msg:
-                syslog.syslog(syslog.LOG_ERR, 'socket writing failed: %s' % msg)
-            finally:
-                syslog.syslog(syslog.LOG_DEBUG, 'closing data socket from client')
-                conn_sock.close()
+            # every client is served by its own thread, so that slow command of one client does not
+            # block the others
+            client_thread = threading.Thread(target = self.__serve_client, args = (conn_sock, clnt_addr),
+                                             name = 'VTYSH proxy client')
+            client_thread.daemon = True
+            client_thread.start()
         syslog.syslog(syslog.LOG_DEBUG, 'leaving VTYSH proxy thread')
 class BGPPeerGroup:
     def __init__(self, vrf):
@@ -496,6 +726,9 @@ def handle_rmap_set_metric(daemon, cmd_str, op, st_idx, args, data):
     return cmd_list
 
 class BGPKeyMapInfo:
+    CMD_CACHE_SIZE = 1024
+    # formats which get value from daemon cache
+    DAEMON_DATA_FORMATS = re.compile(r'\{[^}]*:(ext-)?com-ref\}')
     def __init__(self, cmd_str, hdlr, data):
         self.daemons, self.run_cmd = extract_cmd_daemons(cmd_str)
         if hdlr is None:
@@ -503,6 +736,12 @@ class BGPKeyMapInfo:
         else:
             self.hdl_func = hdlr
         self.data = data
+        # commands generated by common handler only depend on given values and could be cached
+        if self.hdl_func == get_command_cmn and self.DAEMON_DATA_FORMATS.search(self.run_cmd) is None:
+            self.cmd_cache = {}
+        else:
+            self.cmd_cache = None
+        self.batch_cmd = self.hdl_func in BATCH_CMD_HANDLERS
     def same_daemons(self, other):
         dset = lambda d: set() if d is None else set(d)
         return dset(self.daemons) == dset(other.daemons)
@@ -513,7 +752,22 @@ class BGPKeyMapInfo:
     def __hash__(self):
         return hash(self.run_cmd)
     def get_command(self, daemon, op, st_idx, *vals):
-        return self.hdl_func(daemon, self.run_cmd, op, st_idx, vals, self.data)
+        if self.cmd_cache is None:
+            return self.hdl_func(daemon, self.run_cmd, op, st_idx, vals, self.data)
+        cache_key = (op, st_idx, vals)
+        try:
+            cmd_list = self.cmd_cache.get(cache_key, None)
+        except TypeError:
+            # values are not hashable
+            return self.hdl_func(daemon, self.run_cmd, op, st_idx, vals, self.data)
+        if cmd_list is None:
+            cmd_list = self.hdl_func(daemon, self.run_cmd, op, st_idx, vals, self.data)
+            if cmd_list is None:
+                return None
+            if len(self.cmd_cache) >= self.CMD_CACHE_SIZE:
+                self.cmd_cache.clear()
+            self.cmd_cache[cache_key] = cmd_list
+        return list(cmd_list)
     def __str__(self):
         ret_str = '[CMD: %s' % self.run_cmd
         if self.hdl_func == get_command_cmn and self.data is not None:
@@ -558,6 +812,44 @@ class BGPKeyMapList(list):
                     except ValueError:
                         pass
             super(BGPKeyMapList, self).append((db_field, BGPKeyMapInfo(cmd_str, hdl_func, hdl_data)))
+        # parsed DB fields of every map and attribute name ==> indexes of maps referring to it
+        self.compiled_maps = []
+        self.attr_maps = {}
+        for map_idx, (db_field, _) in enumerate(self):
+            compiled_map = self.compile_db_field(db_field)
+            self.compiled_maps.append(compiled_map)
+            for dkeys, _ in compiled_map[0]:
+                for k in dkeys:
+                    self.attr_maps.setdefault(k, []).append(map_idx)
+    @staticmethod
+    def compile_db_field(db_field):
+        merge_vals = False
+        if type(db_field) is not list and type(db_field) is not tuple:
+            db_field = [db_field]
+        elif type(db_field) is tuple:
+            db_field = list(db_field)
+            merge_vals = True
+        field_list = []
+        req_idx_list = []
+        opt_idx_list = set()
+        for idx, dkey in enumerate(db_field):
+            optional = False
+            if len(dkey) > 0 and dkey[0] == '+':
+                if len(dkey) > 1 and dkey[1] == '+':
+                    opt_idx_list.add(idx)
+                    dkey = dkey[2:]
+                else:
+                    dkey = dkey[1:]
+                optional = True
+            else:
+                req_idx_list.append(idx)
+            field_list.append((dkey.split('&'), optional))
+        return (field_list, req_idx_list, opt_idx_list, merge_vals)
+    def get_triggered_maps(self, data):
+        map_ids = set()
+        for attr in data:
+            map_ids.update(self.attr_maps.get(attr, ()))
+        return sorted(map_ids)
     def __eq__(self, other):
         return super(BGPKeyMapList, self).__eq__(other) and self.table_name == other.table_name and self.table_key == other.table_key
     def __ne__(self, other):
@@ -644,34 +936,14 @@ class BGPKeyMapList(list):
         start_idx = len(upper_vals)
         ret_val = False
         run_cmd_cnt = 0
-        for db_field, key_map in self:
-            merge_vals = False
-            if type(db_field) is not list and type(db_field) is not tuple:
-                db_field = [db_field]
-            elif type(db_field) is tuple:
-                db_field = list(db_field)
-                merge_vals = True
-
-            idx = 0
-            req_idx_list = []
+        # only maps referring to at least one of the given attributes could generate command
+        for map_idx in self.get_triggered_maps(data):
+            key_map = self[map_idx][1]
+            field_list, req_idx_list, opt_idx_list, merge_vals = self.compiled_maps[map_idx]
             key_list_list = []
-            opt_idx_list = set()
             run_cmd = True
-            for dkey in db_field:
-                optional = False
-                if len(dkey) > 0 and dkey[0] == '+':
-                    if len(dkey) > 1 and dkey[1] == '+':
-                        opt_idx_list.add(idx)
-                        dkey = dkey[2:]
-                    else:
-                        dkey = dkey[1:]
-                    optional = True
-                else:
-                    req_idx_list.append(idx)
-                key_list = []
-                for k in dkey.split('&'):
-                    if k in data and isinstance(data[k], CachedDataWithOp):
-                        key_list.append(k)
+            for dkeys, optional in field_list:
+                key_list = [k for k in dkeys if k in data and isinstance(data[k], CachedDataWithOp)]
                 if not optional and len(key_list) == 0:
                     run_cmd = False
                     break
@@ -695,7 +967,6 @@ class BGPKeyMapList(list):
                                     new_list.append(k_lst + [k])
                     if len(new_list) > 0:
                         key_list_list = new_list
-                idx += 1
             if not run_cmd:
                 continue
 
@@ -744,6 +1015,9 @@ class BGPKeyMapList(list):
                 cmd_prefix = 'vtysh '
                 for pfx in prefix_list:
                     cmd_prefix += "-c '%s' " % pfx
+                if key_map.batch_cmd:
+                    # all commands are given to one vtysh call
+                    cmd_list = ["' -c '".join(cmd_list)]
                 for cmd in cmd_list:
                     ignore_fail = False
                     if type(cmd) is tuple:
@@ -972,26 +1246,41 @@ def hdl_com_set(daemon, cmd_str, op, st_idx, args, extended):
     com_name = args[0]
     set_type = args[1][0][0].lower()
     arg_str = '{} {}'.format(set_type, com_name)
+    def get_member_cmd(member, enabled):
+        if extended and set_type == 'standard':
+            mbr_str = '{} permit {:ext-com-list}'.format(arg_str, CommandArgument(daemon, True, member))
+        elif type(member) is list:
+            mbr_str = '{} permit {}'.format(arg_str, ' '.join(member))
+        else:
+            mbr_str = '{} permit {}'.format(arg_str, member)
+        return cmd_str.format(CommandArgument(daemon, True, mbr_str), no = CommandArgument(daemon, enabled))
     cmd_list = []
     com_set_list = daemon.comm_set_list if not extended else daemon.extcomm_set_list
-    if com_name in com_set_list and com_set_list[com_name].is_configurable():
-        cmd_list.append(cmd_str.format(CommandArgument(daemon, True, arg_str), no = CommandArgument(daemon, False)))
+    com_set = com_set_list.get(com_name, None)
+    if com_set is not None and com_set.is_configurable():
+        replace = (('EXTENDED_COMMUNITY_SET' if extended else 'COMMUNITY_SET'), com_name) in daemon.replaced_policy_sets
+        if (op != CachedDataWithOp.OP_DELETE and not replace and args[1][1][0].lower() == 'any' and
+            com_set.match_action == CommunityList.MATCH_ANY and com_set.is_std == (set_type == 'standard')):
+            # every member is a line of community-list, only removed and added members are configured
+            old_mbr_set = set(com_set.mbr_list)
+            new_mbr_set = set(args[1][2][0])
+            for member in com_set.mbr_list:
+                if member not in new_mbr_set:
+                    cmd_list.append(get_member_cmd(member, False))
+            for member in args[1][2][0]:
+                if member not in old_mbr_set:
+                    cmd_list.append(get_member_cmd(member, True))
+            return cmd_list
+        old_arg_str = '{} {}'.format(('standard' if com_set.is_std else 'expanded'), com_name)
+        cmd_list.append(cmd_str.format(CommandArgument(daemon, True, old_arg_str), no = CommandArgument(daemon, False)))
     if op != CachedDataWithOp.OP_DELETE:
         match_action = args[1][1][0].lower()
         member_list = args[1][2][0]
         if match_action == 'all':
-            if extended and set_type == 'standard':
-                mbr_str = '{} permit {:ext-com-list}'.format(arg_str, CommandArgument(daemon, True, member_list))
-            else:
-                mbr_str = '{} permit {}'.format(arg_str, ' '.join(member_list))
-            cmd_list.append(cmd_str.format(CommandArgument(daemon, True, mbr_str), no = CommandArgument(daemon, True)))
+            cmd_list.append(get_member_cmd(member_list, True))
         elif match_action == 'any':
             for member in member_list:
-                if extended and set_type == 'standard':
-                    mbr_str = '{} permit {:ext-com-list}'.format(arg_str, CommandArgument(daemon, True, member))
-                else:
-                    mbr_str = '{} permit {}'.format(arg_str, member)
-                cmd_list.append(cmd_str.format(CommandArgument(daemon, True, mbr_str), no = CommandArgument(daemon, True)))
+                cmd_list.append(get_member_cmd(member, True))
     return cmd_list
 
 def hdl_aspath_set(daemon, cmd_str, op, st_idx, args, data):
@@ -999,14 +1288,25 @@ def hdl_aspath_set(daemon, cmd_str, op, st_idx, args, data):
         return None
     cmd_list = []
     as_set_name = args[0]
+    get_member_cmd = lambda asn, enabled: cmd_str.format(CommandArgument(daemon, True, '{} permit {}'.format(as_set_name, asn)),
+                                                         no = CommandArgument(daemon, enabled))
     if as_set_name in daemon.as_path_set_list:
+        if op != CachedDataWithOp.OP_DELETE and ('AS_PATH_SET', as_set_name) not in daemon.replaced_policy_sets and len(args[1]) > 0:
+            # only removed and added members of as-path access-list are configured
+            old_mbr_set = set(daemon.as_path_set_list[as_set_name])
+            new_mbr_set = set(args[1])
+            cmd_list += [get_member_cmd(asn, False) for asn in daemon.as_path_set_list[as_set_name] if asn not in new_mbr_set]
+            cmd_list += [get_member_cmd(asn, True) for asn in args[1] if asn not in old_mbr_set]
+            return cmd_list
         cmd_list.append(cmd_str.format(CommandArgument(daemon, True, as_set_name), no = CommandArgument(daemon, False)))
     if op != CachedDataWithOp.OP_DELETE and len(args[1]) > 0:
         for asn in args[1]:
-            mbr_str = '{} permit {}'.format(as_set_name, asn)
-            cmd_list.append(cmd_str.format(CommandArgument(daemon, True, mbr_str), no = CommandArgument(daemon, True)))
+            cmd_list.append(get_member_cmd(asn, True))
     return cmd_list
 
+# commands generated by these handlers for one update are run as one vtysh transaction
+BATCH_CMD_HANDLERS = {hdl_com_set, hdl_aspath_set}
+
 def hdl_ibgp_maxpath(daemon, cmd_str, op, st_idx, args, data):
     cmd_list = []
     if op != CachedDataWithOp.OP_DELETE:
@@ -1441,7 +1741,40 @@ def hdl_static_route(daemon, cmd_str, op, st_idx, args, data):
     daemon.upd_nh_set = ip_nh_set
     return cmd_list
 
+class KeyspaceEventThread(threading.Thread):
+    """Thread which drains keyspace notifications in batches and dispatches them through ExtConfigDBConnector"""
+    # seconds to wait after a failure before reading notifications again, doubled on every further failure
+    RETRY_INTERVAL_MIN = 0.5
+    RETRY_INTERVAL_MAX = 16
+    def __init__(self, config_db, timeout = 0.1):
+        super(KeyspaceEventThread, self).__init__()
+        self.daemon = True
+        self.config_db = config_db
+        self.timeout = timeout
+        self.running = threading.Event()
+        self.running.set()
+        self.stopped = threading.Event()
+    def run(self):
+        retry_interval = self.RETRY_INTERVAL_MIN
+        while self.running.is_set():
+            try:
+                keys = self.config_db.get_pending_keys(self.timeout)
+                if len(keys) > 0:
+                    self.config_db.fetch_and_dispatch(keys)
+                retry_interval = self.RETRY_INTERVAL_MIN
+            except Exception as e:
+                syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
+                logging.exception(e)
+                # back off while redis is not reachable, stop could wake it up
+                self.stopped.wait(retry_interval)
+                retry_interval = min(retry_interval * 2, self.RETRY_INTERVAL_MAX)
+        self.config_db.pubsub.close()
+    def stop(self):
+        self.running.clear()
+        self.stopped.set()
+
 class ExtConfigDBConnector(ConfigDBConnector):
+    MAX_EVENT_BATCH = 1000
     def __init__(self, ns_attrs = None):
         super(ExtConfigDBConnector, self).__init__()
         self.nosort_attrs = ns_attrs if ns_attrs is not None else {}
@@ -1455,33 +1788,93 @@ class ExtConfigDBConnector(ConfigDBConnector):
             if type(val) is list and key not in self.nosort_attrs.get(table, set()):
                 val.sort()
         return data
-    def sub_msg_handler(self, msg_item):
-        if msg_item['type'] == 'pmessage':
-            key = msg_item['channel'].split(':', 1)[1]
+    def get_keyspace_patterns(self):
+        """Return keyspace notification patterns of the subscribed tables"""
+        dbid = self.get_dbid(self.db_name)
+        return ['__keyspace@{}__:{}{}*'.format(dbid, table, self.TABLE_NAME_SEPARATOR) for table in self.handlers]
+    def get_pending_keys(self, timeout):
+        """Wait for keyspace notifications and drain all pending ones.
+        Return list of changed keys without duplicates, in the order of their first notification.
+        """
+        keys = OrderedDict()
+        msg = self.pubsub.get_message(timeout = timeout)
+        while msg is not None:
+            if msg['type'] == 'pmessage':
+                keys[msg['channel'].split(':', 1)[1]] = None
+                if len(keys) >= self.MAX_EVENT_BATCH:
+                    break
+            msg = self.pubsub.get_message()
+        return list(keys)
+    def fetch_and_dispatch(self, keys):
+        """Read data of all changed keys with one redis pipeline and trigger table handlers in order of keys.
+        """
+        entries = []
+        for key in keys:
             try:
                 (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
-                if table in self.handlers:
-                    client = self.get_redis_client(self.db_name)
-                    data = self.raw_to_typed(client.hgetall(key), table)
-                    super(ExtConfigDBConnector, self)._ConfigDBConnector__fire(table, row, data)
             except ValueError:
-                pass    #Ignore non table-formated redis entries
+                continue    #Ignore non table-formated redis entries
+            if table in self.handlers:
+                entries.append((key, table, row))
+        if len(entries) == 0:
+            return
+        pipe = self.get_redis_client(self.db_name).pipeline(transaction = False)
+        for key, _, _ in entries:
+            pipe.hgetall(key)
+        stats = handler_stats
+        batch_time = time.time()
+        for (key, table, row), raw_data in zip(entries, pipe.execute()):
+            try:
+                data = self.raw_to_typed(raw_data, table)
+                if stats is None:
+                    self._ConfigDBConnector__fire(table, row, data)
+                    continue
+                start_time = time.time()
+                stats.record(table, 'event', start_time - batch_time)
+                self._ConfigDBConnector__fire(table, row, data)
+                stats.record(table, 'handler', time.time() - start_time)
             except Exception as e:
                 syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed handling config DB update with exception:' + str(e))
                 logging.exception(e)
     def listen(self):
-        """Start listen Redis keyspace events and will trigger corresponding handlers when content of a table changes.
+        """Start listen Redis keyspace events of the subscribed tables and will trigger corresponding handlers
+        when content of a table changes.
         """
-        self.pubsub = self.get_redis_client(self.db_name).pubsub()
-        self.pubsub.psubscribe(**{"__keyspace@{}__:*".format(self.get_dbid(self.db_name)): self.sub_msg_handler})
-        self.sub_thread = self.pubsub.run_in_thread(sleep_time = 0.01)
+        self.pubsub = self.get_redis_client(self.db_name).pubsub(ignore_subscribe_messages = True)
+        self.pubsub.psubscribe(*self.get_keyspace_patterns())
+        self.sub_thread = KeyspaceEventThread(self)
+        self.sub_thread.start()
+    def get_tables(self, table_list, scan_count = 1000):
+        """Read all entries of the given tables with one scan of the DB keys and one pipeline for their data.
+        Return dictionary table ==> key ==> data, the same as get_table for every table.
+        """
+        ret_data = {table: {} for table in table_list}
+        client = self.get_redis_client(self.db_name)
+        entries = []
+        for key in client.scan_iter(count = scan_count):
+            try:
+                (table, row) = key.split(self.TABLE_NAME_SEPARATOR, 1)
+            except ValueError:
+                continue
+            if table in ret_data:
+                entries.append((key, table, row))
+        if len(entries) == 0:
+            return ret_data
+        pipe = client.pipeline(transaction = False)
+        for key, _, _ in entries:
+            pipe.hgetall(key)
+        for (key, table, row), raw_data in zip(entries, pipe.execute()):
+            data = self.raw_to_typed(raw_data, table)
+            if data is not None:
+                ret_data[table][self.deserialize_key(row)] = data
+        return ret_data
     @staticmethod
     def get_table_key(table, key):
         return table + '&&' + key
-    def get_table_data(self, table_list):
+    def get_table_data(self, table_list, tables = None):
         ret_data = {}
         for table in table_list:
-            table_data = self.get_table(table)
+            table_data = tables[table] if tables is not None else self.get_table(table)
             for key, data in table_data.items():
                 table_key = self.get_table_key(table, self.serialize_key(key))
                 ret_data[table_key] = data
@@ -1526,8 +1919,21 @@ class CommunityList:
 class MatchPrefix:
     IPV4_MAXLEN = 32
     IPV6_MAXLEN = 128
+    # members of large prefix sets are normalized again on every update of the set
+    NORMALIZE_CACHE_SIZE = 65536
+    normalize_cache = {}
     @staticmethod
     def normalize_ip_prefix(af, ip_prefix):
+        cache_key = (af, ip_prefix)
+        if cache_key in MatchPrefix.normalize_cache:
+            return MatchPrefix.normalize_cache[cache_key]
+        normal_prefix = MatchPrefix.__normalize_ip_prefix(af, ip_prefix)
+        if len(MatchPrefix.normalize_cache) >= MatchPrefix.NORMALIZE_CACHE_SIZE:
+            MatchPrefix.normalize_cache.clear()
+        MatchPrefix.normalize_cache[cache_key] = normal_prefix
+        return normal_prefix
+    @staticmethod
+    def __normalize_ip_prefix(af, ip_prefix):
         ip_mask = ip_prefix.split('/')
         ip_addr = ip_mask[0]
         if len(ip_mask) < 2:
@@ -1557,6 +1963,7 @@ class MatchPrefix:
         else:
             self.min_len = self.max_len = None
         self.action = action
+        self.order = None
     def __hash__(self):
         return hash((self.ip_prefix, self.min_len, self.max_len))
     def __str__(self):
@@ -1582,6 +1989,8 @@ class MatchPrefixList(list):
             self.af = None
         else:
             self.af = socket.AF_INET if af_mode == 'ipv4' else socket.AF_INET6
+        self.prefix_map = {}
+        self.last_order = 0
     def __eq__(self, other):
         return super(MatchPrefixList, self).__eq__(other) and self.af == other.af
     def __ne__(self, other):
@@ -1606,17 +2015,42 @@ class MatchPrefixList(list):
             if self.af != af:
                 syslog.syslog(syslog.LOG_ERR, 'af of prefix %s is not the  same as prefix set' % ip_pfx)
                 raise ValueError
-        self.append(MatchPrefix(self.af, ip_pfx, len_range, action))
-        return self[-1]
+        prefix = MatchPrefix(self.af, ip_pfx, len_range, action)
+        old_pfx = self.prefix_map.get(prefix, None)
+        if old_pfx is not None:
+            old_pfx.action = action
+            return old_pfx
+        self.last_order += 1
+        prefix.order = self.last_order
+        self.append(prefix)
+        self.prefix_map[prefix] = prefix
+        return prefix
     def get_prefix(self, ip_pfx, len_range = None, action = 'permit'):
         if self.af is None:
-            return (None, None)
-        prefix = MatchPrefix(self.af, ip_pfx, len_range, action)
-        try:
-            idx = self.index(prefix)
-        except ValueError:
-            return (None, None)
-        return (self[idx], idx)
+            return None
+        return self.prefix_map.get(MatchPrefix(self.af, ip_pfx, len_range, action), None)
+    def remove_prefix(self, prefix):
+        # entries are kept in the order they were added, like FRR appends entries configured without sequence number
+        low, high = 0, len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self[mid].order < prefix.order:
+                low = mid + 1
+            else:
+                high = mid
+        del(self[low])
+        del(self.prefix_map[prefix])
+    def copy(self):
+        pfx_list = MatchPrefixList()
+        pfx_list.af = self.af
+        pfx_list.extend(self)
+        pfx_list.prefix_map = self.prefix_map.copy()
+        pfx_list.last_order = self.last_order
+        return pfx_list
+    def get_command(self, name, prefix, is_del = False):
+        # entry is given without sequence number, FRR matches it by content
+        return '{}{} prefix-list {} {}'.format(('no ' if is_del else ''), ('ip' if self.af == socket.AF_INET else 'ipv6'),
+                                               name, str(prefix))
 
 class AggregateAddr:
     def __init__(self):
@@ -2066,7 +2500,57 @@ class BGPConfigDaemon:
             self.config_db.connect()
         except Exception as e:
             syslog.syslog(syslog.LOG_ERR, '[bgp cfgd] Failed connecting to config DB with exception:' + str(e))
-        db_entry = self.config_db.get_entry('DEVICE_METADATA', 'localhost')
+        # tables are listed in dependency order, in which initial config is replayed:
+        # VRF -> BGP globals -> policies -> peer groups -> neighbors -> AF tables -> other protocols
+        self.table_handler_list = [
+            ('VRF', self.vrf_handler),
+            ('DEVICE_METADATA', self.metadata_handler),
+            ('BGP_GLOBALS', self.bgp_global_handler),
+            ('BGP_GLOBALS_AF', self.bgp_af_handler),
+            ('PREFIX_SET', self.bgp_table_handler_common),
+            ('PREFIX', self.bgp_table_handler_common),
+            ('COMMUNITY_SET', self.comm_set_handler),
+            ('EXTENDED_COMMUNITY_SET', self.comm_set_handler),
+            ('ROUTE_MAP', self.bgp_table_handler_common),
+            ('BGP_PEER_GROUP', self.bgp_neighbor_handler),
+            ('BGP_NEIGHBOR', self.bgp_neighbor_handler),
+            ('BGP_PEER_GROUP_AF', self.bgp_table_handler_common),
+            ('BGP_NEIGHBOR_AF', self.bgp_table_handler_common),
+            ('BGP_GLOBALS_LISTEN_PREFIX', self.bgp_table_handler_common),
+            ('BGP_GLOBALS_EVPN_VNI', self.bgp_table_handler_common),
+            ('BGP_GLOBALS_EVPN_RT', self.bgp_table_handler_common),
+            ('BGP_GLOBALS_EVPN_VNI_RT', self.bgp_table_handler_common),
+            ('BFD_PEER', self.bfd_handler),
+            ('NEIGHBOR_SET', self.bgp_table_handler_common),
+            ('NEXTHOP_SET', self.bgp_table_handler_common),
+            ('TAG_SET', self.bgp_table_handler_common),
+            ('AS_PATH_SET', self.bgp_table_handler_common),
+            ('ROUTE_REDISTRIBUTE', self.bgp_table_handler_common),
+            ('BGP_GLOBALS_AF_AGGREGATE_ADDR', self.bgp_table_handler_common),
+            ('BGP_GLOBALS_AF_NETWORK', self.bgp_table_handler_common),
+            ('BFD_PEER_SINGLE_HOP', self.bgp_table_handler_common),               
+            ('BFD_PEER_MULTI_HOP', self.bgp_table_handler_common),
+            ('IP_SLA', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER_AREA', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER_AREA_VIRTUAL_LINK', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER_AREA_NETWORK', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER_AREA_POLICY_ADDRESS_RANGE', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER_DISTRIBUTE_ROUTE', self.bgp_table_handler_common),
+            ('OSPFV2_INTERFACE', self.bgp_table_handler_common),
+            ('OSPFV2_ROUTER_PASSIVE_INTERFACE', self.bgp_table_handler_common),
+            ('STATIC_ROUTE', self.bgp_table_handler_common),
+            ('PIM_GLOBALS', self.bgp_table_handler_common),
+            ('PIM_INTERFACE', self.bgp_table_handler_common),
+            ('IGMP_INTERFACE', self.bgp_table_handler_common),
+            ('IGMP_INTERFACE_QUERY', self.bgp_table_handler_common)
+        ]
+        init_start = time.time()
+        all_tables = self.config_db.get_tables([tbl for tbl, _ in self.table_handler_list])
+        self.init_time = {'read': time.time() - init_start}
+        syslog.syslog(syslog.LOG_INFO, 'Init Config DB Data: read %d entries of %d tables in %.3f seconds' %
+                      (sum(len(tbl_data) for tbl_data in all_tables.values()), len(all_tables), self.init_time['read']))
+        db_entry = all_tables['DEVICE_METADATA'].get('localhost', {})
         if 'bgp_asn' in db_entry:
             self.metadata_asn = db_entry['bgp_asn']
         else:
@@ -2079,7 +2563,7 @@ class BGPConfigDaemon:
         self.bgp_asn = {}
         # VRF ==> confederation peer list
         self.bgp_confed_peers = {}
-        glb_table = self.config_db.get_table('BGP_GLOBALS')
+        glb_table = all_tables['BGP_GLOBALS']
         for vrf, entry in glb_table.items():
             if 'local_asn' in entry:
                 self.bgp_asn[vrf] = entry['local_asn']
@@ -2090,8 +2574,8 @@ class BGPConfigDaemon:
         self.bgp_peer_group = {}
         # VRF ==> set of interface neighbor
         self.bgp_intf_nbr = {}
-        nbr_table = self.config_db.get_table('BGP_NEIGHBOR')
-        pg_table = self.config_db.get_table('BGP_PEER_GROUP')
+        nbr_table = all_tables['BGP_NEIGHBOR']
+        pg_table = all_tables['BGP_PEER_GROUP']
         for key, entry in pg_table.items():
             vrf, pg = key
             self.bgp_peer_group.setdefault(vrf, {})[pg] = BGPPeerGroup(vrf)
@@ -2110,7 +2594,7 @@ class BGPConfigDaemon:
                 self.bgp_intf_nbr.setdefault(vrf, set()).add(peer)
         # map_name ==> seq_no ==> operation
         self.route_map = {}
-        rtmap_table = self.config_db.get_table('ROUTE_MAP')
+        rtmap_table = all_tables['ROUTE_MAP']
         for key, entry in rtmap_table.items():
             rtmap_name, seq_no = key
             syslog.syslog(syslog.LOG_DEBUG, 'Init Config DB Data: Route_Map %s Seq_NO %s' % (rtmap_name, seq_no))
@@ -2118,26 +2602,26 @@ class BGPConfigDaemon:
                 self.route_map.setdefault(rtmap_name, {})[seq_no] = entry['route_operation']
 
         self.comm_set_list = {}
-        comm_table = self.config_db.get_table('COMMUNITY_SET')
+        comm_table = all_tables['COMMUNITY_SET']
         for key, entry in comm_table.items():
             syslog.syslog(syslog.LOG_DEBUG, 'Init Config DB Data: Community %s' % key)
             self.comm_set_list[key] = CommunityList(key, False)
             for k, v in entry.items():
                 self.comm_set_list[key].db_data_to_attr(k, v)
         self.extcomm_set_list = {}
-        extcomm_table = self.config_db.get_table('EXTENDED_COMMUNITY_SET')
+        extcomm_table = all_tables['EXTENDED_COMMUNITY_SET']
         for key, entry in extcomm_table.items():
             syslog.syslog(syslog.LOG_DEBUG, 'Init Config DB Data: Extended_Community %s' % key)
             self.extcomm_set_list[key] = CommunityList(key, True)
             for k, v in entry.items():
                 self.extcomm_set_list[key].db_data_to_attr(k, v)
         self.prefix_set_list = {}
-        pfx_set_table = self.config_db.get_table('PREFIX_SET')
+        pfx_set_table = all_tables['PREFIX_SET']
         for key, entry in pfx_set_table.items():
             if 'mode' in entry:
                 syslog.syslog(syslog.LOG_DEBUG, 'Init Config DB Data: Prefix_Set %s mode %s' % (key, entry['mode']))
                 self.prefix_set_list[key] = MatchPrefixList(entry['mode'].lower())
-        pfx_table = self.config_db.get_table('PREFIX')
+        pfx_table = all_tables['PREFIX']
         for key, entry in pfx_table.items():
             pfx_set_name, ip_pfx, len_range = key
             syslog.syslog(syslog.LOG_DEBUG, 'Init Config DB Data: Prefix %s range %s of set %s' % (ip_pfx, len_range, pfx_set_name))
@@ -2149,7 +2633,10 @@ class BGPConfigDaemon:
                 except ValueError:
                     pass
         self.as_path_set_list = {}
-        aspath_table = self.config_db.get_table('AS_PATH_SET')
+        # (table, name) of cached community and AS path sets which are deleted and configured in full
+        # by the current update instead of being diffed
+        self.replaced_policy_sets = set()
+        aspath_table = all_tables['AS_PATH_SET']
         for key, entry in aspath_table.items():
             if 'as_path_set_member' in entry:
                 syslog.syslog(syslog.LOG_DEBUG, 'Init Config DB Data: AS_Path_Set %s member %s' % (key, entry['as_path_set_member']))
@@ -2157,7 +2644,7 @@ class BGPConfigDaemon:
         self.tag_set_list = {}
 
         self.af_aggr_list = {}
-        af_aggr_table = self.config_db.get_table('BGP_GLOBALS_AF_AGGREGATE_ADDR')
+        af_aggr_table = all_tables['BGP_GLOBALS_AF_AGGREGATE_ADDR']
         for key, entry in af_aggr_table.items():
             vrf, af_type, ip_pfx = key
             af, _ = af_type.lower().split('_')
@@ -2171,14 +2658,14 @@ class BGPConfigDaemon:
                 self.af_aggr_list.setdefault(vrf, {})[norm_ip_pfx] = aggr_obj
 
         self.vrf_vni_map = {}
-        vrf_table = self.config_db.get_table('VRF')
+        vrf_table = all_tables['VRF']
         for key, entry in vrf_table.items():
             if 'vni' in entry:
                 self.vrf_vni_map[key] = entry['vni']
 
         # VRF ==> ip_prefix ==> nexthop list
         self.static_route_list = {}
-        sroute_table = self.config_db.get_table('STATIC_ROUTE')
+        sroute_table = all_tables['STATIC_ROUTE']
         get_list = lambda v: v.split(',') if v is not None else None
         for key, entry in sroute_table.items():
             if type(key) is tuple and len(key) == 2:
@@ -2193,68 +2680,78 @@ class BGPConfigDaemon:
                                         nh_attr('ifname'), nh_attr('tag'), nh_attr('distance'),
                                         nh_attr('nexthop-vrf'))
 
-        self.table_handler_list = [
-            ('VRF', self.vrf_handler),
-            ('DEVICE_METADATA', self.metadata_handler),
-            ('BGP_GLOBALS', self.bgp_global_handler),
-            ('BGP_GLOBALS_AF', self.bgp_af_handler),
-            ('PREFIX_SET', self.bgp_table_handler_common),
-            ('PREFIX', self.bgp_table_handler_common),
-            ('COMMUNITY_SET', self.comm_set_handler),
-            ('EXTENDED_COMMUNITY_SET', self.comm_set_handler),
-            ('ROUTE_MAP', self.bgp_table_handler_common),
-            ('BGP_PEER_GROUP', self.bgp_neighbor_handler),
-            ('BGP_NEIGHBOR', self.bgp_neighbor_handler),
-            ('BGP_PEER_GROUP_AF', self.bgp_table_handler_common),
-            ('BGP_NEIGHBOR_AF', self.bgp_table_handler_common),
-            ('BGP_GLOBALS_LISTEN_PREFIX', self.bgp_table_handler_common),
-            ('BGP_GLOBALS_EVPN_VNI', self.bgp_table_handler_common),
-            ('BGP_GLOBALS_EVPN_RT', self.bgp_table_handler_common),
-            ('BGP_GLOBALS_EVPN_VNI_RT', self.bgp_table_handler_common),
-            ('BFD_PEER', self.bfd_handler),
-            ('NEIGHBOR_SET', self.bgp_table_handler_common),
-            ('NEXTHOP_SET', self.bgp_table_handler_common),
-            ('TAG_SET', self.bgp_table_handler_common),
-            ('AS_PATH_SET', self.bgp_table_handler_common),
-            ('ROUTE_REDISTRIBUTE', self.bgp_table_handler_common),
-            ('BGP_GLOBALS_AF_AGGREGATE_ADDR', self.bgp_table_handler_common),
-            ('BGP_GLOBALS_AF_NETWORK', self.bgp_table_handler_common),
-            ('BFD_PEER_SINGLE_HOP', self.bgp_table_handler_common),               
-            ('BFD_PEER_MULTI_HOP', self.bgp_table_handler_common),
-            ('IP_SLA', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER_AREA', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER_AREA_VIRTUAL_LINK', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER_AREA_NETWORK', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER_AREA_POLICY_ADDRESS_RANGE', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER_DISTRIBUTE_ROUTE', self.bgp_table_handler_common),
-            ('OSPFV2_INTERFACE', self.bgp_table_handler_common),
-            ('OSPFV2_ROUTER_PASSIVE_INTERFACE', self.bgp_table_handler_common),
-            ('STATIC_ROUTE', self.bgp_table_handler_common),
-            ('PIM_GLOBALS', self.bgp_table_handler_common),
-            ('PIM_INTERFACE', self.bgp_table_handler_common),
-            ('IGMP_INTERFACE', self.bgp_table_handler_common),
-            ('IGMP_INTERFACE_QUERY', self.bgp_table_handler_common)
-        ]
         self.bgp_message = queue.Queue(0)
-        self.table_data_cache = self.config_db.get_table_data([tbl for tbl, _ in self.table_handler_list])
+        # (table, table key) ==> compiled BGPKeyMapList
+        self.key_map_registry = {}
+        # tables which are not replayed yet during initial config replay
+        self.replay_pending_tables = set()
+        self.table_data_cache = self.config_db.get_table_data([tbl for tbl, _ in self.table_handler_list], all_tables)
         syslog.syslog(syslog.LOG_DEBUG, 'Init Cached DB data')
         for key, entry in self.table_data_cache.items():
             syslog.syslog(syslog.LOG_DEBUG, '  %-20s : %s' % (key, entry))
         if self.config_mode == "unified":
+            self.__replay_config(all_tables)
+
+    def __replay_entry(self, table, key, data):
+        upd_data = {}
+        for upd_key, upd_val in data.items():
+            upd_data[upd_key] = CachedDataWithOp(upd_val, CachedDataWithOp.OP_ADD)
+        self.bgp_message.put((self.config_db.serialize_key(key), False, table, upd_data))
+        upd_data_list = []
+        self.__update_bgp(upd_data_list)
+        for table1, key1, data1 in upd_data_list:
+            table_key = ExtConfigDBConnector.get_table_key(table1, key1)
+            self.__update_cache_data(table_key, data1)
+        return upd_data_list
+
+    def __replay_config(self, all_tables):
+        # commands of all replayed entries are collected and sent to FRR daemons as one configuration
+        replay_start = time.time()
+        self.replay_pending_tables = set(tbl for tbl, _ in self.table_handler_list)
+        # (table, key, data, updated entries, range of requests in config batch) of every replayed entry
+        replay_entries = []
+        req_results = []
+        get_batch_size = lambda: bgpd_client.get_config_batch_size() if bgpd_client is not None else 0
+        if bgpd_client is not None:
+            bgpd_client.begin_config_batch()
+        try:
             for table, _ in self.table_handler_list:
-                table_list = self.config_db.get_table(table)
+                self.replay_pending_tables.discard(table)
+                table_list = all_tables[table]
                 for key, data in table_list.items():
                     syslog.syslog(syslog.LOG_DEBUG, 'config replay for table {} key {}'.format(table, key))
-                    upd_data = {}
-                    for upd_key, upd_val in data.items():
-                        upd_data[upd_key] = CachedDataWithOp(upd_val, CachedDataWithOp.OP_ADD)
-                    self.bgp_message.put((self.config_db.serialize_key(key), False, table, upd_data))
-                    upd_data_list = []
-                    self.__update_bgp(upd_data_list)
-                    for table1, key1, data1 in upd_data_list:
-                        table_key = ExtConfigDBConnector.get_table_key(table1, key1)
-                        self.__update_cache_data(table_key, data1)
+                    req_start = get_batch_size()
+                    upd_data_list = self.__replay_entry(table, key, data)
+                    replay_entries.append((table, key, data, upd_data_list, req_start, get_batch_size()))
+        finally:
+            self.replay_pending_tables = set()
+            self.init_time['replay'] = time.time() - replay_start
+            apply_start = time.time()
+            if bgpd_client is not None:
+                req_results = bgpd_client.commit_config_batch()
+            self.init_time['apply'] = time.time() - apply_start
+        # handlers took queued commands as successful, entries with failed commands are removed from
+        # cache and configured again one by one, in replay order
+        retry_cnt = 0
+        for table, key, data, upd_data_list, req_start, req_end in replay_entries:
+            if all(req_results[req_start:req_end]):
+                continue
+            syslog.syslog(syslog.LOG_ERR, 'config replay for table {} key {} failed, configure it again'.format(table, key))
+            for table1, key1, _ in upd_data_list:
+                self.table_data_cache.pop(ExtConfigDBConnector.get_table_key(table1, key1), None)
+            self.__replay_entry(table, key, data)
+            retry_cnt += 1
+        syslog.syslog(syslog.LOG_INFO, 'Init Config DB Data: config replay %.3f seconds, applied to FRR in %.3f seconds, '
+                      '%d failed entries configured again' % (self.init_time['replay'], self.init_time['apply'], retry_cnt))
+
+    def __get_key_map(self, table, tbl_key):
+        # key maps are compiled once for every table and table key
+        reg_key = (table, tuple(sorted(tbl_key.items())) if tbl_key else None)
+        key_map = self.key_map_registry.get(reg_key, None)
+        if key_map is None:
+            key_map = BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key)
+            self.key_map_registry[reg_key] = key_map
+        return key_map
 
     def subscribe_all(self):
         for table, hdlr in self.table_handler_list:
@@ -2429,6 +2926,11 @@ class BGPConfigDaemon:
         return new_name
 
     def __apply_dep_vrf_table(self, vrf, table_name, *table_key, **extra_args):
+        if table_name in self.replay_pending_tables:
+            # config replay has not reached this table yet. All its entries, including the ones of this
+            # VRF, are replayed later in dependency order by the same handlers, so applying them here
+            # would only configure them twice
+            return
         if len(table_key) > 0:
             new_key = (vrf,) + table_key
             entry_list = {new_key: self.config_db.get_entry(table_name, new_key)}
@@ -2580,7 +3082,7 @@ class BGPConfigDaemon:
                     if new_key is not None:
                         key = new_key
                         tbl_key = {'ip_prefix': ('ipv4' if af_id == socket.AF_INET else 'ipv6')}
-                key_map = BGPKeyMapList(self.tbl_to_key_map[table], table, tbl_key)
+                key_map = self.__get_key_map(table, tbl_key)
             else:
                 key_map = None
             if table == 'BGP_GLOBALS':
@@ -2726,8 +3228,14 @@ class BGPConfigDaemon:
             elif table == 'COMMUNITY_SET' or table == 'EXTENDED_COMMUNITY_SET':
                 comm_set_name = prefix
                 syslog.syslog(syslog.LOG_INFO, 'Set community set {} for table {}'.format(comm_set_name, table))
+                if all(dval.op == CachedDataWithOp.OP_ADD for dval in data.values()):
+                    # new entry, like the ones replayed at startup, replaces the list in FRR, so that members
+                    # left in FRR are removed
+                    self.replaced_policy_sets.add((table, comm_set_name))
                 cmd_prefix = ['configure terminal']
-                if not key_map.run_command(self, table, data, cmd_prefix, comm_set_name):
+                ret_val = key_map.run_command(self, table, data, cmd_prefix, comm_set_name)
+                self.replaced_policy_sets.discard((table, comm_set_name))
+                if not ret_val:
                     syslog.syslog(syslog.LOG_ERR, 'failed running BGP community config command')
                     continue
                 extended = (table != 'COMMUNITY_SET')
@@ -2777,60 +3285,90 @@ class BGPConfigDaemon:
                         daemons = None
                     else:
                         daemons = ['bgpd', 'zebra']
-                    if pfx_action.op == CachedDataWithOp.OP_DELETE or pfx_action.op == CachedDataWithOp.OP_UPDATE:
-                        del_pfx, pfx_idx = self.prefix_set_list[pfx_set_name].get_prefix(ip_pfx, len_range)
-                        if del_pfx is None:
-                            syslog.syslog(syslog.LOG_ERR, 'prefix of {} with range {} not found from prefix-set {}'.\
-                                            format(ip_pfx, len_range, pfx_set_name))
-                            continue
-                        command = "vtysh -c 'configure terminal' -c 'no {} prefix-list {} {}'".\
-                                    format(('ip' if af == socket.AF_INET else 'ipv6'), pfx_set_name, str(del_pfx))
+                    prefix_set = self.prefix_set_list[pfx_set_name]
+                    try:
+                        chg_pfx = prefix_set.get_prefix(ip_pfx, len_range)
+                    except ValueError:
+                        chg_pfx = None
+                    if chg_pfx is None and pfx_action.op != CachedDataWithOp.OP_ADD:
+                        syslog.syslog(syslog.LOG_ERR, 'prefix of {} with range {} not found from prefix-set {}'.\
+                                        format(ip_pfx, len_range, pfx_set_name))
+                        continue
+                    if pfx_action.op == CachedDataWithOp.OP_DELETE:
+                        command = "vtysh -c 'configure terminal' -c '{}'".format(prefix_set.get_command(pfx_set_name, chg_pfx, True))
                         if not self.__run_command(table, command, daemons):
                             syslog.syslog(syslog.LOG_ERR, 'failed to delete prefix %s with range %s from set %s' %
                                           (ip_pfx, len_range, pfx_set_name))
                             continue
-                        del(self.prefix_set_list[pfx_set_name][pfx_idx])
-                    if pfx_action.op == CachedDataWithOp.OP_ADD or pfx_action.op == CachedDataWithOp.OP_UPDATE:
+                        prefix_set.remove_prefix(chg_pfx)
+                    elif chg_pfx is not None:
+                        # entry with another action is a different entry for FRR, the old one is removed and
+                        # the new one appended in the same command
+                        action_chg = (chg_pfx.action.lower() != pfx_action.data.lower())
+                        cmd_list = []
+                        if action_chg:
+                            cmd_list.append(prefix_set.get_command(pfx_set_name, chg_pfx, True))
+                        new_pfx = MatchPrefix(prefix_set.af, ip_pfx, len_range, pfx_action.data)
+                        cmd_list.append(prefix_set.get_command(pfx_set_name, new_pfx))
+                        command = "vtysh -c 'configure terminal' " + ' '.join(["-c '%s'" % cmd for cmd in cmd_list])
+                        if not self.__run_command(table, command, daemons):
+                            syslog.syslog(syslog.LOG_ERR, 'failed to update prefix %s with range %s of set %s' %
+                                          (ip_pfx, len_range, pfx_set_name))
+                            continue
+                        if action_chg:
+                            prefix_set.remove_prefix(chg_pfx)
+                            prefix_set.add_prefix(ip_pfx, len_range, pfx_action.data)
+                    else:
                         try:
-                            add_pfx = self.prefix_set_list[pfx_set_name].add_prefix(ip_pfx, len_range, pfx_action.data)
+                            add_pfx = prefix_set.add_prefix(ip_pfx, len_range, pfx_action.data)
                         except ValueError:
                             syslog.syslog(syslog.LOG_ERR, 'failed to update prefix-set %s in cache with prefix %s range %s' %
                                     (pfx_set_name, ip_pfx, len_range))
                             continue
-                        command = "vtysh -c 'configure terminal' -c '{} prefix-list {} {}'".\
-                                    format(('ip' if af == socket.AF_INET else 'ipv6'), pfx_set_name, str(add_pfx))
+                        command = "vtysh -c 'configure terminal' -c '{}'".format(prefix_set.get_command(pfx_set_name, add_pfx))
                         if not self.__run_command(table, command, daemons):
                             syslog.syslog(syslog.LOG_ERR, 'failed to add prefix %s with range %s to set %s' %
                                           (ip_pfx, len_range, pfx_set_name))
                             # revert cached update on failure
-                            del_pfx, pfx_idx = self.prefix_set_list[pfx_set_name].get_prefix(ip_pfx, len_range)
-                            if del_pfx is not None:
-                                del(self.prefix_set_list[pfx_set_name][pfx_idx])
+                            prefix_set.remove_prefix(add_pfx)
                             continue
                 else:
                     if 'address' not in data or data['address'].op == CachedDataWithOp.OP_NONE:
                         continue
                     ip_addr_list = data['address'].data
-                    if pfx_set_name in self.prefix_set_list:
-                        af = self.prefix_set_list[pfx_set_name].af
+                    new_set = MatchPrefixList()
+                    if not del_table:
+                        for ip_addr in ip_addr_list:
+                            try:
+                                new_set.add_prefix(ip_addr)
+                            except ValueError:
+                                continue
+                    prefix_set = self.prefix_set_list.get(pfx_set_name, None)
+                    # new entry is configured in full instead of diffed against data cached before
+                    new_entry = all(dval.op == CachedDataWithOp.OP_ADD for dval in data.values())
+                    if prefix_set is not None and (del_table or new_entry or prefix_set.af != new_set.af):
                         command = "vtysh -c 'configure terminal' -c 'no {} prefix-list {}'".\
-                                   format(('ip' if af == socket.AF_INET else 'ipv6'), pfx_set_name)
+                                   format(('ip' if prefix_set.af == socket.AF_INET else 'ipv6'), pfx_set_name)
                         if not self.__run_command(table, command):
                             syslog.syslog(syslog.LOG_ERR, 'failed to delete existing prefix-set {}'.format(pfx_set_name))
                             continue
                         del(self.prefix_set_list[pfx_set_name])
+                        prefix_set = None
                     if not del_table:
-                        prefix_set = MatchPrefixList()
-                        for ip_addr in ip_addr_list:
-                            try:
-                                prefix_set.add_prefix(ip_addr)
-                            except ValueError:
-                                continue
-                        for prefix in prefix_set:
-                            command = "vtysh -c 'configure terminal' -c '{} prefix-list {} {}'".\
-                                       format(('ip' if prefix_set.af == socket.AF_INET else 'ipv6'), pfx_set_name, str(prefix))
+                        # diff is built on a copy, cache is only updated if FRR accepted the change
+                        prefix_set = MatchPrefixList() if prefix_set is None else prefix_set.copy()
+                        # only removed and added addresses are configured
+                        cmd_list = []
+                        for prefix in [pfx for pfx in prefix_set if pfx not in new_set.prefix_map]:
+                            cmd_list.append(prefix_set.get_command(pfx_set_name, prefix, True))
+                            prefix_set.remove_prefix(prefix)
+                        for prefix in new_set:
+                            if prefix not in prefix_set.prefix_map:
+                                cmd_list.append(prefix_set.get_command(pfx_set_name, prefix_set.add_prefix(prefix.ip_prefix)))
+                        if len(cmd_list) > 0:
+                            command = "vtysh -c 'configure terminal' " + ' '.join(["-c '%s'" % cmd for cmd in cmd_list])
                             if not self.__run_command(table, command):
-                                syslog.syslog(syslog.LOG_ERR, 'failed to delete existing prefix-set {}'.format(pfx_set_name))
+                                syslog.syslog(syslog.LOG_ERR, 'failed to update prefix-set {}'.format(pfx_set_name))
                                 continue
                         self.prefix_set_list[pfx_set_name] = prefix_set
                 for _, dval in data.items():
@@ -2838,8 +3376,14 @@ class BGPConfigDaemon:
             elif table == 'AS_PATH_SET':
                 as_set_name = prefix
                 syslog.syslog(syslog.LOG_INFO, 'Set AS path set {} for table {}'.format(as_set_name, table))
+                if all(dval.op == CachedDataWithOp.OP_ADD for dval in data.values()):
+                    # new entry, like the ones replayed at startup, replaces the list in FRR, so that members
+                    # left in FRR are removed
+                    self.replaced_policy_sets.add((table, as_set_name))
                 cmd_prefix = ['configure terminal']
-                if not key_map.run_command(self, table, data, cmd_prefix, as_set_name):
+                ret_val = key_map.run_command(self, table, data, cmd_prefix, as_set_name)
+                self.replaced_policy_sets.discard((table, as_set_name))
+                if not ret_val:
                     syslog.syslog(syslog.LOG_ERR, 'failed running BGP AS path set config command')
                     continue
                 as_set_data = data.get('as_path_set_member', None)
@@ -3742,14 +4286,26 @@ class BGPConfigDaemon:
         for dkey, dval in data.items():
             syslog.syslog(syslog.LOG_DEBUG, '        %-10s - %s' % (dkey, dval))
         syslog.syslog(syslog.LOG_DEBUG, '')
+        stats = handler_stats
+        if stats is not None:
+            start_time = time.time()
         table_key = ExtConfigDBConnector.get_table_key(table, key)
         self.__add_op_to_data(table_key, data, comb_attr_list)
         self.bgp_message.put((key, del_table, table, data))
         upd_data_list = []
+        if stats is not None:
+            cache_time = time.time() - start_time
+            daemon_time = stats.get_daemon_time()
+            start_time = time.time()
         self.__update_bgp(upd_data_list)
-        for table, key, data in upd_data_list:
-            table_key = ExtConfigDBConnector.get_table_key(table, key)
-            self.__update_cache_data(table_key, data)
+        if stats is not None:
+            stats.record(table, 'command', time.time() - start_time - (stats.get_daemon_time() - daemon_time))
+            start_time = time.time()
+        for upd_table, upd_key, upd_data in upd_data_list:
+            table_key = ExtConfigDBConnector.get_table_key(upd_table, upd_key)
+            self.__update_cache_data(table_key, upd_data)
+        if stats is not None:
+            stats.record(table, 'cache', cache_time + time.time() - start_time)
 
     def bgp_global_handler(self, table, key, data):
         self.bgp_table_handler_common(table, key, data, [{'keepalive', 'holdtime'}])
@@ -3779,23 +4335,55 @@ class BGPConfigDaemon:
             self.config_db.sub_thread.join()
 
 main_loop = True
+stats_dump = False
 
 def sig_handler(signum, frame):
     global main_loop
     syslog.syslog(syslog.LOG_DEBUG, 'entering signal handler')
     main_loop = False
 
+def stats_sig_handler(signum, frame):
+    # SIGUSR2 enables or disables handler statistics, SIGUSR1 dumps them
+    global handler_stats, stats_dump
+    if signum == signal.SIGUSR2:
+        handler_stats = HandlerStats() if handler_stats is None else None
+        syslog.syslog(syslog.LOG_INFO, 'handler statistics %s' % ('enabled' if handler_stats is not None else 'disabled'))
+    else:
+        stats_dump = True
+
+def dump_handler_stats():
+    stats = handler_stats
+    if stats is None:
+        syslog.syslog(syslog.LOG_INFO, 'handler statistics are not enabled')
+        return
+    try:
+        state_db = ConfigDBConnector()
+        state_db.db_connect('STATE_DB')
+    except Exception as e:
+        syslog.syslog(syslog.LOG_ERR, 'failed to connect to STATE_DB: %s' % str(e))
+        state_db = None
+    stats.dump(state_db)
+
 def main():
-    global bgpd_client
+    global bgpd_client, handler_stats, stats_dump
     for sig_num in [signal.SIGTERM, signal.SIGINT]:
         signal.signal(sig_num, sig_handler)
+    for sig_num in [signal.SIGUSR1, signal.SIGUSR2]:
+        signal.signal(sig_num, stats_sig_handler)
+    if os.environ.get('FRRCFGD_HANDLER_STATS', '').lower() in ['1', 'true', 'yes']:
+        handler_stats = HandlerStats()
     syslog.syslog(syslog.LOG_DEBUG, 'entering BGP configuration daemon')
     bgpd_client = BgpdClientMgr()
-    bgpd_client.start()
+    # proxy clients are served after config replay, so that their commands are not run in the middle of it.
+    # Proxy socket is already listening, clients wait for accept until then
     daemon = BGPConfigDaemon()
+    bgpd_client.start()
     daemon.start()
     while main_loop:
         signal.pause()
+        if stats_dump:
+            stats_dump = False
+            dump_handler_stats()
     syslog.syslog(syslog.LOG_DEBUG, 'leaving BGP configuration daemon')
     bgpd_client.shutdown()
     daemon.stop()
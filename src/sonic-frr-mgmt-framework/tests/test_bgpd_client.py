@@ -0,0 +1,168 @@
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, NonCallableMagicMock, patch
+
+import pytest
+
+swsssdk_module_mock = MagicMock(ConfigDBConnector = NonCallableMagicMock)
+
+with patch.dict('sys.modules', swsssdk = swsssdk_module_mock):
+    from frrcfgd.frrcfgd import BgpdClientMgr
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmark'))
+from fake_frr import FakeVtyDaemon
+
+DAEMON_LATENCY = 0.05
+
+@pytest.fixture
+def client_mgr(tmp_path):
+    daemons = {name: FakeVtyDaemon(name, str(tmp_path), DAEMON_LATENCY) for name in BgpdClientMgr.ALL_DAEMONS}
+    with patch.object(BgpdClientMgr, 'FRR_VTY_ADDR', str(tmp_path / '%s.vty')), \
+         patch.object(BgpdClientMgr, 'PROXY_SERVER_ADDR', str(tmp_path / 'bgpd_client_sock')):
+        mgr = BgpdClientMgr()
+        mgr.start()
+        yield mgr, daemons
+        mgr.shutdown()
+    for daemon in daemons.values():
+        daemon.stop()
+
+def proxy_request(addr, data):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(addr)
+    data = data.encode()
+    sock.sendall(struct.pack('>I', len(data)) + data)
+    reply = b''
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        reply += chunk
+    sock.close()
+    return reply.decode()
+
+def test_batch_in_one_write(client_mgr):
+    mgr, daemons = client_mgr
+    assert mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal' -c 'router bgp 100' -c 'bgp router-id 1.1.1.1'", None)
+    assert daemons['bgpd'].received() == ['configure terminal', 'router bgp 100', 'bgp router-id 1.1.1.1', 'end']
+    # enable command and the batch
+    assert daemons['bgpd'].writes == 2
+    assert daemons['zebra'].received() == []
+    stats = mgr.get_batch_stats()
+    assert stats['bgpd']['batches'] == 1
+    assert stats['bgpd']['commands'] == 4
+    assert stats['bgpd']['max_latency'] >= 4 * DAEMON_LATENCY
+
+def test_batch_failure(client_mgr):
+    mgr, daemons = client_mgr
+    assert not mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal' -c 'fail command'", None)
+    # following commands are still sent
+    assert daemons['bgpd'].received() == ['configure terminal', 'fail command', 'end']
+    assert mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal'", None)
+
+def test_daemons_in_parallel(client_mgr):
+    mgr, daemons = client_mgr
+    start = time.time()
+    assert mgr.run_vtysh_command('PREFIX', "vtysh -c 'configure terminal' -c 'ip prefix-list PL seq 5 permit any'", None)
+    # 4 daemons process 3 commands each at the same time
+    assert time.time() - start < 4 * 3 * DAEMON_LATENCY
+    for name in ['zebra', 'bgpd', 'ospfd', 'pimd']:
+        assert daemons[name].received() == ['configure terminal', 'ip prefix-list PL seq 5 permit any', 'end']
+
+def test_concurrent_callers(client_mgr):
+    mgr, daemons = client_mgr
+    commands = {'BGP_GLOBALS': 'bgpd', 'OSPFV2_ROUTER': 'ospfd', 'STATIC_ROUTE': 'staticd', 'PIM_GLOBALS': 'pimd'}
+    results = {}
+    def run(table):
+        results[table] = mgr.run_vtysh_command(table, "vtysh -c 'configure terminal' -c 'cmd %s'" % table, None)
+    threads = [threading.Thread(target = run, args = (table,)) for table in commands]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.time() - start < 2 * 3 * DAEMON_LATENCY
+    assert all(results.values())
+    for table, name in commands.items():
+        assert daemons[name].received() == ['configure terminal', 'cmd %s' % table, 'end']
+
+def test_proxy_clients(client_mgr):
+    mgr, daemons = client_mgr
+    replies = {}
+    def request(idx):
+        replies[idx] = proxy_request(mgr.PROXY_SERVER_ADDR, '[bgpd]show bgp summary %d\nshow bgp neighbors %d' % (idx, idx))
+    threads = [threading.Thread(target = request, args = (idx,)) for idx in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for idx in range(3):
+        assert replies[idx] == 'bgpd: show bgp summary %dbgpd: show bgp neighbors %d' % (idx, idx)
+    assert proxy_request(mgr.PROXY_SERVER_ADDR, 'show ip ospf') == 'ospfd: show ip ospf'
+
+def test_config_batch(client_mgr):
+    mgr, daemons = client_mgr
+    mgr.begin_config_batch()
+    for idx in range(5):
+        assert mgr.run_vtysh_command('BGP_NEIGHBOR', "vtysh -c 'configure terminal' -c 'neighbor 10.0.0.%d remote-as 200'" % idx, None)
+    assert mgr.run_vtysh_command('STATIC_ROUTE', "vtysh -c 'configure terminal' -c 'fail route'", None)
+    assert mgr.run_vtysh_command('ROUTE_MAP', "vtysh -c 'configure terminal' -c 'route-map RM permit 10'", None)
+    # nothing is sent until the batch is committed
+    assert daemons['bgpd'].received() == []
+    assert mgr.get_config_batch_size() == 7
+    # one result for every request
+    assert mgr.commit_config_batch() == [True] * 5 + [False, True]
+    assert mgr.get_config_batch_size() == 0
+    bgpd_cmds = daemons['bgpd'].received()
+    assert len(bgpd_cmds) == 5 * 3 + 3
+    assert bgpd_cmds[:3] == ['configure terminal', 'neighbor 10.0.0.0 remote-as 200', 'end']
+    assert bgpd_cmds[-3:] == ['configure terminal', 'route-map RM permit 10', 'end']
+    assert daemons['bgpd'].writes == 2
+    assert daemons['staticd'].received() == ['configure terminal', 'fail route', 'end']
+    for name in ['zebra', 'ospfd']:
+        assert daemons[name].received() == ['configure terminal', 'route-map RM permit 10', 'end']
+    # commands are run again after the batch
+    assert mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal'", None)
+    assert daemons['bgpd'].received()[-2:] == ['configure terminal', 'end']
+
+def test_command_list_not_interleaved(client_mgr):
+    mgr, daemons = client_mgr
+    config = ['configure terminal'] + ['neighbor 10.0.0.%d remote-as 200' % idx for idx in range(7)]
+    results = {}
+    def configure():
+        results['config'] = mgr.run_vtysh_command('BGP_NEIGHBOR', 'vtysh ' + ' '.join("-c '%s'" % cmd for cmd in config), None)
+    def show():
+        results['show'] = proxy_request(mgr.PROXY_SERVER_ADDR, '[bgpd]show bgp summary')
+    with patch.object(BgpdClientMgr, 'MAX_BATCH_SIZE', 2):
+        config_thread = threading.Thread(target = configure)
+        show_thread = threading.Thread(target = show)
+        config_thread.start()
+        time.sleep(DAEMON_LATENCY)
+        show_thread.start()
+        config_thread.join()
+        show_thread.join()
+    assert results == {'config': True, 'show': 'bgpd: show bgp summary'}
+    # the command list is sent in batches, but no other command is run in the middle of it
+    assert daemons['bgpd'].received() == config + ['end', 'show bgp summary']
+    assert daemons['bgpd'].writes == 1 + 5 + 1
+
+def test_reconnect_after_missing_reply(client_mgr):
+    mgr, daemons = client_mgr
+    with patch.object(BgpdClientMgr, 'VTY_TIMEOUT', 0.2):
+        mgr.client_socks['bgpd'].settimeout(BgpdClientMgr.VTY_TIMEOUT)
+        assert not mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal' -c 'slow command' -c 'router bgp 100'", None)
+    # remaining commands are not sent after the timeout and the late reply is not paired with the next command
+    assert daemons['bgpd'].received() == ['configure terminal', 'slow command']
+    assert proxy_request(mgr.PROXY_SERVER_ADDR, '[bgpd]show bgp summary') == 'bgpd: show bgp summary'
+    assert mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal'", None)
+
+def test_reconnect_after_send_failure(client_mgr):
+    mgr, daemons = client_mgr
+    # connection broken by the daemon restart
+    mgr.client_socks['bgpd'].close()
+    assert not mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal'", None)
+    assert mgr.run_vtysh_command('BGP_GLOBALS', "vtysh -c 'configure terminal' -c 'router bgp 100'", None)
+    assert daemons['bgpd'].received() == ['configure terminal', 'router bgp 100', 'end']
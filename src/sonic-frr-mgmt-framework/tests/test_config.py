@@ -8,14 +8,14 @@ swsssdk_module_mock = MagicMock(ConfigDBConnector = NonCallableMagicMock)
 def test_contructor():
     from frrcfgd.frrcfgd import BGPConfigDaemon
     daemon = BGPConfigDaemon()
+    daemon.config_db.get_redis_client.return_value.pubsub.return_value.get_message.return_value = None
     daemon.start()
     for table, hdlr in daemon.table_handler_list:
         daemon.config_db.subscribe.assert_any_call(table, hdlr)
     daemon.config_db.pubsub.psubscribe.assert_called_once()
     daemon.stop()
-    daemon.config_db.sub_thread.stop.assert_called()
-    daemon.config_db.sub_thread.is_alive.assert_called_once()
-    daemon.config_db.sub_thread.join.assert_called_once()
+    assert(not daemon.config_db.sub_thread.is_alive())
+    daemon.config_db.pubsub.close.assert_called_once()
 
 class CmdMapTestInfo:
     data_buf = {}
@@ -174,3 +174,77 @@ def data_set_del_test(test_data, run_cmd):
 
 def test_bgp_globals():
     data_set_del_test(bgp_globals_data)
+
+@patch.dict('sys.modules', swsssdk = swsssdk_module_mock)
+@patch('frrcfgd.frrcfgd.g_run_command')
+def test_policy_set_diff(run_cmd):
+    from frrcfgd.frrcfgd import BGPConfigDaemon, CommunityList
+    daemon = BGPConfigDaemon()
+    hdlr_map = dict(daemon.table_handler_list)
+    def set_entry(table, key, data):
+        run_cmd.reset_mock()
+        hdlr_map[table](table, key, data)
+        return [call[0][1] for call in run_cmd.call_args_list]
+    compose = CmdMapTestInfo.compose_vtysh_cmd
+
+    # prefix entries are configured without sequence number and matched by content
+    set_entry('PREFIX_SET', 'PS', {'mode': 'IPv4'})
+    assert(set_entry('PREFIX', 'PS|10.0.0.0/8|exact', {'action': 'permit'}) ==
+           [compose([conf_cmd, 'ip prefix-list PS permit 10.0.0.0/8'])])
+    assert(set_entry('PREFIX', 'PS|20.0.0.0/8|16..24', {'action': 'permit'}) ==
+           [compose([conf_cmd, 'ip prefix-list PS permit 20.0.0.0/8 ge 16 le 24'])])
+    assert(set_entry('PREFIX', 'PS|10.0.0.0/8|exact', {'action': 'deny'}) ==
+           [compose([conf_cmd, 'no ip prefix-list PS permit 10.0.0.0/8', 'ip prefix-list PS deny 10.0.0.0/8'])])
+    assert([str(pfx) for pfx in daemon.prefix_set_list['PS']] == ['permit 20.0.0.0/8 ge 16 le 24', 'deny 10.0.0.0/8'])
+    assert(set_entry('PREFIX', 'PS|10.0.0.0/8|exact', None) ==
+           [compose([conf_cmd, 'no ip prefix-list PS deny 10.0.0.0/8'])])
+    assert(set_entry('PREFIX', 'PS|30.0.0.0/8|exact', {'action': 'permit'}) ==
+           [compose([conf_cmd, 'ip prefix-list PS permit 30.0.0.0/8'])])
+    assert([str(pfx) for pfx in daemon.prefix_set_list['PS']] == ['permit 20.0.0.0/8 ge 16 le 24', 'permit 30.0.0.0/8'])
+
+    # only changed addresses of neighbor set are configured in one command
+    assert(set_entry('NEIGHBOR_SET', 'NS', {'address': ['1.1.1.1', '2.2.2.2']}) ==
+           [compose([conf_cmd, 'ip prefix-list NS_neighbor permit 1.1.1.1/32',
+                     'ip prefix-list NS_neighbor permit 2.2.2.2/32'])])
+    assert(set_entry('NEIGHBOR_SET', 'NS', {'address': ['2.2.2.2', '3.3.3.3']}) ==
+           [compose([conf_cmd, 'no ip prefix-list NS_neighbor permit 1.1.1.1/32',
+                     'ip prefix-list NS_neighbor permit 3.3.3.3/32'])])
+    # cache is kept if the change failed
+    run_cmd.return_value = False
+    set_entry('NEIGHBOR_SET', 'NS', {'address': ['4.4.4.4']})
+    run_cmd.return_value = True
+    assert([pfx.ip_prefix for pfx in daemon.prefix_set_list['NS_neighbor']] == ['2.2.2.2/32', '3.3.3.3/32'])
+    assert(set_entry('NEIGHBOR_SET', 'NS', None) == [compose([conf_cmd, 'no ip prefix-list NS_neighbor'])])
+
+    # community-list with match any is updated by member
+    assert(set_entry('COMMUNITY_SET', 'CS', {'set_type': 'STANDARD', 'match_action': 'ANY',
+                                             'community_member': ['100:1', '100:2']}) ==
+           [compose([conf_cmd, 'bgp community-list standard CS permit 100:1',
+                     'bgp community-list standard CS permit 100:2'])])
+    assert(set_entry('COMMUNITY_SET', 'CS', {'set_type': 'STANDARD', 'match_action': 'ANY',
+                                             'community_member': ['100:2', '100:3']}) ==
+           [compose([conf_cmd, 'no bgp community-list standard CS permit 100:1',
+                     'bgp community-list standard CS permit 100:3'])])
+    assert(set_entry('COMMUNITY_SET', 'CS', {'set_type': 'STANDARD', 'match_action': 'ALL',
+                                             'community_member': ['100:2', '100:3']}) ==
+           [compose([conf_cmd, 'no bgp community-list standard CS',
+                     'bgp community-list standard CS permit 100:2 100:3'])])
+
+    assert(set_entry('AS_PATH_SET', 'AS', {'as_path_set_member': ['100', '200']}) ==
+           [compose([conf_cmd, 'bgp as-path access-list AS permit 100', 'bgp as-path access-list AS permit 200'])])
+    assert(set_entry('AS_PATH_SET', 'AS', {'as_path_set_member': ['200', '300']}) ==
+           [compose([conf_cmd, 'no bgp as-path access-list AS permit 100', 'bgp as-path access-list AS permit 300'])])
+    assert(set_entry('AS_PATH_SET', 'AS', None) == [compose([conf_cmd, 'no bgp as-path access-list AS'])])
+
+    # entry added while its set is cached, like config replayed at startup, replaces the list in FRR
+    daemon.as_path_set_list['AS'] = ['100']
+    assert(set_entry('AS_PATH_SET', 'AS', {'as_path_set_member': ['100', '200']}) ==
+           [compose([conf_cmd, 'no bgp as-path access-list AS', 'bgp as-path access-list AS permit 100',
+                     'bgp as-path access-list AS permit 200'])])
+    cs2 = daemon.comm_set_list['CS2'] = CommunityList('CS2', False)
+    for attr, val in {'set_type': 'STANDARD', 'match_action': 'ANY', 'community_member': ['100:1']}.items():
+        cs2.db_data_to_attr(attr, val)
+    assert(set_entry('COMMUNITY_SET', 'CS2', {'set_type': 'STANDARD', 'match_action': 'ANY',
+                                              'community_member': ['100:1', '100:2']}) ==
+           [compose([conf_cmd, 'no bgp community-list standard CS2', 'bgp community-list standard CS2 permit 100:1',
+                     'bgp community-list standard CS2 permit 100:2'])])
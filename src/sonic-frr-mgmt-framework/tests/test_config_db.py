@@ -0,0 +1,221 @@
+from collections import deque
+from unittest.mock import MagicMock, NonCallableMagicMock, patch
+
+swsssdk_module_mock = MagicMock(ConfigDBConnector = NonCallableMagicMock)
+
+with patch.dict('sys.modules', swsssdk = swsssdk_module_mock):
+    import frrcfgd.frrcfgd as frrcfgd
+    from frrcfgd.frrcfgd import ExtConfigDBConnector
+    from frrcfgd.frrcfgd import BGPConfigDaemon
+
+class FakePubSub:
+    def __init__(self, channels):
+        self.messages = deque({'type': 'pmessage', 'channel': '__keyspace@4__:' + ch, 'data': 'hset'} for ch in channels)
+    def get_message(self, timeout = 0):
+        return self.messages.popleft() if self.messages else None
+
+class FakePipeline:
+    def __init__(self, db_data, calls):
+        self.db_data = db_data
+        self.calls = calls
+        self.keys = []
+    def hgetall(self, key):
+        self.keys.append(key)
+    def execute(self):
+        self.calls.append(list(self.keys))
+        return [dict(self.db_data.get(key, {})) for key in self.keys]
+
+def get_config_db(db_data, channels):
+    config_db = ExtConfigDBConnector()
+    config_db.TABLE_NAME_SEPARATOR = '|'
+    config_db.db_name = 'CONFIG_DB'
+    config_db.get_dbid = MagicMock(return_value = 4)
+    config_db.handlers = {'BGP_GLOBALS': MagicMock(), 'BGP_NEIGHBOR': MagicMock()}
+    config_db.raw_to_typed = lambda raw_data, table = '': raw_data if len(raw_data) > 0 else None
+    config_db.pubsub = FakePubSub(channels)
+    config_db.pipeline_calls = []
+    config_db.get_redis_client = MagicMock()
+    config_db.get_redis_client.return_value.pipeline.side_effect = lambda **kwargs: FakePipeline(db_data, config_db.pipeline_calls)
+    config_db._ConfigDBConnector__fire = MagicMock()
+    return config_db
+
+def test_keyspace_patterns():
+    config_db = get_config_db({}, [])
+    assert(config_db.get_keyspace_patterns() == ['__keyspace@4__:BGP_GLOBALS|*', '__keyspace@4__:BGP_NEIGHBOR|*'])
+
+def test_pending_keys_dedup():
+    config_db = get_config_db({}, ['BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1',
+                                   'BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.2',
+                                   'BGP_NEIGHBOR|default|10.0.0.1'])
+    assert(config_db.get_pending_keys(0.1) == ['BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1',
+                                               'BGP_NEIGHBOR|default|10.0.0.2'])
+    assert(config_db.get_pending_keys(0.1) == [])
+
+def test_pending_keys_batch_limit():
+    config_db = get_config_db({}, ['BGP_NEIGHBOR|default|10.0.%d.%d' % (i // 256, i % 256) for i in range(2500)])
+    batches = []
+    while True:
+        keys = config_db.get_pending_keys(0.1)
+        if len(keys) == 0:
+            break
+        batches.append(len(keys))
+    assert(batches == [1000, 1000, 500])
+
+def test_fetch_and_dispatch():
+    db_data = {
+        'BGP_GLOBALS|default': {'local_asn': '100'},
+        'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '200'},
+    }
+    config_db = get_config_db(db_data, [])
+    config_db.fetch_and_dispatch(['BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1',
+                                  'BGP_NEIGHBOR|default|10.0.0.2', 'ROUTE_MAP|map1|10', 'NO_SEPARATOR'])
+    # all entries of the handled tables are read with one pipeline
+    assert(config_db.pipeline_calls == [['BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1',
+                                         'BGP_NEIGHBOR|default|10.0.0.2']])
+    assert(config_db._ConfigDBConnector__fire.call_args_list == [
+        (('BGP_GLOBALS', 'default', {'local_asn': '100'}),),
+        (('BGP_NEIGHBOR', 'default|10.0.0.1', {'asn': '200'}),),
+        (('BGP_NEIGHBOR', 'default|10.0.0.2', None),),
+    ])
+
+def test_keyspace_thread_backoff():
+    config_db = MagicMock()
+    config_db.get_pending_keys.side_effect = [ConnectionError('redis down')] * 3 + [['BGP_GLOBALS|default']] + \
+                                             [ConnectionError('redis down')] + [[]] * 100
+    thread = frrcfgd.KeyspaceEventThread(config_db)
+    waits = []
+    def wait(interval):
+        waits.append(interval)
+        if len(waits) == 4:
+            thread.stop()
+    thread.stopped.wait = wait
+    thread.run()
+    # the interval grows while the failures go on and is reset after a success
+    assert waits == [0.5, 1, 2, 0.5]
+    config_db.fetch_and_dispatch.assert_called_once_with(['BGP_GLOBALS|default'])
+    config_db.pubsub.close.assert_called_once_with()
+
+def test_handler_stats():
+    db_data = {
+        'BGP_GLOBALS|default': {'local_asn': '100'},
+        'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '200'},
+    }
+    config_db = get_config_db(db_data, [])
+    def fire(table, row, data):
+        frrcfgd.g_run_command(table, "vtysh -c 'configure terminal'", True, None)
+    config_db._ConfigDBConnector__fire = MagicMock(side_effect = fire)
+    stats = frrcfgd.HandlerStats()
+    with patch.object(frrcfgd, 'handler_stats', stats), \
+         patch.object(frrcfgd, 'g_run_command_impl', return_value = True):
+        config_db.fetch_and_dispatch(['BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1', 'BGP_NEIGHBOR|default|10.0.0.2'])
+    table_stats = stats.get_stats()
+    assert(set(table_stats) == {'BGP_GLOBALS', 'BGP_NEIGHBOR'})
+    assert(set(table_stats['BGP_NEIGHBOR']) == {'event', 'handler', 'daemon'})
+    for phase in ['event', 'handler', 'daemon']:
+        assert(table_stats['BGP_NEIGHBOR'][phase]['count'] == 2)
+        assert(sum(table_stats['BGP_NEIGHBOR'][phase]['hist']) == 2)
+        assert(table_stats['BGP_GLOBALS'][phase]['count'] == 1)
+    # latency histogram
+    stats.record('ROUTE_MAP', 'command', 0.003)
+    stats.record('ROUTE_MAP', 'command', 2.0)
+    assert(stats.get_stats()['ROUTE_MAP']['command']['hist'] == [0, 0, 0, 1, 0, 0, 0, 0, 0, 1])
+    state_db = MagicMock()
+    stats.dump(state_db)
+    fields = {args[1]: args[2] for args, _ in state_db.set_entry.call_args_list if args[0] == stats.STATE_TABLE}
+    assert(set(fields) == {'BGP_GLOBALS', 'BGP_NEIGHBOR', 'ROUTE_MAP'})
+    assert(fields['ROUTE_MAP']['command_count'] == '2')
+    assert(fields['ROUTE_MAP']['command_max_ms'] == '2000.000')
+    assert(fields['ROUTE_MAP']['command_hist'] == '0,0,0,1,0,0,0,0,0,1')
+
+def test_get_tables():
+    db_data = {
+        'BGP_GLOBALS|default': {'local_asn': '100'},
+        'BGP_NEIGHBOR|default|10.0.0.1': {'asn': '200'},
+        'BGP_NEIGHBOR|default|10.0.0.2': {},
+        'PORT|Ethernet0': {'mtu': '9100'},
+        'NO_SEPARATOR': {},
+    }
+    config_db = get_config_db(db_data, [])
+    config_db.get_redis_client.return_value.scan_iter.side_effect = lambda count: iter(db_data)
+    config_db.deserialize_key = lambda key: tuple(key.split('|')) if '|' in key else key
+    tables = config_db.get_tables(['BGP_GLOBALS', 'BGP_NEIGHBOR', 'ROUTE_MAP'])
+    # entries of all tables are read with one pipeline
+    assert(config_db.pipeline_calls == [['BGP_GLOBALS|default', 'BGP_NEIGHBOR|default|10.0.0.1',
+                                         'BGP_NEIGHBOR|default|10.0.0.2']])
+    assert(tables == {
+        'BGP_GLOBALS': {'default': {'local_asn': '100'}},
+        'BGP_NEIGHBOR': {('default', '10.0.0.1'): {'asn': '200'}},
+        'ROUTE_MAP': {},
+    })
+
+class FakeBatchClient:
+    """ Collect commands of config batch like BgpdClientMgr, commands of fail_tables fail """
+    def __init__(self, fail_tables = ()):
+        self.fail_tables = set(fail_tables)
+        self.batch = None
+        self.calls = []
+    def begin_config_batch(self):
+        self.calls.append(('begin_config_batch', None))
+        self.batch = []
+    def get_config_batch_size(self):
+        return len(self.batch) if self.batch is not None else 0
+    def run_vtysh_command(self, table, command, daemons):
+        self.calls.append(('run_vtysh_command', table))
+        if self.batch is not None:
+            self.batch.append(table)
+            return True
+        return table not in self.fail_tables
+    def commit_config_batch(self):
+        self.calls.append(('commit_config_batch', None))
+        batch, self.batch = self.batch, None
+        return [table not in self.fail_tables for table in batch]
+
+def replay_config(tables, bgpd_client):
+    def get_tables(self, table_list):
+        return {table: tables.get(table, {}) for table in table_list}
+    serialize_key = lambda self, key: '|'.join(key) if type(key) is tuple else key
+    with patch.object(ExtConfigDBConnector, 'get_tables', get_tables), \
+         patch.object(ExtConfigDBConnector, 'serialize_key', serialize_key, create = True), \
+         patch.object(frrcfgd, 'bgpd_client', bgpd_client):
+        return BGPConfigDaemon()
+
+def test_unified_config_replay():
+    tables = {
+        'DEVICE_METADATA': {'localhost': {'docker_routing_config_mode': 'unified'}},
+        'BGP_NEIGHBOR': {('default', '10.0.0.1'): {'asn': '200'}},
+        'BGP_GLOBALS': {'default': {'local_asn': '100'}},
+        'VRF': {'Vrf_red': {'fallback': 'true'}},
+    }
+    bgpd_client = FakeBatchClient()
+    daemon = replay_config(tables, bgpd_client)
+    assert(daemon.config_mode == 'unified')
+    assert(set(daemon.init_time) == {'read', 'replay', 'apply'})
+    # dependent entries are not read again, they are replayed after the tables they depend on
+    daemon.config_db.get_table.assert_not_called()
+    daemon.config_db.get_entry.assert_not_called()
+    # commands of all entries are collected into one batch, in dependency order of tables
+    calls = [name for name, _ in bgpd_client.calls]
+    assert(calls[0] == 'begin_config_batch')
+    assert(calls[-1] == 'commit_config_batch')
+    assert(calls.count('commit_config_batch') == 1)
+    cmd_tables = [table for name, table in bgpd_client.calls if name == 'run_vtysh_command']
+    assert('BGP_GLOBALS' in cmd_tables and 'BGP_NEIGHBOR' in cmd_tables)
+    table_order = [table for table, _ in daemon.table_handler_list]
+    assert(cmd_tables == sorted(cmd_tables, key = table_order.index))
+    assert('BGP_NEIGHBOR&&default|10.0.0.1' in daemon.table_data_cache)
+
+def test_unified_config_replay_failure():
+    tables = {
+        'DEVICE_METADATA': {'localhost': {'docker_routing_config_mode': 'unified'}},
+        'BGP_NEIGHBOR': {('default', '10.0.0.1'): {'asn': '200'}},
+        'BGP_GLOBALS': {'default': {'local_asn': '100'}},
+    }
+    bgpd_client = FakeBatchClient(['BGP_NEIGHBOR'])
+    daemon = replay_config(tables, bgpd_client)
+    # entry with failed commands is configured again after the batch, only entries configured are cached
+    calls = bgpd_client.calls
+    commit_idx = calls.index(('commit_config_batch', None))
+    assert([table for _, table in calls[commit_idx + 1:]] == ['BGP_NEIGHBOR'] * (len(calls) - commit_idx - 1))
+    assert(len(calls) > commit_idx + 1)
+    assert('BGP_GLOBALS&&default' in daemon.table_data_cache)
+    assert('BGP_NEIGHBOR&&default|10.0.0.1' not in daemon.table_data_cache)
@@ -81,6 +81,28 @@ def test_command_map_list():
     for idx, cmd_map in enumerate(cmd_map_list):
         assert(chk_map_list[idx] == cmd_map[1])
 
+def test_command_map_dispatch():
+    map_list = [('abc', 'set attribute {}'),
+                (['defg', '+hij&klm'], 'system config {} {}'),
+                (('test', '+xyz'), 'merged {}', lambda *args: ['merged']),
+                ('ref', 'set community {:com-ref}')]
+    cmd_map_list = BGPKeyMapList(map_list, 'frrcfg')
+    assert(cmd_map_list.compiled_maps[1] == ([(['defg'], False), (['hij', 'klm'], True)], [0], set(), False))
+    assert(cmd_map_list.compiled_maps[2][3])
+    assert(cmd_map_list.get_triggered_maps({'klm': None, 'abc': None, 'none': None}) == [0, 1])
+    assert(cmd_map_list.get_triggered_maps({'xyz': None}) == [2])
+    # commands of common handler are cached unless they refer to daemon data
+    key_map = cmd_map_list[0][1]
+    cmd = key_map.get_command(None, CachedDataWithOp.OP_ADD, 0, 'value')
+    assert(cmd == ['set attribute value'])
+    cmd.append('changed')
+    assert(key_map.get_command(None, CachedDataWithOp.OP_ADD, 0, 'value') == ['set attribute value'])
+    assert(len(key_map.cmd_cache) == 1)
+    assert(key_map.get_command(None, CachedDataWithOp.OP_ADD, 0, ['v1', 'v2']) == ['set attribute v1 v2'])
+    assert(len(key_map.cmd_cache) == 1)
+    assert(cmd_map_list[2][1].cmd_cache is None)
+    assert(cmd_map_list[3][1].cmd_cache is None)
+
 def test_community_list():
     for ext in [False, True]:
         comm_list = CommunityList('comm', ext)
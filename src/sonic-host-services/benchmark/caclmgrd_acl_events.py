@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of ACL_TABLE and ACL_RULE event filtering in caclmgrd.
+
+A local redis-server holds CONFIG_DB with --tables data plane ACL tables and --ctrl-tables control plane
+ACL tables. The benchmark replays the events of a bulk load of the tables followed by --rules ACL_RULE
+entries of the data plane tables and --ctrl-rules entries of the control plane tables, like caclmgrd
+receives them from its subscriptions, and decides for every event whether control plane ACLs need to be
+updated with:
+  legacy: every rule event reads the whole ACL_TABLE from CONFIG_DB to look up the type of its table and
+          every table event triggers an update, like caclmgrd did before
+  cached: the types of ACL tables are kept up to date by the table events and looked up in memory
+and reports the replayed events, the time, the events per second, the redis round trips and the number
+of events concerning control plane ACLs. KEYS walks the whole keyspace, so the legacy mode only replays
+the table events and --legacy-sample rule events spread evenly over the stream.
+The ConfigDBConnector of caclmgrd reads tables with KEYS and one HGETALL per key, like the swsscommon one.
+sonic_py_common and swsscommon are replaced by fake_sonic. Requires redis-server in PATH and the redis
+python package. Run it from src/sonic-host-services:
+
+    python3 benchmark/caclmgrd_acl_events.py --rules 50000 --tables 16
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import redis
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_iptables import FakeIptables
+from fake_sonic import install_fake_sonic_modules, load_script
+
+
+class CountingRedis(redis.Redis):
+    """ Redis client, which counts round trips to the server """
+    round_trips = 0
+
+    def execute_command(self, *args, **options):
+        CountingRedis.round_trips += 1
+        return super(CountingRedis, self).execute_command(*args, **options)
+
+
+class LocalRedis(object):
+    """ redis-server, which listens on a unix socket in a temporary directory """
+    def __init__(self, redis_server):
+        self.dir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.dir, "redis.sock")
+        self.proc = subprocess.Popen([redis_server, "--port", "0", "--unixsocket", self.socket,
+                                      "--save", "", "--appendonly", "no", "--dir", self.dir],
+                                     stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            if os.path.exists(self.socket):
+                break
+            time.sleep(0.05)
+
+    def client(self, cls=redis.Redis):
+        return cls(unix_socket_path=self.socket, decode_responses=True)
+
+    def stop(self):
+        self.proc.terminate()
+        self.proc.wait()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class RedisConfigDb(object):
+    """ ConfigDBConnector serving tables from the local redis-server """
+    client = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    @staticmethod
+    def raw_to_typed(raw):
+        return {k[:-1] if k.endswith('@') else k: v.split(',') if k.endswith('@') else v for k, v in raw.items()}
+
+    def get_table(self, table):
+        data = {}
+        for redis_key in self.client.keys(table + '|*'):
+            key = redis_key[len(table) + 1:]
+            key = tuple(key.split('|')) if '|' in key else key
+            data[key] = self.raw_to_typed(self.client.hgetall(redis_key))
+        return data
+
+    def get_entry(self, table, key):
+        return self.raw_to_typed(self.client.hgetall('%s|%s' % (table, key)))
+
+
+def make_events(args):
+    """ Return the CONFIG_DB entries of the bulk load as (redis key, fields), which are also its events """
+    entries = [('DEVICE_METADATA|localhost', {'type': 'ToRRouter'})]
+    tables = ['DATAACL_%d' % t for t in range(args.tables)]
+    ctrl_tables = ['SSH_ACL_%d' % t for t in range(args.ctrl_tables)]
+    entries += [('ACL_TABLE|' + t, {'type': 'L3', 'stage': 'ingress', 'ports@': 'Ethernet0,Ethernet4'}) for t in tables]
+    entries += [('ACL_TABLE|' + t, {'type': 'CTRLPLANE', 'services@': 'SSH'}) for t in ctrl_tables]
+    for r in range(args.rules):
+        entries.append(('ACL_RULE|%s|RULE_%d' % (tables[r % len(tables)], r),
+                        {'PRIORITY': str(9999 - r % 9000), 'PACKET_ACTION': 'DROP',
+                         'SRC_IP': '%d.%d.%d.0/24' % (20 + r // 65536, (r // 256) % 256, r % 256)}))
+    for r in range(args.ctrl_rules):
+        entries.append(('ACL_RULE|%s|RULE_%d' % (ctrl_tables[r % len(ctrl_tables)], r),
+                        {'PRIORITY': str(9999 - r), 'PACKET_ACTION': 'ACCEPT', 'SRC_IP': '10.%d.%d.0/24' % (r // 256, r % 256)}))
+    return entries
+
+
+def run_mode(mode, caclmgrd, events):
+    daemon = caclmgrd.ControlPlaneAclManager('caclmgrd')
+    acl_table = caclmgrd.ControlPlaneAclManager.ACL_TABLE
+    ctrl_plane = caclmgrd.ControlPlaneAclManager.ACL_TABLE_TYPE_CTRLPLANE
+    if mode == 'cached':
+        daemon.acl_table_types[''] = {}
+
+    CountingRedis.round_trips = 0
+    notifications = 0
+    start = time.time()
+    for key, op, fvp in events:
+        if mode == 'legacy':
+            if '|' not in key:
+                notification = True
+            else:
+                notification = daemon.config_db_map[''].get_table(acl_table)[key.split('|')[0]]["type"] == ctrl_plane
+        else:
+            notification = daemon.is_ctrl_plane_acl_event('', key, op, fvp, '|')
+        notifications += notification
+    elapsed = time.time() - start
+
+    return {
+        'events': len(events),
+        'seconds': round(elapsed, 3),
+        'events_per_second': int(len(events) / elapsed) if elapsed else 0,
+        'redis_round_trips': CountingRedis.round_trips,
+        'ctrl_plane_events': notifications,
+    }
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_sonic_modules()
+    sys.modules['swsscommon'].swsscommon.ConfigDBConnector = RedisConfigDb
+    caclmgrd = load_script('caclmgrd')
+    fake_iptables = FakeIptables()
+    local_redis = LocalRedis(args.redis_server)
+    try:
+        writer = local_redis.client()
+        entries = make_events(args)
+        pipe = writer.pipeline(transaction=False)
+        for redis_key, fields in entries:
+            pipe.hset(redis_key, mapping=fields)
+        pipe.execute()
+        RedisConfigDb.client = local_redis.client(CountingRedis)
+
+        # events of subscriptions to ACL_TABLE and ACL_RULE carry the key without the table name
+        events = [(redis_key.split('|', 1)[1], 'SET', tuple(fields.items()))
+                  for redis_key, fields in entries if redis_key.startswith('ACL_')]
+        report = {}
+        step = max(1, (len(events) - args.tables - args.ctrl_tables) // max(1, args.legacy_sample))
+        sample = events[:args.tables + args.ctrl_tables] + events[args.tables + args.ctrl_tables::step]
+        report['legacy'] = run_mode('legacy', caclmgrd, sample)
+        report['cached'] = run_mode('cached', caclmgrd, events)
+        return report
+    finally:
+        local_redis.stop()
+        fake_iptables.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="caclmgrd ACL event filtering benchmark")
+    parser.add_argument("--rules", type=int, default=50000, help="number of rules of data plane ACL tables")
+    parser.add_argument("--tables", type=int, default=16, help="number of data plane ACL tables")
+    parser.add_argument("--ctrl-rules", type=int, default=100, help="number of rules of control plane ACL tables")
+    parser.add_argument("--ctrl-tables", type=int, default=2, help="number of control plane ACL tables")
+    parser.add_argument("--legacy-sample", type=int, default=500, help="number of rule events replayed by the legacy mode")
+    parser.add_argument("--redis-server", default="redis-server", help="path to redis-server")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of DHCP chain updates of caclmgrd on a dual ToR.
+
+--ports MUX ports, every other one with a DHCP packet mark, switch over --switchovers times between
+active and standby, every time all of them at once, like a link failure of the peer ToR does. The
+MUX_CABLE_TABLE updates of a switchover are applied with:
+  commands: every update runs `iptables --check` and an insert or delete of the rule of the port, each in
+            its own shell, like caclmgrd did before
+  batched:  the updates are recorded and the changed rules of the DHCP chain are applied with one
+            iptables-restore, like caclmgrd does once the coalescing window of the updates has passed
+and the benchmark reports the time per switchover, the forked commands and the rules changed. The
+iptables commands are fake_iptables.FakeIptables shell scripts, which sleep --commit-ms per invocation.
+sonic_py_common and swsscommon are replaced by fake_sonic. Run it from src/sonic-host-services:
+
+    python3 benchmark/caclmgrd_dhcp.py --ports 64 --switchovers 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from caclmgrd_restore import CountingSubprocess
+from fake_iptables import FakeIptables
+from fake_sonic import FakeConfigDb, install_fake_sonic_modules, load_script
+
+
+class LegacyDhcpChain(object):
+    """ Updates of the DHCP chain like caclmgrd made before the batched update """
+    def __init__(self, daemon, counting):
+        self.daemon = daemon
+        self.counting = counting
+        # rules of the chain, gives the return code of the fake `iptables --check`
+        self.rules = set()
+        self.rules_changed = 0
+
+    def call(self, cmd):
+        self.counting.Popen(cmd, shell=True).wait()
+
+    def update(self, intf, state, mark):
+        rule = self.daemon.dhcp_acl_rule(intf, mark)
+        self.call('iptables --check DHCP ' + rule)
+        if state == 'standby' and rule not in self.rules:
+            self.call('iptables --insert DHCP ' + rule)
+            self.rules.add(rule)
+            self.rules_changed += 1
+        elif state == 'active' and rule in self.rules:
+            self.call('iptables --delete DHCP ' + rule)
+            self.rules.remove(rule)
+            self.rules_changed += 1
+
+
+def run_mode(mode, caclmgrd, args):
+    counting = CountingSubprocess()
+    caclmgrd.subprocess = counting
+    daemon = caclmgrd.ControlPlaneAclManager('caclmgrd')
+    daemon.setup_dhcp_chain('')
+    legacy = LegacyDhcpChain(daemon, counting)
+    marks = {'Ethernet%d' % (i * 4): '0x67%03x' % i if i % 2 else None for i in range(args.ports)}
+
+    counting.commands = []
+    rules_changed = 0
+    latencies = []
+    for switchover in range(args.switchovers):
+        state = 'standby' if switchover % 2 == 0 else 'active'
+        start = time.time()
+        for intf, mark in marks.items():
+            if mode == 'commands':
+                legacy.update(intf, state, mark)
+            else:
+                daemon.update_dhcp_acl(intf, 'SET', {'state': state}, mark)
+        if mode == 'batched':
+            rules_changed += daemon.update_dhcp_chains()
+        latencies.append(time.time() - start)
+    caclmgrd.subprocess = subprocess
+
+    return {
+        'avg_switchover_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'max_switchover_ms': round(max(latencies) * 1000, 2),
+        'forks_per_switchover': round(len(counting.commands) / float(args.switchovers), 1),
+        'rules_changed': legacy.rules_changed if mode == 'commands' else rules_changed,
+    }
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_sonic_modules()
+    caclmgrd = load_script('caclmgrd')
+    FakeConfigDb.tables = {'DEVICE_METADATA': {'localhost': {'type': 'ToRRouter', 'subtype': 'DualToR'}}}
+    fake_iptables = FakeIptables(args.commit_ms)
+    try:
+        report = {'ports': args.ports, 'switchovers': args.switchovers}
+        for mode in ('commands', 'batched'):
+            report[mode] = run_mode(mode, caclmgrd, args)
+        return report
+    finally:
+        fake_iptables.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="caclmgrd DHCP chain update benchmark")
+    parser.add_argument("--ports", type=int, default=64, help="number of MUX ports")
+    parser.add_argument("--switchovers", type=int, default=10, help="number of switchovers of all ports")
+    parser.add_argument("--commit-ms", type=float, default=0.0, help="time of a fake iptables table commit")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
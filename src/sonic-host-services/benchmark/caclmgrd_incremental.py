@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of control plane ACL updates in caclmgrd.
+
+CONFIG_DB holds the control plane ACL tables of caclmgrd_restore.make_config_db. After the initial
+programming, --edits random edits each change the source prefix of one rule and are applied with:
+  commands:    every update regenerates all rules and runs every command in its own shell
+  restore:     every update replaces all rules with one iptables-restore per address family
+  incremental: the rules of every table are held in their own chain and an update only rebuilds the
+               chain of the changed table, the base rules in INPUT are left alone
+and the benchmark reports the update latency, the forked commands and the iptables commands applied
+per update. The iptables commands are fake_iptables.FakeIptables shell scripts.
+sonic_py_common and swsscommon are replaced by fake_sonic. Run it from src/sonic-host-services:
+
+    python3 benchmark/caclmgrd_incremental.py --tables 6 --rules 200 --edits 20
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from caclmgrd_restore import CountingSubprocess, make_config_db
+from fake_iptables import FakeIptables
+from fake_sonic import FakeConfigDb, install_fake_sonic_modules, load_script
+
+
+def run_mode(mode, caclmgrd, edits, args):
+    FakeConfigDb.tables = make_config_db(args)
+    counting = CountingSubprocess()
+    caclmgrd.subprocess = counting
+    daemon = caclmgrd.ControlPlaneAclManager('caclmgrd')
+    daemon.update_control_plane_acls('')
+
+    applied = []
+    apply_iptables_commands = daemon.apply_iptables_commands
+    def counting_apply(namespace, iptables_cmds):
+        applied.append(len(iptables_cmds))
+        return apply_iptables_commands(namespace, iptables_cmds)
+    daemon.apply_iptables_commands = counting_apply
+
+    counting.commands = []
+    latencies = []
+    for key, src_ip in edits:
+        FakeConfigDb.tables['ACL_RULE'][key] = dict(FakeConfigDb.tables['ACL_RULE'][key], **src_ip)
+        start = time.time()
+        if mode == 'commands':
+            iptables_cmds, source_ip_map = daemon.get_acl_rules_and_translate_to_iptables_commands('')
+            iptables_cmds += daemon.generate_fwd_traffic_from_namespace_to_host_commands('', source_ip_map)
+            applied.append(len(iptables_cmds))
+            daemon.run_commands(iptables_cmds)
+        else:
+            if mode == 'restore':
+                daemon.programmed_acls.clear()
+            daemon.update_control_plane_acls('')
+        latencies.append(time.time() - start)
+    caclmgrd.subprocess = subprocess
+
+    return {
+        'avg_update_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'max_update_ms': round(max(latencies) * 1000, 2),
+        'forks_per_update': round(len(counting.commands) / float(len(edits)), 1),
+        'iptables_commands_per_update': round(sum(applied) / float(len(edits)), 1),
+    }
+
+
+def make_edits(args):
+    rnd = random.Random(args.seed)
+    rules = sorted(make_config_db(args)['ACL_RULE'].items())
+    edits = []
+    for i in range(args.edits):
+        key, rule = rnd.choice(rules)
+        if 'SRC_IPV6' in rule:
+            edits.append((key, {'SRC_IPV6': 'fd00:%x::/64' % i}))
+        else:
+            edits.append((key, {'SRC_IP': '30.%d.%d.0/24' % (i // 256, i % 256)}))
+    return edits
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_sonic_modules()
+    caclmgrd = load_script('caclmgrd')
+    fake_iptables = FakeIptables(args.commit_ms)
+    edits = make_edits(args)
+    try:
+        report = {'acl_rules': args.tables * args.rules, 'edits': args.edits}
+        for mode in ('commands', 'restore', 'incremental'):
+            report[mode] = run_mode(mode, caclmgrd, edits, args)
+        return report
+    finally:
+        fake_iptables.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="caclmgrd control plane ACL update benchmark")
+    parser.add_argument("--tables", type=int, default=6, help="number of control plane ACL tables")
+    parser.add_argument("--rules", type=int, default=200, help="number of rules of every table")
+    parser.add_argument("--edits", type=int, default=20, help="number of rule edits")
+    parser.add_argument("--commit-ms", type=float, default=0.0, help="time of a fake iptables table commit")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random edits")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of source prefix matching of control plane ACLs in caclmgrd.
+
+CONFIG_DB holds an IPv4 SNMP and an IPv6 SSH management ACL table with --prefixes ACCEPT rules of
+distinct source prefixes each, followed by a DROP rule. The rules are installed and --edits edits
+then replace the prefix of one rule, with:
+  rules: every source prefix is matched by its own iptables rule per protocol and port
+  ipset: the prefixes are held in hash:net ipsets, matched by one rule per protocol and port
+The benchmark reports the install time, the forked commands, the iptables rules and ipset entries
+written, the rules a packet matching no ACL rule traverses in INPUT and the table chains, and the
+iptables rules and ipset entries written per edit. The iptables and ipset commands are
+fake_iptables.FakeIptables shell scripts, so the install time covers rule generation and forks, the
+time the kernel takes grows with the rules and entries written. sonic_py_common and swsscommon are replaced by fake_sonic.
+Run it from src/sonic-host-services:
+
+    python3 benchmark/caclmgrd_ipset.py --prefixes 2000 --edits 20
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from caclmgrd_restore import CountingSubprocess
+from fake_iptables import FakeIptables
+from fake_sonic import FakeConfigDb, install_fake_sonic_modules, load_script
+
+
+def ipv4_prefix(i):
+    return '%d.%d.%d.0/24' % (20 + i // 65536, (i // 256) % 256, i % 256)
+
+
+def ipv6_prefix(i):
+    return 'fc00:%x::/64' % i
+
+
+def make_config_db(args):
+    tables = {
+        'DEVICE_METADATA': {'localhost': {'type': 'ToRRouter'}},
+        'ACL_TABLE': {'SNMP_ACL': {'type': 'CTRLPLANE', 'services': ['SNMP']},
+                      'SSH_ACL': {'type': 'CTRLPLANE', 'services': ['SSH']}},
+        'ACL_RULE': {},
+        'LOOPBACK_INTERFACE': {('Loopback0', '10.1.0.1/32'): {}},
+    }
+    for table, field, prefix in [('SNMP_ACL', 'SRC_IP', ipv4_prefix), ('SSH_ACL', 'SRC_IPV6', ipv6_prefix)]:
+        for i in range(args.prefixes):
+            tables['ACL_RULE'][(table, 'RULE_%d' % i)] = {'PRIORITY': str(100000 - i), field: prefix(i),
+                                                          'PACKET_ACTION': 'ACCEPT'}
+        tables['ACL_RULE'][(table, 'DEFAULT_RULE')] = {'PRIORITY': '1', 'PACKET_ACTION': 'DROP',
+                                                       field: '0.0.0.0/0' if field == 'SRC_IP' else '::/0'}
+    return tables
+
+
+def count_written(restore_inputs):
+    """ iptables rules and ipset entries written by restore inputs """
+    lines = [line for restore_input in restore_inputs for line in restore_input.splitlines()]
+    return {'iptables_rules': sum(1 for line in lines if line.startswith('-A ')),
+            'ipset_entries': sum(1 for line in lines if line.startswith('add ') or line.startswith('del '))}
+
+
+def run_mode(mode, caclmgrd, edits, args):
+    FakeConfigDb.tables = make_config_db(args)
+    counting = CountingSubprocess()
+    caclmgrd.subprocess = counting
+    daemon = caclmgrd.ControlPlaneAclManager('caclmgrd')
+    if mode == 'rules':
+        daemon.IPSET_MIN_PREFIXES = float('inf')
+
+    restore_inputs = []
+    run_iptables_restore = daemon.run_iptables_restore
+    def recording_restore(namespace, iptables_cmd, restore_input):
+        restore_inputs.append(restore_input)
+        return run_iptables_restore(namespace, iptables_cmd, restore_input)
+    daemon.run_iptables_restore = recording_restore
+
+    start = time.time()
+    daemon.update_control_plane_acls('')
+    install_seconds = time.time() - start
+    install = count_written(restore_inputs)
+    packet_path_rules = sum(len(cmds) for _, cmds in daemon.programmed_acls[''][1].values())
+    packet_path_rules += len(daemon.programmed_acls[''][0])
+    install_forks = len(counting.commands)
+
+    del restore_inputs[:]
+    counting.commands = []
+    for key, field, prefix in edits:
+        FakeConfigDb.tables['ACL_RULE'][key] = dict(FakeConfigDb.tables['ACL_RULE'][key], **{field: prefix})
+        daemon.update_control_plane_acls('')
+    edit = count_written(restore_inputs)
+    caclmgrd.subprocess = subprocess
+
+    return {
+        'install_seconds': round(install_seconds, 3),
+        'install_forks': install_forks,
+        'install_iptables_rules': install['iptables_rules'],
+        'install_ipset_entries': install['ipset_entries'],
+        'packet_path_rules': packet_path_rules,
+        'edit_forks': round(len(counting.commands) / float(len(edits)), 1),
+        'edit_iptables_rules': round(edit['iptables_rules'] / float(len(edits)), 1),
+        'edit_ipset_entries': round(edit['ipset_entries'] / float(len(edits)), 1),
+    }
+
+
+def make_edits(args):
+    rnd = random.Random(args.seed)
+    edits = []
+    for i in range(args.edits):
+        rule = 'RULE_%d' % rnd.randrange(args.prefixes)
+        if rnd.random() < 0.5:
+            edits.append((('SNMP_ACL', rule), 'SRC_IP', ipv4_prefix(args.prefixes + i)))
+        else:
+            edits.append((('SSH_ACL', rule), 'SRC_IPV6', ipv6_prefix(args.prefixes + i)))
+    return edits
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_sonic_modules()
+    caclmgrd = load_script('caclmgrd')
+    fake_iptables = FakeIptables(args.commit_ms)
+    edits = make_edits(args)
+    try:
+        report = {'prefixes': args.prefixes, 'edits': args.edits}
+        for mode in ('rules', 'ipset'):
+            report[mode] = run_mode(mode, caclmgrd, edits, args)
+        return report
+    finally:
+        fake_iptables.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="caclmgrd control plane ACL source prefix matching benchmark")
+    parser.add_argument("--prefixes", type=int, default=2000, help="number of source prefixes of every table")
+    parser.add_argument("--edits", type=int, default=20, help="number of prefix edits")
+    parser.add_argument("--commit-ms", type=float, default=0.0, help="time of a fake iptables table commit")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the random edits")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of control plane ACL programming in caclmgrd.
+
+CONFIG_DB holds --tables control plane ACL tables of the SSH, SNMP and NTP services with --rules source
+prefixes each, alternately IPv4 and IPv6. The iptables commands are fake_iptables.FakeIptables shell scripts,
+which sleep --commit-ms per invocation to model the kernel replacing the table. The benchmark applies the
+rules of the default namespace with:
+  commands: every generated iptables/ip6tables command is run in its own shell, like caclmgrd did before
+  restore:  the commands are rendered into one iptables-restore and one ip6tables-restore input
+and reports the time, the number of forked commands and, for the commands mode, the time INPUT was
+partially programmed, from the flush of INPUT to the last rule. The restore mode replaces INPUT in one
+transaction per address family.
+sonic_py_common and swsscommon are replaced by fake_sonic. Run it from src/sonic-host-services:
+
+    python3 benchmark/caclmgrd_restore.py --tables 6 --rules 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_iptables import FakeIptables
+from fake_sonic import FakeConfigDb, install_fake_sonic_modules, load_script
+
+SERVICES = ['SSH', 'SNMP', 'NTP']
+
+
+def make_config_db(args):
+    tables = {
+        'DEVICE_METADATA': {'localhost': {'type': 'ToRRouter'}},
+        'ACL_TABLE': {},
+        'ACL_RULE': {},
+        'LOOPBACK_INTERFACE': {('Loopback0', '10.1.0.1/32'): {}, ('Loopback0', 'fc00:1::1/128'): {}},
+        'INTERFACE': {('Ethernet%d' % (i * 4), '10.0.%d.0/31' % i): {} for i in range(32)},
+    }
+    for t in range(args.tables):
+        name = '%s_ACL_%d' % (SERVICES[t % len(SERVICES)], t)
+        tables['ACL_TABLE'][name] = {'type': 'CTRLPLANE', 'services': [SERVICES[t % len(SERVICES)]]}
+        for r in range(args.rules):
+            if t % 2:
+                rule = {'SRC_IPV6': 'fc%02x:%x::/64' % (t, r)}
+            else:
+                rule = {'SRC_IP': '%d.%d.%d.0/24' % (20 + t, r // 256, r % 256)}
+            rule.update(PRIORITY=str(9999 - r), PACKET_ACTION='ACCEPT')
+            tables['ACL_RULE'][(name, 'RULE_%d' % r)] = rule
+    return tables
+
+
+class CountingSubprocess(object):
+    """ subprocess module of caclmgrd, which records the start time of every forked command """
+    def __init__(self):
+        self.commands = []
+
+    def __getattr__(self, name):
+        return getattr(subprocess, name)
+
+    def Popen(self, cmd, *args, **kwargs):
+        self.commands.append((time.time(), cmd))
+        return subprocess.Popen(cmd, *args, **kwargs)
+
+
+def run_mode(mode, caclmgrd, fake_iptables):
+    counting = CountingSubprocess()
+    caclmgrd.subprocess = counting
+    daemon = caclmgrd.ControlPlaneAclManager('caclmgrd')
+    counting.commands = []
+    fake_iptables.commands()
+
+    start = time.time()
+    if mode == 'commands':
+        iptables_cmds, source_ip_map = daemon.get_acl_rules_and_translate_to_iptables_commands('')
+        iptables_cmds += daemon.generate_fwd_traffic_from_namespace_to_host_commands('', source_ip_map)
+        daemon.run_commands(iptables_cmds)
+    else:
+        daemon.update_control_plane_acls('')
+    end = time.time()
+
+    report = {
+        'seconds': round(end - start, 3),
+        'forks': len(counting.commands),
+        'iptables_invocations': len(fake_iptables.commands()),
+    }
+    if mode == 'commands':
+        flush = min(t for t, cmd in counting.commands if cmd.startswith('iptables -F'))
+        report['input_partial_seconds'] = round(end - flush, 3)
+    caclmgrd.subprocess = subprocess
+    return report
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    install_fake_sonic_modules()
+    caclmgrd = load_script('caclmgrd')
+    FakeConfigDb.tables = make_config_db(args)
+    fake_iptables = FakeIptables(args.commit_ms)
+    try:
+        report = {'acl_rules': args.tables * args.rules}
+        for mode in ('commands', 'restore'):
+            report[mode] = run_mode(mode, caclmgrd, fake_iptables)
+        return report
+    finally:
+        fake_iptables.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="caclmgrd control plane ACL programming benchmark")
+    parser.add_argument("--tables", type=int, default=6, help="number of control plane ACL tables")
+    parser.add_argument("--rules", type=int, default=200, help="number of rules of every table")
+    parser.add_argument("--commit-ms", type=float, default=0.0, help="time of a fake iptables table commit")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Fake iptables, ip6tables, iptables-save, ip6tables-save, iptables-restore, ip6tables-restore, ipset and ip
+commands for the caclmgrd and hostcfgd offline benchmarks.
+The commands are shell scripts written to a temporary directory, which is put first in PATH. Every
+command appends its name and arguments to a log file, `iptables -L` lists the built-in chains, restore
+commands read their input, save commands print what was given to set_save_output(), `ip` prints nothing
+and every invocation sleeps commit_ms to model the kernel replacing the table once per command or restore
+transaction.
+"""
+import os
+import shutil
+import tempfile
+
+SCRIPT = """#!/bin/sh
+echo "$(basename $0) $*" >> %(log)s
+case "$(basename $0) $1" in
+    *-restore*|"ipset restore") cat > /dev/null ;;
+    *-save*) cat %(dir)s/$(basename $0).out 2>/dev/null ;;
+    *) case " $* " in *" -L "*) printf 'Chain INPUT (policy ACCEPT)\\nChain FORWARD (policy ACCEPT)\\nChain OUTPUT (policy ACCEPT)\\n' ;; esac ;;
+esac
+%(sleep)s
+exit 0
+"""
+
+COMMANDS = ['iptables', 'ip6tables', 'iptables-save', 'ip6tables-save', 'iptables-restore', 'ip6tables-restore',
+            'ipset', 'ip']
+
+
+class FakeIptables(object):
+    def __init__(self, commit_ms=0.0):
+        self.dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.dir, 'commands.log')
+        sleep = 'sleep %f' % (commit_ms / 1000.0) if commit_ms else ''
+        for name in COMMANDS:
+            path = os.path.join(self.dir, name)
+            with open(path, 'w') as f:
+                f.write(SCRIPT % {'log': self.log, 'dir': self.dir, 'sleep': sleep})
+            os.chmod(path, 0o755)
+        self.old_path = os.environ.get('PATH', '')
+        os.environ['PATH'] = self.dir + os.pathsep + self.old_path
+
+    def set_save_output(self, name, output):
+        """ Sets what the save command `name` prints """
+        with open(os.path.join(self.dir, name + '.out'), 'w') as f:
+            f.write(output)
+
+    def commands(self):
+        """ Commands run since the last call """
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            commands = f.read().splitlines()
+        os.unlink(self.log)
+        return commands
+
+    def stop(self):
+        os.environ['PATH'] = self.old_path
+        shutil.rmtree(self.dir, ignore_errors=True)
@@ -0,0 +1,68 @@
+"""
+Fake sonic_py_common and swsscommon modules for the sonic-host-services offline benchmarks.
+ConfigDBConnector serves tables from FakeConfigDb.tables, a dict of table name to {key: fields}.
+"""
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import types
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+
+class FakeConfigDb(object):
+    tables = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    def get_table(self, table):
+        return dict(FakeConfigDb.tables.get(table, {}))
+
+    def get_entry(self, table, key):
+        return dict(FakeConfigDb.tables.get(table, {}).get(key, {}))
+
+
+class DaemonBase(object):
+    def __init__(self, log_identifier):
+        pass
+
+    def log_info(self, msg):
+        pass
+
+    log_notice = log_warning = log_error = log_info
+
+    def set_min_log_priority_info(self):
+        pass
+
+
+def install_fake_sonic_modules():
+    sonic_py_common = types.ModuleType('sonic_py_common')
+    sonic_py_common.daemon_base = types.ModuleType('sonic_py_common.daemon_base')
+    sonic_py_common.daemon_base.DaemonBase = DaemonBase
+    sonic_py_common.device_info = types.ModuleType('sonic_py_common.device_info')
+    sonic_py_common.device_info.is_multi_npu = lambda: False
+    sonic_py_common.multi_asic = types.ModuleType('sonic_py_common.multi_asic')
+    sonic_py_common.multi_asic.get_all_namespaces = lambda: {'front_ns': [], 'back_ns': []}
+    swsscommon = types.ModuleType('swsscommon')
+    swsscommon.swsscommon = types.ModuleType('swsscommon.swsscommon')
+    swsscommon.swsscommon.ConfigDBConnector = FakeConfigDb
+    for name, module in [('sonic_py_common', sonic_py_common), ('swsscommon', swsscommon)]:
+        sys.modules[name] = module
+        for attr, submodule in vars(module).items():
+            if isinstance(submodule, types.ModuleType):
+                sys.modules['%s.%s' % (name, attr)] = submodule
+
+
+def load_script(name):
+    """ Load a script of sonic-host-services, which has no .py extension, as a module """
+    loader = importlib.machinery.SourceFileLoader(name, os.path.join(SCRIPTS_DIR, name))
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    sys.modules[name] = module
+    return module
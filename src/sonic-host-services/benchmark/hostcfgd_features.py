@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of applying the FEATURE table by hostcfgd.
+
+A FEATURE table of --features enabled features is applied with FeatureHandler.sync_state_field(), every
+third feature has a timer and every other one runs per ASIC on a device with --asics ASICs. The table is
+applied twice: at boot, when no unit is enabled yet, and after a restart of hostcfgd, when nothing changes.
+  legacy:  every unit operation forks `sudo systemctl`, like hostcfgd did before: a daemon-reload per
+           feature, a `systemctl show` per feature instance and an unmask, enable and start per unit.
+           sudo and systemctl are shell scripts in a temporary directory, which keep unit file states in
+           files and sleep like systemd
+  batched: FeatureHandler with hostcfgd.SystemdManager on a tests.hostcfgd.fake_systemd.FakeSystemd backend
+Both model a systemd method call with --call-ms, a daemon-reload with --reload-ms and a start or stop
+job with --job-ms. The benchmark reports the time, the forked commands, the systemd calls and reloads.
+sonic_py_common and swsscommon are replaced by fake_sonic. Run it from src/sonic-host-services:
+
+    python3 benchmark/hostcfgd_features.py --features 30 --asics 4
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_sonic import install_fake_sonic_modules, load_script
+from tests.hostcfgd.fake_systemd import FakeSystemd
+
+SYSTEMCTL_SCRIPT = """#!/bin/sh
+echo "systemctl $*" >> %(log)s
+state=%(states)s/$2
+case "$1" in
+    show) echo "UnitFileState=$(cat $state 2>/dev/null || echo disabled)" ;;
+    enable) echo enabled > $state ;;
+    disable) [ "$(cat $state 2>/dev/null)" = masked ] || echo disabled > $state ;;
+    mask) echo masked > $state ;;
+    unmask) [ "$(cat $state 2>/dev/null)" = masked ] && echo disabled > $state ;;
+esac
+case "$1" in
+    daemon-reload) sleep %(reload_secs)f ;;
+    start|stop) sleep %(job_secs)f ;;
+    *) sleep %(call_secs)f ;;
+esac
+exit 0
+"""
+
+SUDO_SCRIPT = """#!/bin/sh
+exec "$@"
+"""
+
+
+class FakeSystemctl(object):
+    """ sudo and systemctl commands in a temporary directory, which is put first in PATH """
+    def __init__(self, args):
+        self.dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.dir, 'commands.log')
+        states = os.path.join(self.dir, 'units')
+        os.mkdir(states)
+        scripts = {
+            'systemctl': SYSTEMCTL_SCRIPT % {'log': self.log, 'states': states, 'call_secs': args.call_ms / 1000.0,
+                                             'reload_secs': args.reload_ms / 1000.0,
+                                             'job_secs': args.job_ms / 1000.0},
+            'sudo': SUDO_SCRIPT,
+        }
+        for name, script in scripts.items():
+            path = os.path.join(self.dir, name)
+            with open(path, 'w') as f:
+                f.write(script)
+            os.chmod(path, 0o755)
+        self.old_path = os.environ.get('PATH', '')
+        os.environ['PATH'] = self.dir + os.pathsep + self.old_path
+
+    def commands(self):
+        """ Commands run since the last call """
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            commands = f.read().splitlines()
+        os.unlink(self.log)
+        return commands
+
+    def stop(self):
+        os.environ['PATH'] = self.old_path
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def legacy_feature_handler_class(hostcfgd):
+    """ FeatureHandler, which forks systemctl for every unit operation like hostcfgd did before """
+    class LegacyFeatureHandler(hostcfgd.FeatureHandler):
+        def run(self, cmd):
+            subprocess.check_call(cmd, shell=True)
+
+        def get_systemd_unit_state(self, unit):
+            proc = subprocess.Popen("sudo systemctl show {} --property UnitFileState".format(unit), shell=True,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            stdout, _ = proc.communicate()
+            return dict([line.split("=") for line in stdout.decode().strip().splitlines()])["UnitFileState"]
+
+        def update_features(self, config_features, state_features):
+            for feature in config_features:
+                self.update_systemd_config(feature)
+                self.run("sudo systemctl daemon-reload")
+            updated = set()
+            for feature in state_features:
+                action = self.get_feature_state_action(feature)
+                if action is None:
+                    continue
+                feature_names, feature_suffixes = self.get_multiasic_feature_instances(feature)
+                for feature_name in feature_names:
+                    unit = "{}.{}".format(feature_name, feature_suffixes[-1])
+                    unit_file_state = self.get_systemd_unit_state(unit)
+                    if action == 'enable' and unit_file_state != "enabled":
+                        for suffix in feature_suffixes:
+                            self.run("sudo systemctl unmask {}.{}".format(feature_name, suffix))
+                        self.run("sudo systemctl enable {}".format(unit))
+                        self.run("sudo systemctl start {}".format(unit))
+                    elif action == 'disable' and unit_file_state not in ("disabled", "masked"):
+                        for suffix in reversed(feature_suffixes):
+                            self.run("sudo systemctl stop {}.{}".format(feature_name, suffix))
+                        self.run("sudo systemctl disable {}".format(unit))
+                        self.run("sudo systemctl mask {}".format(unit))
+                self.set_feature_state(feature, self.FEATURE_STATE_ENABLED if action == 'enable'
+                                       else self.FEATURE_STATE_DISABLED)
+                updated.add(feature.name)
+            return updated
+    return LegacyFeatureHandler
+
+
+class FakeConfigDb(object):
+    def mod_entry(self, table, key, data):
+        pass
+
+
+class FakeStateTable(object):
+    def set(self, key, fvs):
+        pass
+
+
+def make_feature_table(args):
+    features = {}
+    for i in range(args.features):
+        features['feature%d' % i] = {
+            'state': 'enabled',
+            'auto_restart': 'enabled',
+            'has_timer': str(i % 3 == 2),
+            'has_global_scope': str(i % 2 == 0),
+            'has_per_asic_scope': str(i % 2 == 1),
+        }
+    return features
+
+
+def run_mode(mode, hostcfgd, args):
+    system_dir = tempfile.mkdtemp()
+    hostcfgd.FeatureHandler.SYSTEMD_SYSTEM_DIR = system_dir
+    hostcfgd.FeatureHandler.SYSTEMD_SERVICE_CONF_DIR = os.path.join(system_dir, '{}.service.d/')
+    fake_systemctl = FakeSystemctl(args) if mode == 'legacy' else None
+    fake_systemd = FakeSystemd(call_ms=args.call_ms, reload_ms=args.reload_ms, job_ms=args.job_ms)
+    feature_table = make_feature_table(args)
+
+    report = {}
+    for phase in ('boot', 'restart'):
+        if mode == 'legacy':
+            handler = legacy_feature_handler_class(hostcfgd)(FakeConfigDb(), FakeStateTable(), {})
+        else:
+            handler = hostcfgd.FeatureHandler(FakeConfigDb(), FakeStateTable(), {},
+                                              hostcfgd.SystemdManager(fake_systemd))
+        del fake_systemd.calls[:]
+        start = time.time()
+        handler.sync_state_field(feature_table)
+        elapsed = time.time() - start
+        if mode == 'legacy':
+            commands = fake_systemctl.commands()
+            report[phase] = {
+                'seconds': round(elapsed, 3),
+                'forks': len(commands),
+                'systemd_calls': len(commands),
+                'systemd_reloads': commands.count('systemctl daemon-reload'),
+            }
+        else:
+            report[phase] = {
+                'seconds': round(elapsed, 3),
+                'forks': 0,
+                'systemd_calls': len(fake_systemd.calls),
+                'systemd_reloads': fake_systemd.count('Reload'),
+            }
+
+    if fake_systemctl:
+        fake_systemctl.stop()
+    shutil.rmtree(system_dir, ignore_errors=True)
+    return report
+
+
+def load_hostcfgd(args):
+    """ Load hostcfgd with fake sonic modules on a device with args.asics ASICs, without syslog """
+    install_fake_sonic_modules()
+    device_info = sys.modules['sonic_py_common.device_info']
+    device_info.is_multi_npu = lambda: args.asics > 1
+    device_info.get_num_npus = lambda: args.asics
+    swsscommon = sys.modules['swsscommon.swsscommon']
+    swsscommon.DBConnector = swsscommon.Table = object
+    hostcfgd = load_script('hostcfgd')
+    hostcfgd.syslog = types.SimpleNamespace(syslog=lambda *args: None, **{
+        name: 0 for name in ('LOG_ERR', 'LOG_WARNING', 'LOG_INFO', 'LOG_DEBUG')})
+    hostcfgd.SystemdManager.JOB_POLL_SECS = args.job_ms / 4000.0
+    return hostcfgd
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    hostcfgd = load_hostcfgd(args)
+    return {mode: run_mode(mode, hostcfgd, args) for mode in ('legacy', 'batched')}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="hostcfgd FEATURE table benchmark")
+    parser.add_argument("--features", type=int, default=30, help="number of features")
+    parser.add_argument("--asics", type=int, default=4, help="number of ASICs, 1 for a single ASIC device")
+    parser.add_argument("--call-ms", type=float, default=2.0, help="time systemd spends on a method call")
+    parser.add_argument("--reload-ms", type=float, default=150.0, help="time systemd spends on a daemon-reload")
+    parser.add_argument("--job-ms", type=float, default=20.0, help="time systemd spends on a start or stop job")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of programming the TCPMSS mangle rules of loopback addresses by hostcfgd.
+
+A LOOPBACK_INTERFACE table of --loopbacks IPv4 and as many IPv6 addresses is loaded twice: at boot, when the
+mangle table is empty, and after a restart of hostcfgd, when all rules are present. Then --changes loopback
+addresses are removed and added again one event at a time.
+  legacy:  like hostcfgd did before, every rule is checked with `iptables -t mangle --check` and appended with
+           `iptables -t mangle --append` or deleted with `--delete`, one command per rule
+  batched: hostcfgd.Iptables, which diffs the rules against iptables-save and applies the changed ones with
+           one iptables-restore per IP version
+iptables and its save and restore commands are fake_iptables.FakeIptables, every command sleeps --commit-ms.
+The benchmark reports the time and the forked commands of every phase.
+sonic_py_common and swsscommon are replaced by fake_sonic. Run it from src/sonic-host-services:
+
+    python3 benchmark/hostcfgd_mangle.py --loopbacks 8 --changes 20
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from fake_iptables import FakeIptables
+from hostcfgd_features import load_hostcfgd
+
+
+def legacy_iptables_class(hostcfgd):
+    """ Iptables, which forks iptables for every rule like hostcfgd did before """
+    class LegacyIptables(hostcfgd.Iptables):
+        def __init__(self, rules):
+            super(LegacyIptables, self).__init__()
+            # rules of the fake mangle table, as the fake `iptables --check` always succeeds
+            self.rules = rules
+
+        def command(self, chain, ip, ver, op):
+            cmd = 'iptables' if ver == '4' else 'ip6tables'
+            match = '-d' if chain == 'PREROUTING' else '-s'
+            mss = self.tcpmss if ver == '4' else self.tcp6mss
+            return '{} -t mangle --{} {} -p tcp --tcp-flags SYN SYN {} {} -j TCPMSS --set-mss {}'.format(
+                cmd, op, chain, match, ip, mss)
+
+        def mangle_handler(self, ip, ver, add):
+            for chain in self.CHAINS:
+                rule = (chain, ip)
+                subprocess.call(self.command(chain, ip, ver, 'check'), shell=True)
+                if add and rule not in self.rules:
+                    subprocess.check_call(self.command(chain, ip, ver, 'append'), shell=True)
+                    self.rules.add(rule)
+                elif not add and rule in self.rules:
+                    subprocess.check_call(self.command(chain, ip, ver, 'delete'), shell=True)
+                    self.rules.discard(rule)
+
+        def iptables_handler(self, key, data, add=True):
+            iface, ip = key
+            ip_str = ip.split("/")[0]
+            self.mangle_handler(ip_str, '6' if ':' in ip_str else '4', add)
+
+        def load(self, lpbk_table):
+            for row in lpbk_table:
+                self.iptables_handler(row, lpbk_table[row])
+    return LegacyIptables
+
+
+def make_loopback_table(args):
+    table = {}
+    for idx in range(args.loopbacks):
+        table[('Loopback%d' % idx, '10.1.%d.%d/32' % (idx // 256, idx % 256))] = {}
+        table[('Loopback%d' % idx, 'fc00:1::%x/128' % (idx + 1))] = {}
+    return table
+
+
+def run_mode(mode, hostcfgd, args):
+    fake_iptables = FakeIptables(args.commit_ms)
+    lpbk_table = make_loopback_table(args)
+    legacy_rules = set()
+
+    def new_iptables():
+        if mode == 'legacy':
+            return legacy_iptables_class(hostcfgd)(legacy_rules)
+        return hostcfgd.Iptables()
+
+    def measure(func):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        return {'seconds': round(elapsed, 3), 'forks': len(fake_iptables.commands())}
+
+    report = {}
+    iptables = new_iptables()
+    report['boot'] = measure(lambda: iptables.load(lpbk_table))
+    if mode == 'batched':
+        # the restarted hostcfgd reads the rules programmed at boot
+        for ver, name in (('4', 'iptables-save'), ('6', 'ip6tables-save')):
+            fake_iptables.set_save_output(name, '*mangle\n' + '\n'.join(iptables.mangle_rules[ver]) + '\nCOMMIT\n')
+    iptables = new_iptables()
+    report['restart'] = measure(lambda: iptables.load(lpbk_table))
+
+    def changes():
+        keys = sorted(lpbk_table)
+        for idx in range(args.changes):
+            key = keys[idx % len(keys)]
+            iptables.iptables_handler(key, {}, add=False)
+            iptables.iptables_handler(key, {}, add=True)
+    report['changes'] = measure(changes)
+    fake_iptables.stop()
+    return report
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    hostcfgd = load_hostcfgd(argparse.Namespace(asics=1, job_ms=0.0))
+    return {mode: run_mode(mode, hostcfgd, args) for mode in ('legacy', 'batched')}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="hostcfgd loopback mangle rule benchmark")
+    parser.add_argument("--loopbacks", type=int, default=8, help="number of IPv4 and of IPv6 loopback addresses")
+    parser.add_argument("--changes", type=int, default=20, help="number of loopback addresses removed and added")
+    parser.add_argument("--commit-ms", type=float, default=5.0, help="time the kernel spends on a table commit")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of the hostcfgd startup while systemd is still starting up.
+
+hostcfgd starts --startup-ms before systemd finishes starting up. It loads a FEATURE table of --features
+enabled features and receives --changes INTERFACE address changes, which AaaCfg keeps for the source
+addresses of AAA servers and which, like other tables, do not depend on systemd:
+  blocking: like hostcfgd did before, nothing is handled until systemd finished starting up, which
+            `systemctl is-system-running --wait` is modeled by polling the system state every --poll-ms
+  deferred: FeatureHandler.defer_until_systemd_ready(), other changes are handled right away and the FEATURE
+            unit operations are applied in one batch once systemd emits StartupFinished
+systemd is a tests.hostcfgd.fake_systemd.FakeSystemd with --call-ms per method call, --reload-ms per reload and --job-ms
+per start job. The benchmark reports the time from the hostcfgd start to the first and to the last applied
+INTERFACE change, the time until all features are applied and the systemd reloads.
+sonic_py_common and swsscommon are replaced by fake_sonic. Run it from src/sonic-host-services:
+
+    python3 benchmark/hostcfgd_startup.py --startup-ms 2000 --features 30
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, BENCHMARK_DIR)
+
+from tests.hostcfgd.fake_systemd import FakeSystemd
+from hostcfgd_features import FakeConfigDb, load_hostcfgd, make_feature_table
+
+
+class TimedStateTable(object):
+    """ STATE_DB FEATURE table, which records when the last feature state was set """
+    def __init__(self, features):
+        self.pending = features
+        self.done = threading.Event()
+        self.done_time = None
+
+    def set(self, key, fvs):
+        self.pending -= 1
+        if self.pending == 0:
+            self.done_time = time.time()
+            self.done.set()
+
+
+def run_mode(mode, hostcfgd, args):
+    system_dir = tempfile.mkdtemp()
+    hostcfgd.FeatureHandler.SYSTEMD_SYSTEM_DIR = system_dir
+    hostcfgd.FeatureHandler.SYSTEMD_SERVICE_CONF_DIR = os.path.join(system_dir, '{}.service.d/')
+    feature_table = make_feature_table(args)
+    state_table = TimedStateTable(len(feature_table))
+    change_times = []
+
+    start = time.time()
+    fake_systemd = FakeSystemd(call_ms=args.call_ms, reload_ms=args.reload_ms, job_ms=args.job_ms,
+                               startup_ms=args.startup_ms)
+    systemd = hostcfgd.SystemdManager(fake_systemd)
+    handler = hostcfgd.FeatureHandler(FakeConfigDb(), state_table, {}, systemd)
+    if mode == 'blocking':
+        while not systemd.is_startup_finished():
+            time.sleep(args.poll_ms / 1000.0)
+    else:
+        handler.defer_until_systemd_ready()
+
+    handler.sync_state_field(feature_table)
+    aaacfg = hostcfgd.AaaCfg()
+    for idx in range(args.changes):
+        aaacfg.interface_ip_update(('Ethernet%d' % idx, '10.%d.%d.0/31' % (idx // 256, idx % 256)), 'SET')
+        change_times.append(time.time())
+    state_table.done.wait()
+
+    report = {
+        'first_change_ms': round((change_times[0] - start) * 1000, 1) if change_times else None,
+        'last_change_ms': round((change_times[-1] - start) * 1000, 1) if change_times else None,
+        'features_applied_ms': round((state_table.done_time - start) * 1000, 1),
+        'systemd_reloads': fake_systemd.count('Reload'),
+    }
+    shutil.rmtree(system_dir, ignore_errors=True)
+    return report
+
+
+def run(args):
+    """ Run the benchmark and return the report as a dictionary """
+    hostcfgd = load_hostcfgd(args)
+    return {mode: run_mode(mode, hostcfgd, args) for mode in ('blocking', 'deferred')}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="hostcfgd startup benchmark")
+    parser.add_argument("--startup-ms", type=float, default=2000.0, help="time until systemd finished starting up")
+    parser.add_argument("--features", type=int, default=30, help="number of features")
+    parser.add_argument("--asics", type=int, default=1, help="number of ASICs, 1 for a single ASIC device")
+    parser.add_argument("--changes", type=int, default=100, help="number of INTERFACE address changes")
+    parser.add_argument("--poll-ms", type=float, default=100.0, help="system state poll interval of blocking mode")
+    parser.add_argument("--call-ms", type=float, default=2.0, help="time systemd spends on a method call")
+    parser.add_argument("--reload-ms", type=float, default=150.0, help="time systemd spends on a daemon-reload")
+    parser.add_argument("--job-ms", type=float, default=20.0, help="time systemd spends on a start or stop job")
+    return parser.parse_args(argv)
+
+
+def main():
+    report = run(parse_args())
+    print(json.dumps(report, indent=4, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import os
+import sys
+import swsscommon
+
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.common.mock_configdb import MockConfigDb
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+CONFIG_DB = {
+    "DEVICE_METADATA": {
+        "localhost": {
+            "type": "ToRRouter",
+        }
+    },
+    "ACL_TABLE": {
+        "SSH_ONLY": {
+            "services": ["SSH"],
+            "type": "CTRLPLANE",
+        },
+        "DATAACL": {
+            "ports": ["Ethernet0"],
+            "type": "L3",
+        },
+    },
+}
+
+
+class TestCaclmgrdAclEvent(TestCase):
+    """
+        Test caclmgrd filtering of ACL_TABLE and ACL_RULE events
+    """
+    def setUp(self):
+        swsscommon.swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+
+    @patchfs
+    def test_caclmgrd_acl_event(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(CONFIG_DB)
+
+        with mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('', ''), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.update_acl_table_types('')
+            is_ctrl_plane_acl_event = lambda key, op, fvs=(): caclmgrd_daemon.is_ctrl_plane_acl_event('', key, op, fvs, '|')
+
+            with mock.patch.object(MockConfigDb, "get_table") as mocked_get_table:
+                self.assertTrue(is_ctrl_plane_acl_event("SSH_ONLY|RULE_1", "SET", (("SRC_IP", "10.0.0.1/32"),)))
+                self.assertFalse(is_ctrl_plane_acl_event("DATAACL|RULE_1", "SET", (("SRC_IP", "10.0.0.1/32"),)))
+                self.assertTrue(is_ctrl_plane_acl_event("SSH_ONLY|RULE_1", "DEL"))
+                # rules of unknown tables are applied along with the table
+                self.assertFalse(is_ctrl_plane_acl_event("NTP_ONLY|RULE_1", "SET", (("SRC_IP", "10.0.0.1/32"),)))
+
+                # table events of data plane ACL tables are ignored
+                self.assertFalse(is_ctrl_plane_acl_event("EVERFLOW", "SET", (("type", "MIRROR"),)))
+                self.assertTrue(is_ctrl_plane_acl_event("NTP_ONLY", "SET", (("type", "CTRLPLANE"), ("services@", "NTP"))))
+                self.assertTrue(is_ctrl_plane_acl_event("NTP_ONLY|RULE_1", "SET", (("SRC_IP", "10.0.0.1/32"),)))
+
+                # changing the type of a table from or to CTRLPLANE
+                self.assertTrue(is_ctrl_plane_acl_event("NTP_ONLY", "SET", (("type", "L3"),)))
+                self.assertFalse(is_ctrl_plane_acl_event("NTP_ONLY|RULE_1", "SET", (("SRC_IP", "10.0.0.1/32"),)))
+                self.assertTrue(is_ctrl_plane_acl_event("DATAACL", "SET", (("type", "CTRLPLANE"),)))
+                self.assertTrue(is_ctrl_plane_acl_event("DATAACL|RULE_1", "DEL"))
+
+                self.assertTrue(is_ctrl_plane_acl_event("SSH_ONLY", "DEL"))
+                self.assertFalse(is_ctrl_plane_acl_event("SSH_ONLY|RULE_2", "DEL"))
+
+                # ACL_TABLE is not read for any event
+                mocked_get_table.assert_not_called()
@@ -35,19 +35,34 @@ class TestCaclmgrdDhcp(TestCase):
 
         with mock.patch("caclmgrd.subprocess") as mocked_subprocess:
             popen_mock = mock.Mock()
-            popen_attrs = test_data["popen_attributes"]
-            popen_mock.configure_mock(**popen_attrs)
+            popen_mock.configure_mock(**{'communicate.return_value': (test_data["iptables_save"], ''),
+                                         'returncode': 0})
             mocked_subprocess.Popen.return_value = popen_mock
 
-            call_rc = test_data["call_rc"]
-            mocked_subprocess.call.return_value = call_rc
-
             mark = test_data["mark"]
 
             caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.setup_dhcp_chain('')
+            mocked_subprocess.Popen.reset_mock()
+            popen_mock.communicate.reset_mock()
+
             mux_update = test_data["mux_update"]
 
             for key,data in mux_update:
                 caclmgrd_daemon.update_dhcp_acl(key, '', data, mark)
+            # nothing is applied until the DHCP chains are updated
+            mocked_subprocess.Popen.assert_not_called()
+
+            num_changes = caclmgrd_daemon.update_dhcp_chains()
 
-            mocked_subprocess.call.assert_has_calls(test_data["expected_subprocess_calls"], any_order=False)
+            expected_restore_input = test_data["expected_restore_input"]
+            if expected_restore_input is None:
+                mocked_subprocess.Popen.assert_not_called()
+                self.assertEqual(num_changes, 0)
+            else:
+                self.assertEqual(mocked_subprocess.Popen.call_count, 1)
+                self.assertEqual(mocked_subprocess.Popen.call_args[0][0], "iptables-restore --noflush")
+                popen_mock.communicate.assert_called_once_with(input=expected_restore_input)
+                self.assertEqual(num_changes, expected_restore_input.count("DHCP"))
+                # the chain is not updated again once it matches the MUX port states
+                self.assertEqual(caclmgrd_daemon.update_dhcp_chains(), 0)
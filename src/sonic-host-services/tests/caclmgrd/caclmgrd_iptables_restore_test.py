@@ -0,0 +1,180 @@
+import copy
+import os
+import sys
+import swsscommon
+
+from parameterized import parameterized
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from .test_iptables_restore_vectors import CACLMGRD_IPTABLES_RESTORE_TEST_VECTOR, CACLMGRD_IPSET_TEST_VECTOR
+from tests.common.mock_configdb import MockConfigDb
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+class TestCaclmgrdIptablesRestore(TestCase):
+    """
+        Test caclmgrd iptables-restore backend
+    """
+    def setUp(self):
+        swsscommon.swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+
+    def update_control_plane_acls(self, caclmgrd_daemon, mocked_subprocess):
+        """ Returns the commands run by an update and the input given to them """
+        mocked_subprocess.Popen.reset_mock()
+        mocked_subprocess.Popen.return_value.communicate.reset_mock()
+        caclmgrd_daemon.update_control_plane_acls('')
+        popen_cmds = [c[0][0] for c in mocked_subprocess.Popen.call_args_list]
+        return popen_cmds, mocked_subprocess.Popen.return_value.communicate.call_args_list
+
+    def run_test(self, test_data, returncode, test_func):
+        MockConfigDb.set_config_db(copy.deepcopy(test_data["config_db"]))
+
+        with mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': (test_data["chain_list"], ''),
+                                         'returncode': returncode})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            test_func(caclmgrd_daemon, mocked_subprocess)
+
+    @parameterized.expand(CACLMGRD_IPTABLES_RESTORE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_iptables_restore(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        def test_func(caclmgrd_daemon, mocked_subprocess):
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+
+            # ipsets and chains are listed, then one iptables-restore per address family is run
+            assert popen_cmds == ["ipset list -n", "iptables -L -v -n | grep Chain | awk '{print $2}'",
+                                  "iptables-restore --noflush", "ip6tables-restore --noflush"]
+            assert communicate_calls[2] == mock.call(input=test_data["expected_restore_input"]["iptables"])
+            assert communicate_calls[3] == mock.call(input=test_data["expected_restore_input"]["ip6tables"])
+
+        self.run_test(test_data, 0, test_func)
+
+    @parameterized.expand(CACLMGRD_IPTABLES_RESTORE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_iptables_restore_fallback(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        def test_func(caclmgrd_daemon, mocked_subprocess):
+            popen_cmds, _ = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+
+            # The commands are run one by one if iptables-restore fails
+            ipv4_cmds = [c for c in popen_cmds if c.startswith("iptables ")]
+            assert popen_cmds[2] == "iptables-restore --noflush"
+            assert "iptables -P INPUT ACCEPT" in ipv4_cmds
+            assert ipv4_cmds[-1] == "iptables -A INPUT -j DROP"
+            assert "ip6tables-restore --noflush" in popen_cmds
+            assert popen_cmds[-1] == "ip6tables -A INPUT -j DROP"
+
+            # All rules are replaced again on the next update
+            popen_cmds, _ = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert "iptables -P INPUT ACCEPT" in popen_cmds
+
+        self.run_test(test_data, 1, test_func)
+
+    @parameterized.expand(CACLMGRD_IPTABLES_RESTORE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_iptables_restore_dry_run(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        def test_func(caclmgrd_daemon, mocked_subprocess):
+            caclmgrd_daemon.dry_run = True
+            with mock.patch("builtins.print") as mocked_print:
+                popen_cmds, _ = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+
+            # Nothing but the ipset and chain list commands is run
+            assert popen_cmds == ["ipset list -n", "iptables -L -v -n | grep Chain | awk '{print $2}'"]
+            mocked_print.assert_any_call("# iptables-restore --noflush")
+            mocked_print.assert_any_call(test_data["expected_restore_input"]["ip6tables"], end="")
+
+        self.run_test(test_data, 0, test_func)
+
+    @parameterized.expand(CACLMGRD_IPTABLES_RESTORE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_iptables_restore_table_chain(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        def test_func(caclmgrd_daemon, mocked_subprocess):
+            self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+
+            # Nothing is run if nothing changed, even after BFD is allowed
+            caclmgrd_daemon.allow_bfd_protocol('')
+            caclmgrd_daemon.bfdAllowed = True
+            popen_cmds, _ = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds == []
+
+            # Only the chain of the changed table is rebuilt
+            MockConfigDb.get_config_db()["ACL_RULE"].update(test_data["rule_update"])
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds == ["iptables-restore --noflush"]
+            assert communicate_calls == [mock.call(input=test_data["expected_update_restore_input"])]
+
+            # All rules are replaced when a table is removed
+            MockConfigDb.get_config_db()["ACL_TABLE"].clear()
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds[1:] == ["iptables-restore --noflush", "ip6tables-restore --noflush"]
+            assert "CACL-SSH_ONLY" not in communicate_calls[1][1]["input"]
+
+        self.run_test(test_data, 0, test_func)
+
+    @parameterized.expand(CACLMGRD_IPSET_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_ipset(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        def test_func(caclmgrd_daemon, mocked_subprocess):
+            # The ipset is created before the rules referencing it are added
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds[2:] == ["ipset restore", "iptables-restore --noflush", "ip6tables-restore --noflush"]
+            assert communicate_calls[2] == mock.call(input=test_data["expected_ipset_restore_input"])
+            assert test_data["expected_rule"] in communicate_calls[3][1]["input"]
+
+            # After a restart, an ipset left by the previous run is not flushed while
+            # rules may reference it: its prefixes are written to the standby ipset,
+            # which is swapped with it once the rules are replaced
+            caclmgrd_daemon.programmed_acls.clear()
+            caclmgrd_daemon.standby_ipsets.clear()
+            with mock.patch.object(caclmgrd_daemon, "get_ipset_list", return_value=[test_data["live_ipset"]]):
+                popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds[1:] == ["ipset restore", "iptables-restore --noflush", "ip6tables-restore --noflush", "ipset restore"]
+            assert communicate_calls[1] == mock.call(input=test_data["expected_restart_ipset_restore_input"])
+            assert communicate_calls[4] == mock.call(input=test_data["expected_swap_ipset_restore_input"])
+
+            # Changed prefixes are written to the standby ipset, which is swapped
+            # with the live one, the rules are left alone
+            MockConfigDb.get_config_db()["ACL_RULE"].update(test_data["rule_update"])
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds == ["ipset restore"]
+            assert communicate_calls == [mock.call(input=test_data["expected_update_ipset_restore_input"])]
+
+            # The standby ipset holds the previous prefixes, only deltas are written to it
+            MockConfigDb.get_config_db()["ACL_RULE"].update(test_data["second_rule_update"])
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds == ["ipset restore"]
+            assert communicate_calls == [mock.call(input=test_data["expected_second_update_ipset_restore_input"])]
+
+            # The ipset is destroyed after the rules referencing it are removed
+            MockConfigDb.get_config_db()["ACL_TABLE"].clear()
+            popen_cmds, communicate_calls = self.update_control_plane_acls(caclmgrd_daemon, mocked_subprocess)
+            assert popen_cmds[1:] == ["iptables-restore --noflush", "ip6tables-restore --noflush", "ipset restore"]
+            assert communicate_calls[3] == mock.call(input=test_data["expected_delete_ipset_restore_input"])
+
+        self.run_test(test_data, 0, test_func)
@@ -1,5 +1,3 @@
-from unittest.mock import call
-
 """
     caclmgrd dhcp test vector
 """
@@ -19,16 +17,11 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 ("Ethernet4", {"state": "active"}),
                 ("Ethernet8", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --delete DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-                call("iptables --delete DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 0,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -m physdev --physdev-in Ethernet4 -j DROP\n-A DHCP -m physdev --physdev-in Ethernet8 -j DROP\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": "*filter\n"
+                                      "-D DHCP -m physdev --physdev-in Ethernet4 -j DROP\n"
+                                      "-D DHCP -m physdev --physdev-in Ethernet8 -j DROP\n"
+                                      "COMMIT\n",
             "mark": None,
         },
     ],
@@ -46,14 +39,10 @@ CACLMGRD_DHCP_TEST_VECTOR = [
             "mux_update": [
                 ("Ethernet4", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-                call("iptables --delete DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 0,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -m mark --mark 0x67004 -j DROP\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": "*filter\n"
+                                      "-D DHCP -m mark --mark 0x67004 -j DROP\n"
+                                      "COMMIT\n",
             "mark": "0x67004",
         },
     ],
@@ -72,14 +61,8 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 ("Ethernet4", {"state": "active"}),
                 ("Ethernet8", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 1,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": None,
             "mark": None,
         },
     ],
@@ -97,13 +80,8 @@ CACLMGRD_DHCP_TEST_VECTOR = [
             "mux_update": [
                 ("Ethernet4", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 1,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": None,
             "mark": "0x67004",
         },
     ],
@@ -122,14 +100,8 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 ("Ethernet4", {"state": "standby"}),
                 ("Ethernet8", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 0,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -m physdev --physdev-in Ethernet4 -j DROP\n-A DHCP -m physdev --physdev-in Ethernet8 -j DROP\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": None,
             "mark": None,
         },
     ],
@@ -147,13 +119,8 @@ CACLMGRD_DHCP_TEST_VECTOR = [
             "mux_update": [
                 ("Ethernet4", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 0,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -m mark --mark 0x67004 -j DROP\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": None,
             "mark": "0x67004",
         },
     ],
@@ -172,16 +139,11 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 ("Ethernet4", {"state": "standby"}),
                 ("Ethernet8", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --insert DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-                call("iptables --insert DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 1,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": "*filter\n"
+                                      "-I DHCP -m physdev --physdev-in Ethernet4 -j DROP\n"
+                                      "-I DHCP -m physdev --physdev-in Ethernet8 -j DROP\n"
+                                      "COMMIT\n",
             "mark": None,
         },
     ],
@@ -199,14 +161,10 @@ CACLMGRD_DHCP_TEST_VECTOR = [
             "mux_update": [
                 ("Ethernet4", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-                call("iptables --insert DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 1,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": "*filter\n"
+                                      "-I DHCP -m mark --mark 0x67004 -j DROP\n"
+                                      "COMMIT\n",
             "mark": "0x67004",
         },
     ],
@@ -225,16 +183,11 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 ("Ethernet4", {"state": "unknown"}),
                 ("Ethernet8", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --delete DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-                call("iptables --delete DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 0,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -m physdev --physdev-in Ethernet4 -j DROP\n-A DHCP -m physdev --physdev-in Ethernet8 -j DROP\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": "*filter\n"
+                                      "-D DHCP -m physdev --physdev-in Ethernet4 -j DROP\n"
+                                      "-D DHCP -m physdev --physdev-in Ethernet8 -j DROP\n"
+                                      "COMMIT\n",
             "mark": None,
         },
     ],
@@ -252,14 +205,10 @@ CACLMGRD_DHCP_TEST_VECTOR = [
             "mux_update": [
                 ("Ethernet4", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-                call("iptables --delete DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 0,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -m mark --mark 0x67004 -j DROP\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": "*filter\n"
+                                      "-D DHCP -m mark --mark 0x67004 -j DROP\n"
+                                      "COMMIT\n",
             "mark": "0x67004",
         },
     ],
@@ -278,14 +227,8 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 ("Ethernet4", {"state": "unknown"}),
                 ("Ethernet8", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet4 -j DROP", shell=True),
-                call("iptables --check DHCP -m physdev --physdev-in Ethernet8 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 1,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": None,
             "mark": None,
         },
     ],
@@ -303,13 +246,8 @@ CACLMGRD_DHCP_TEST_VECTOR = [
             "mux_update": [
                 ("Ethernet4", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call("iptables --check DHCP -m mark --mark 0x67004 -j DROP", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error'),
-            },
-            "call_rc": 1,
+            "iptables_save": "*filter\n:INPUT ACCEPT [0:0]\n:DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT\n",
+            "expected_restore_input": None,
             "mark": "0x67004",
         },
     ],
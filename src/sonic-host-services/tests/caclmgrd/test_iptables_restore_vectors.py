@@ -0,0 +1,178 @@
+"""
+    caclmgrd iptables-restore test vector
+"""
+CACLMGRD_IPTABLES_RESTORE_TEST_VECTOR = [
+    [
+        "SSH_ACL_DUALTOR",
+        {
+            "config_db": {
+                "DEVICE_METADATA": {
+                    "localhost": {
+                        "subtype": "DualToR",
+                        "type": "ToRRouter",
+                    }
+                },
+                "ACL_TABLE": {
+                    "SSH_ONLY": {
+                        "type": "CTRLPLANE",
+                        "services": ["SSH"],
+                    },
+                    "DATAACL": {
+                        "type": "L3",
+                    },
+                },
+                "ACL_RULE": {
+                    ("SSH_ONLY", "RULE_1"): {
+                        "PRIORITY": "9999",
+                        "SRC_IP": "10.0.0.0/8",
+                        "PACKET_ACTION": "ACCEPT",
+                    },
+                },
+                "LOOPBACK_INTERFACE": {
+                    ("Loopback0", "10.1.0.1/32"): {},
+                },
+                "MGMT_INTERFACE": {},
+                "VLAN_INTERFACE": {},
+                "PORTCHANNEL_INTERFACE": {},
+                "INTERFACE": {},
+            },
+            "chain_list": "INPUT\nFORWARD\nOUTPUT\nDHCP\n",
+            "expected_restore_input": {
+                "iptables": "*filter\n"
+                            ":INPUT ACCEPT [0:0]\n"
+                            ":FORWARD ACCEPT [0:0]\n"
+                            ":OUTPUT ACCEPT [0:0]\n"
+                            "-F INPUT\n"
+                            "-F FORWARD\n"
+                            "-F OUTPUT\n"
+                            "-N CACL-SSH_ONLY\n"
+                            "-A CACL-SSH_ONLY -p tcp -s 10.0.0.0/8 --dport 22 -j ACCEPT\n"
+                            "-A INPUT -s 127.0.0.1 -i lo -j ACCEPT\n"
+                            "-A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT\n"
+                            "-A INPUT -p icmp --icmp-type echo-request -j ACCEPT\n"
+                            "-A INPUT -p icmp --icmp-type echo-reply -j ACCEPT\n"
+                            "-A INPUT -p icmp --icmp-type destination-unreachable -j ACCEPT\n"
+                            "-A INPUT -p icmp --icmp-type time-exceeded -j ACCEPT\n"
+                            "-A INPUT -p udp --dport 67 -j DHCP\n"
+                            "-A INPUT -p udp --dport 67:68 -j ACCEPT\n"
+                            "-A INPUT -p udp --dport 546:547 -j ACCEPT\n"
+                            "-A INPUT -p tcp --dport 179 -j ACCEPT\n"
+                            "-A INPUT -j CACL-SSH_ONLY\n"
+                            "-A INPUT -d 10.1.0.1/32 -j DROP\n"
+                            "-A INPUT -m ttl --ttl-lt 2 -j ACCEPT\n"
+                            "-A INPUT -j DROP\n"
+                            "COMMIT\n",
+                "ip6tables": "*filter\n"
+                             ":INPUT ACCEPT [0:0]\n"
+                             ":FORWARD ACCEPT [0:0]\n"
+                             ":OUTPUT ACCEPT [0:0]\n"
+                             "-F\n"
+                             "-X\n"
+                             "-A INPUT -s ::1 -i lo -j ACCEPT\n"
+                             "-A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type echo-request -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type echo-reply -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type destination-unreachable -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type time-exceeded -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type neighbor-solicitation -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type neighbor-advertisement -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type router-solicitation -j ACCEPT\n"
+                             "-A INPUT -p icmpv6 --icmpv6-type router-advertisement -j ACCEPT\n"
+                             "-A INPUT -p udp --dport 67:68 -j ACCEPT\n"
+                             "-A INPUT -p udp --dport 546:547 -j ACCEPT\n"
+                             "-A INPUT -p tcp --dport 179 -j ACCEPT\n"
+                             "-A INPUT -p tcp -m hl --hl-lt 2 -j ACCEPT\n"
+                             "-A INPUT -j DROP\n"
+                             "COMMIT\n",
+            },
+            "rule_update": {
+                ("SSH_ONLY", "RULE_1"): {
+                    "PRIORITY": "9999",
+                    "SRC_IP": "10.2.0.0/16",
+                    "PACKET_ACTION": "ACCEPT",
+                },
+            },
+            "expected_update_restore_input": "*filter\n"
+                                             "-F CACL-SSH_ONLY\n"
+                                             "-A CACL-SSH_ONLY -p tcp -s 10.2.0.0/16 --dport 22 -j ACCEPT\n"
+                                             "COMMIT\n",
+        }
+    ]
+]
+
+CACLMGRD_IPSET_TEST_VECTOR = [
+    [
+        "SSH_ACL_IPSET",
+        {
+            "config_db": {
+                "DEVICE_METADATA": {
+                    "localhost": {
+                        "type": "ToRRouter",
+                    }
+                },
+                "ACL_TABLE": {
+                    "SSH_ONLY": {
+                        "type": "CTRLPLANE",
+                        "services": ["SSH"],
+                    },
+                },
+                "ACL_RULE": dict([
+                    (("SSH_ONLY", "RULE_{}".format(i)), {
+                        "PRIORITY": str(9990 + i),
+                        "SRC_IP": "10.{}.0.0/16".format(i),
+                        "PACKET_ACTION": "ACCEPT",
+                    }) for i in range(8)
+                ] + [
+                    (("SSH_ONLY", "DEFAULT_RULE"), {
+                        "PRIORITY": "1",
+                        "ETHER_TYPE": "2048",
+                        "PACKET_ACTION": "DROP",
+                    }),
+                ]),
+                "MGMT_INTERFACE": {},
+                "LOOPBACK_INTERFACE": {},
+                "VLAN_INTERFACE": {},
+                "PORTCHANNEL_INTERFACE": {},
+                "INTERFACE": {},
+            },
+            "chain_list": "INPUT\nFORWARD\nOUTPUT\n",
+            "expected_ipset_restore_input": "create CACL-SSH_ONLY-9997-v4 hash:net family inet -exist\n"
+                                            "flush CACL-SSH_ONLY-9997-v4\n" +
+                                            "".join("add CACL-SSH_ONLY-9997-v4 10.{}.0.0/16 -exist\n".format(i) for i in range(8)),
+            "expected_rule": "-A CACL-SSH_ONLY -p tcp -m set --match-set CACL-SSH_ONLY-9997-v4 src --dport 22 -j ACCEPT\n"
+                             "-A CACL-SSH_ONLY -p tcp --dport 22 -j DROP\n",
+            "live_ipset": "CACL-SSH_ONLY-9997-v4",
+            "expected_restart_ipset_restore_input": "create CACL-SSH_ONLY-9997-v4-s hash:net family inet -exist\n"
+                                                    "flush CACL-SSH_ONLY-9997-v4-s\n" +
+                                                    "".join("add CACL-SSH_ONLY-9997-v4-s 10.{}.0.0/16 -exist\n".format(i)
+                                                            for i in range(8)),
+            "expected_swap_ipset_restore_input": "swap CACL-SSH_ONLY-9997-v4 CACL-SSH_ONLY-9997-v4-s\n",
+            "rule_update": {
+                ("SSH_ONLY", "RULE_0"): {
+                    "PRIORITY": "9990",
+                    "SRC_IP": "10.100.0.0/16",
+                    "PACKET_ACTION": "ACCEPT",
+                },
+            },
+            "expected_update_ipset_restore_input": "create CACL-SSH_ONLY-9997-v4-s hash:net family inet -exist\n"
+                                                   "flush CACL-SSH_ONLY-9997-v4-s\n" +
+                                                   "".join("add CACL-SSH_ONLY-9997-v4-s 10.{}.0.0/16 -exist\n".format(i)
+                                                           for i in [1, 100, 2, 3, 4, 5, 6, 7]) +
+                                                   "swap CACL-SSH_ONLY-9997-v4 CACL-SSH_ONLY-9997-v4-s\n",
+            "second_rule_update": {
+                ("SSH_ONLY", "RULE_1"): {
+                    "PRIORITY": "9991",
+                    "SRC_IP": "10.101.0.0/16",
+                    "PACKET_ACTION": "ACCEPT",
+                },
+            },
+            "expected_second_update_ipset_restore_input": "del CACL-SSH_ONLY-9997-v4-s 10.0.0.0/16 -exist\n"
+                                                          "del CACL-SSH_ONLY-9997-v4-s 10.1.0.0/16 -exist\n"
+                                                          "add CACL-SSH_ONLY-9997-v4-s 10.100.0.0/16 -exist\n"
+                                                          "add CACL-SSH_ONLY-9997-v4-s 10.101.0.0/16 -exist\n"
+                                                          "swap CACL-SSH_ONLY-9997-v4 CACL-SSH_ONLY-9997-v4-s\n",
+            "expected_delete_ipset_restore_input": "destroy CACL-SSH_ONLY-9997-v4\n"
+                                                   "destroy CACL-SSH_ONLY-9997-v4-s\n",
+        }
+    ]
+]
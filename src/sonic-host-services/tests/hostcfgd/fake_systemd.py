@@ -0,0 +1,166 @@
+"""
+Fake systemd for the hostcfgd tests and the sonic-host-services offline benchmarks.
+
+FakeSystemd has the methods of the org.freedesktop.systemd1.Manager D-Bus interface used by
+hostcfgd.SystemdManager. It keeps unit file states and active states of units, every call sleeps
+call_ms like a D-Bus round trip, Reload() sleeps reload_ms and start and stop jobs finish job_ms
+after they were queued. If startup_ms is given, the system state is 'starting' until startup_ms after
+creation, then StartupFinished is emitted. Calls are recorded in `calls` as (method, arguments).
+"""
+import threading
+import time
+
+NO_JOB = '/'
+
+
+class FakeSystemdError(Exception):
+    pass
+
+
+class FakeSystemd(object):
+    def __init__(self, unit_files=None, call_ms=0.0, reload_ms=0.0, job_ms=0.0, failing_units=(),
+                 startup_ms=None):
+        """
+        unit_files: unit name -> unit file state, other units are unknown until they are enabled,
+                    disabled or masked
+        failing_units: units which are 'failed' after their start job
+        """
+        self.unit_files = dict(unit_files or {})
+        self.active_states = {}
+        self.call_ms = call_ms
+        self.reload_ms = reload_ms
+        self.job_ms = job_ms
+        self.failing_units = set(failing_units)
+        self.calls = []
+        self.jobs = {}
+        self.next_job_id = 1
+        self.lock = threading.Lock()
+        self.signal_handlers = {}
+        self.system_state = 'running'
+        self.startup_timer = None
+        if startup_ms is not None:
+            self.system_state = 'starting'
+            self.startup_timer = threading.Timer(startup_ms / 1000.0, self.finish_startup)
+            self.startup_timer.daemon = True
+            self.startup_timer.start()
+
+    def _call(self, method, *args):
+        with self.lock:
+            self.calls.append((method, args))
+        if self.call_ms:
+            time.sleep(self.call_ms / 1000.0)
+
+    def _finish_jobs(self):
+        now = time.time()
+        for unit, (path, job_type, done_at) in list(self.jobs.items()):
+            if done_at > now:
+                continue
+            del self.jobs[unit]
+            if job_type == 'stop':
+                self.active_states[unit] = 'inactive'
+            else:
+                self.active_states[unit] = 'failed' if unit in self.failing_units else 'active'
+
+    def finish_startup(self):
+        """ Ends the startup of systemd and emits StartupFinished """
+        with self.lock:
+            self.system_state = 'running'
+            handlers = list(self.signal_handlers.get('StartupFinished', []))
+        for handler in handlers:
+            handler(0, 0, 0, 0, 0, 0)
+
+    def count(self, method):
+        return sum(1 for name, _ in self.calls if name == method)
+
+    def unit_file_state(self, unit):
+        return self.unit_files.get(unit)
+
+    # org.freedesktop.DBus.Properties and dbus.Interface methods
+
+    def Get(self, interface, prop):
+        self._call('Get', interface, prop)
+        if prop != 'SystemState':
+            raise FakeSystemdError('Unknown property {}'.format(prop))
+        return self.system_state
+
+    def connect_to_signal(self, signal, handler):
+        with self.lock:
+            self.signal_handlers.setdefault(signal, []).append(handler)
+
+    # org.freedesktop.systemd1.Manager methods
+
+    def Subscribe(self):
+        self._call('Subscribe')
+
+    def ListUnitFiles(self):
+        self._call('ListUnitFiles')
+        # like systemd, enabled instances of template units are not listed
+        return [('/lib/systemd/system/' + unit, state) for unit, state in self.unit_files.items()
+                if '@' not in unit or state == 'masked']
+
+    def GetUnitFileState(self, unit):
+        self._call('GetUnitFileState', unit)
+        if unit not in self.unit_files:
+            raise FakeSystemdError('Unit file {} does not exist.'.format(unit))
+        return self.unit_files[unit]
+
+    def UnmaskUnitFiles(self, units, runtime):
+        self._call('UnmaskUnitFiles', list(units), runtime)
+        for unit in units:
+            if self.unit_file_state(unit) == 'masked':
+                self.unit_files[unit] = 'disabled'
+        return []
+
+    def EnableUnitFiles(self, units, runtime, force):
+        self._call('EnableUnitFiles', list(units), runtime, force)
+        masked = [unit for unit in units if self.unit_file_state(unit) == 'masked']
+        if masked:
+            raise FakeSystemdError('Unit file {} is masked.'.format(masked[0]))
+        for unit in units:
+            self.unit_files[unit] = 'enabled'
+        return True, []
+
+    def DisableUnitFiles(self, units, runtime):
+        self._call('DisableUnitFiles', list(units), runtime)
+        for unit in units:
+            if self.unit_file_state(unit) != 'masked':
+                self.unit_files[unit] = 'disabled'
+        return []
+
+    def MaskUnitFiles(self, units, runtime, force):
+        self._call('MaskUnitFiles', list(units), runtime, force)
+        for unit in units:
+            self.unit_files[unit] = 'masked'
+        return []
+
+    def Reload(self):
+        self._call('Reload')
+        if self.reload_ms:
+            time.sleep(self.reload_ms / 1000.0)
+
+    def _queue_job(self, method, job_type, unit, mode):
+        self._call(method, unit, mode)
+        if job_type == 'start' and self.unit_file_state(unit) == 'masked':
+            raise FakeSystemdError('Unit {} is masked.'.format(unit))
+        with self.lock:
+            path = '/org/freedesktop/systemd1/job/{}'.format(self.next_job_id)
+            self.next_job_id += 1
+            self.jobs[unit] = (path, job_type, time.time() + self.job_ms / 1000.0)
+        return path
+
+    def StartUnit(self, unit, mode):
+        return self._queue_job('StartUnit', 'start', unit, mode)
+
+    def StopUnit(self, unit, mode):
+        return self._queue_job('StopUnit', 'stop', unit, mode)
+
+    def ListUnitsByNames(self, units):
+        self._call('ListUnitsByNames', list(units))
+        with self.lock:
+            self._finish_jobs()
+            infos = []
+            for unit in units:
+                path, job_type, _ = self.jobs.get(unit, (NO_JOB, '', 0))
+                infos.append((unit, '', 'loaded', self.active_states.get(unit, 'inactive'), '', '',
+                              '/org/freedesktop/systemd1/unit/' + unit, 0, job_type, path))
+            return infos
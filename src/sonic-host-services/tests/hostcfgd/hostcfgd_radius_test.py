@@ -1,3 +1,4 @@
+import copy
 import importlib.machinery
 import importlib.util
 import filecmp
@@ -5,6 +6,7 @@ import shutil
 import os
 import sys
 import subprocess
+import time
 from swsscommon import swsscommon
 
 from parameterized import parameterized
@@ -101,3 +103,54 @@ class TestHostcfgdRADIUS(TestCase):
             diff_output += self.run_diff( dcmp.left + "/" + name,\
                 dcmp.right + "/" + name)
         self.assertTrue(len(diff_output) == 0, diff_output)
+
+    def test_hostcfgd_radius_src_intf_update(self):
+        """
+            Test that interface updates re-render the RADIUS config once and
+            only write changed files
+        """
+        test_name, test_data = HOSTCFGD_TEST_RADIUS_VECTOR[0]
+        op_path = output_path + "/" + test_name + "_src_intf"
+        sop_path = sample_output_path + "/" + test_name
+
+        hostcfgd.PAM_AUTH_CONF_TEMPLATE = templates_path + "/common-auth-sonic.j2"
+        hostcfgd.NSS_TACPLUS_CONF_TEMPLATE = templates_path + "/tacplus_nss.conf.j2"
+        hostcfgd.NSS_RADIUS_CONF_TEMPLATE = templates_path + "/radius_nss.conf.j2"
+        hostcfgd.PAM_RADIUS_AUTH_CONF_TEMPLATE = templates_path + "/pam_radius_auth.conf.j2"
+        hostcfgd.PAM_AUTH_CONF = op_path + "/common-auth-sonic"
+        hostcfgd.NSS_TACPLUS_CONF = op_path + "/tacplus_nss.conf"
+        hostcfgd.NSS_RADIUS_CONF = op_path + "/radius_nss.conf"
+        hostcfgd.NSS_CONF = op_path + "/nsswitch.conf"
+        hostcfgd.ETC_PAMD_SSHD = op_path + "/sshd"
+        hostcfgd.ETC_PAMD_LOGIN = op_path + "/login"
+        hostcfgd.RADIUS_PAM_AUTH_CONF_DIR = op_path + "/"
+
+        shutil.rmtree(op_path, ignore_errors=True)
+        os.mkdir(op_path)
+        shutil.copyfile(sop_path + "/sshd.old", op_path + "/sshd")
+        shutil.copyfile(sop_path + "/login.old", op_path + "/login")
+
+        MockConfigDb.set_config_db(test_data["config_db"])
+        host_config_daemon = hostcfgd.HostConfigDaemon()
+        radius_server = copy.deepcopy(test_data["config_db"]["RADIUS_SERVER"])
+        radius_server["10.10.10.1"]["src_intf"] = "Ethernet8"
+        host_config_daemon.aaacfg.load(test_data["config_db"]["AAA"], [], [],
+                                       test_data["config_db"]["RADIUS"], radius_server)
+        self.assertEqual(host_config_daemon.aaacfg.render_count, 1)
+        radius_nss_mtime = os.stat(hostcfgd.NSS_RADIUS_CONF).st_mtime_ns
+
+        with mock.patch.object(hostcfgd.AaaCfg, 'CONF_UPDATE_DELAY_SECS', 0.05):
+            # interfaces which are not a source interface do not trigger rendering
+            for i in range(100):
+                host_config_daemon.phy_intf_handler("Ethernet%d|10.0.%d.1/31" % (i * 4 + 12, i), "SET", {})
+            host_config_daemon.phy_intf_handler("Ethernet8|10.1.0.1/31", "SET", {})
+            host_config_daemon.phy_intf_handler("Ethernet8|fc00::1/126", "SET", {})
+            # the same address again is not a change
+            host_config_daemon.phy_intf_handler("Ethernet8|10.1.0.1/31", "SET", {})
+            time.sleep(0.3)
+
+        self.assertEqual(host_config_daemon.aaacfg.render_count, 2)
+        with open(op_path + "/10.10.10.1_1645.conf") as f:
+            self.assertIn("10.1.0.1", f.read())
+        # unchanged files are not rewritten
+        self.assertEqual(os.stat(hostcfgd.NSS_RADIUS_CONF).st_mtime_ns, radius_nss_mtime)
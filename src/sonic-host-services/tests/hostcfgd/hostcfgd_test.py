@@ -1,5 +1,9 @@
+import copy
 import os
+import shutil
 import sys
+import tempfile
+import time
 import swsscommon as swsscommon_package
 from swsscommon import swsscommon
 
@@ -7,6 +11,7 @@ from parameterized import parameterized
 from sonic_py_common.general import load_module_from_source
 from unittest import TestCase, mock
 
+from .fake_systemd import FakeSystemd
 from .test_vectors import HOSTCFGD_TEST_VECTOR, HOSTCFG_DAEMON_CFG_DB
 from tests.common.mock_configdb import MockConfigDb, MockDBConnector
 
@@ -76,6 +81,19 @@ class TestFeatureHandler(TestCase):
                 status = systemd_config_file.read().strip()
             assert status == '[Service]\nRestart={}'.format(truth_table[auto_restart_status])
 
+    def checks_systemd_units(self, fake_systemd, config_data):
+        """Checks unit file states of feature units and the units started by the fake systemd.
+
+        Args:
+            fake_systemd: The `FakeSystemd` used by the `FeatureHandler`.
+            config_data: A dictionary contains the expected unit file states and started units.
+        """
+        assert fake_systemd.unit_files == config_data['expected_unit_files']
+        started_units = [method_args[0] for method, method_args in fake_systemd.calls if method == 'StartUnit']
+        assert sorted(started_units) == sorted(config_data['expected_started_units'])
+        for unit in started_units:
+            assert fake_systemd.active_states[unit] == 'active'
+
     def get_state_db_set_calls(self, feature_table):
         """Returns a Mock call objects which recorded the `set` calls to `FEATURE` table in `STATE_DB`.
 
@@ -118,32 +136,31 @@ class TestFeatureHandler(TestCase):
 
         MockConfigDb.set_config_db(config_data['config_db'])
         feature_state_table_mock = mock.Mock()
-        with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
-            popen_mock = mock.Mock()
-            attrs = config_data['popen_attributes']
-            popen_mock.configure_mock(**attrs)
-            mocked_subprocess.Popen.return_value = popen_mock
+        fake_systemd = FakeSystemd(config_data['unit_files'])
 
-            device_config = {}
-            device_config['DEVICE_METADATA'] = MockConfigDb.CONFIG_DB['DEVICE_METADATA']
-            feature_handler = hostcfgd.FeatureHandler(MockConfigDb(), feature_state_table_mock, device_config)
+        device_config = {}
+        device_config['DEVICE_METADATA'] = MockConfigDb.CONFIG_DB['DEVICE_METADATA']
+        feature_handler = hostcfgd.FeatureHandler(MockConfigDb(), feature_state_table_mock, device_config,
+                                                  hostcfgd.SystemdManager(fake_systemd))
 
-            feature_table = MockConfigDb.CONFIG_DB['FEATURE']
-            feature_handler.sync_state_field(feature_table)
+        feature_table = MockConfigDb.CONFIG_DB['FEATURE']
+        feature_handler.sync_state_field(feature_table)
 
-            is_any_difference = self.checks_config_table(MockConfigDb.get_config_db()['FEATURE'],
-                                                         config_data['expected_config_db']['FEATURE'])
-            assert is_any_difference, "'FEATURE' table in 'CONFIG_DB' is modified unexpectedly!"
+        is_any_difference = self.checks_config_table(MockConfigDb.get_config_db()['FEATURE'],
+                                                     config_data['expected_config_db']['FEATURE'])
+        assert is_any_difference, "'FEATURE' table in 'CONFIG_DB' is modified unexpectedly!"
 
-            feature_table_state_db_calls = self.get_state_db_set_calls(feature_table)
+        feature_table_state_db_calls = self.get_state_db_set_calls(feature_table)
 
-            self.checks_systemd_config_file(config_data['config_db']['FEATURE'])
-            mocked_subprocess.check_call.assert_has_calls(config_data['enable_feature_subprocess_calls'],
-                                                          any_order=True)
-            mocked_subprocess.check_call.assert_has_calls(config_data['daemon_reload_subprocess_call'],
-                                                          any_order=True)
-            feature_state_table_mock.set.assert_has_calls(feature_table_state_db_calls)
-            self.checks_systemd_config_file(config_data['config_db']['FEATURE'])
+        self.checks_systemd_config_file(config_data['config_db']['FEATURE'])
+        self.checks_systemd_units(fake_systemd, config_data)
+        # All features are applied with one batch of systemd calls
+        assert fake_systemd.count('ListUnitFiles') == 1
+        assert fake_systemd.count('Reload') == 1
+        for method in ['UnmaskUnitFiles', 'EnableUnitFiles', 'DisableUnitFiles', 'MaskUnitFiles']:
+            assert fake_systemd.count(method) <= 1
+        feature_state_table_mock.set.assert_has_calls(feature_table_state_db_calls)
+        self.checks_systemd_config_file(config_data['config_db']['FEATURE'])
 
     @parameterized.expand(HOSTCFGD_TEST_VECTOR)
     @patchfs
@@ -163,26 +180,89 @@ class TestFeatureHandler(TestCase):
 
         MockConfigDb.set_config_db(config_data['config_db'])
         feature_state_table_mock = mock.Mock()
-        with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
-            popen_mock = mock.Mock()
-            attrs = config_data['popen_attributes']
-            popen_mock.configure_mock(**attrs)
-            mocked_subprocess.Popen.return_value = popen_mock
+        fake_systemd = FakeSystemd(config_data['unit_files'])
 
-            device_config = {}
-            device_config['DEVICE_METADATA'] = MockConfigDb.CONFIG_DB['DEVICE_METADATA']
-            feature_handler = hostcfgd.FeatureHandler(MockConfigDb(), feature_state_table_mock, device_config)
+        device_config = {}
+        device_config['DEVICE_METADATA'] = MockConfigDb.CONFIG_DB['DEVICE_METADATA']
+        feature_handler = hostcfgd.FeatureHandler(MockConfigDb(), feature_state_table_mock, device_config,
+                                                  hostcfgd.SystemdManager(fake_systemd))
 
-            feature_table = MockConfigDb.CONFIG_DB['FEATURE']
+        feature_table = MockConfigDb.CONFIG_DB['FEATURE']
 
-            for feature_name, feature_config in feature_table.items():
-                feature_handler.handler(feature_name, 'SET', feature_config)
+        for feature_name, feature_config in feature_table.items():
+            feature_handler.handler(feature_name, 'SET', feature_config)
 
-            self.checks_systemd_config_file(config_data['config_db']['FEATURE'])
-            mocked_subprocess.check_call.assert_has_calls(config_data['enable_feature_subprocess_calls'],
-                                                          any_order=True)
-            mocked_subprocess.check_call.assert_has_calls(config_data['daemon_reload_subprocess_call'],
-                                                          any_order=True)
+        self.checks_systemd_config_file(config_data['config_db']['FEATURE'])
+        self.checks_systemd_units(fake_systemd, config_data)
+
+    @patchfs
+    def test_multi_asic_feature_batch(self, fs):
+        fs.create_dir(hostcfgd.FeatureHandler.SYSTEMD_SYSTEM_DIR)
+        feature_state_table_mock = mock.Mock()
+        fake_systemd = FakeSystemd({'swss@.service': 'enabled', 'swss@1.service': 'masked',
+                                    'bgp@.service': 'enabled', 'bgp@2.service': 'enabled'},
+                                   failing_units=['bgp@0.service'])
+        feature_table = {
+            'swss': {'state': 'enabled', 'auto_restart': 'enabled', 'has_timer': 'False',
+                     'has_global_scope': 'False', 'has_per_asic_scope': 'True'},
+            'bgp': {'state': 'enabled', 'auto_restart': 'enabled', 'has_timer': 'False',
+                    'has_global_scope': 'False', 'has_per_asic_scope': 'True'},
+        }
+        MockConfigDb.set_config_db({'FEATURE': copy.deepcopy(feature_table)})
+        with mock.patch('hostcfgd.device_info.is_multi_npu', return_value=True), \
+                mock.patch('hostcfgd.device_info.get_num_npus', return_value=3):
+            feature_handler = hostcfgd.FeatureHandler(MockConfigDb(), feature_state_table_mock, {},
+                                                      hostcfgd.SystemdManager(fake_systemd))
+            feature_handler.sync_state_field(feature_table)
+
+        # Enabled instances of template units are not listed by ListUnitFiles
+        assert fake_systemd.count('ListUnitFiles') == 1
+        assert fake_systemd.count('GetUnitFileState') == 5
+        enable_calls = [method_args for method, method_args in fake_systemd.calls if method == 'EnableUnitFiles']
+        assert enable_calls == [(['swss@0.service', 'swss@1.service', 'swss@2.service', 'bgp@0.service',
+                                  'bgp@1.service'], False, False)]
+        assert fake_systemd.count('Reload') == 1
+        assert fake_systemd.active_states == {'swss@0.service': 'active', 'swss@1.service': 'active',
+                                              'swss@2.service': 'active', 'bgp@0.service': 'failed',
+                                              'bgp@1.service': 'active'}
+        feature_state_table_mock.set.assert_has_calls([mock.call('swss', [('state', 'enabled')]),
+                                                       mock.call('bgp', [('state', 'failed')])])
+
+    @patchfs
+    def test_feature_deferred_until_startup_finished(self, fs):
+        fs.create_dir(hostcfgd.FeatureHandler.SYSTEMD_SYSTEM_DIR)
+        MockConfigDb.set_config_db(copy.deepcopy(HOSTCFG_DAEMON_CFG_DB))
+        feature_state_table_mock = mock.Mock()
+        fake_systemd = FakeSystemd()
+        fake_systemd.system_state = 'starting'
+        device_config = {'DEVICE_METADATA': MockConfigDb.CONFIG_DB['DEVICE_METADATA']}
+        feature_handler = hostcfgd.FeatureHandler(MockConfigDb(), feature_state_table_mock, device_config,
+                                                  hostcfgd.SystemdManager(fake_systemd))
+        feature_handler.defer_until_systemd_ready()
+
+        feature_table = MockConfigDb.CONFIG_DB['FEATURE']
+        feature_handler.sync_state_field(feature_table)
+        telemetry_config = dict(feature_table['telemetry'], state='disabled')
+        feature_handler.handler('telemetry', 'SET', telemetry_config)
+        # The FEATURE table is synced, but no unit is touched until systemd finished starting up
+        assert feature_table['dhcp_relay']['state'] == 'enabled'
+        assert fake_systemd.calls == [('Subscribe', ()), ('Get', ('org.freedesktop.systemd1.Manager', 'SystemState'))]
+        feature_state_table_mock.set.assert_not_called()
+
+        fake_systemd.finish_startup()
+        deadline = time.time() + 5
+        while feature_state_table_mock.set.call_count < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        # Deferred updates are applied in one batch with the last config of every feature
+        assert fake_systemd.count('EnableUnitFiles') == 1
+        assert fake_systemd.count('MaskUnitFiles') == 1
+        assert fake_systemd.count('Reload') == 1
+        assert fake_systemd.unit_files == {'dhcp_relay.service': 'enabled', 'mux.service': 'enabled',
+                                           'telemetry.timer': 'masked'}
+        feature_state_table_mock.set.assert_has_calls([mock.call('dhcp_relay', [('state', 'enabled')]),
+                                                       mock.call('mux', [('state', 'enabled')]),
+                                                       mock.call('telemetry', [('state', 'disabled')])],
+                                                      any_order=True)
 
     def test_feature_config_parsing(self):
         swss_feature = hostcfgd.Feature('swss', {
@@ -217,51 +297,112 @@ class TesNtpCfgd(TestCase):
     """
         Test hostcfd daemon - NtpCfgd
     """
+    NTP_CONF = b'server 0.debian.pool.ntp.org iburst\n'
+
     def setUp(self):
         MockConfigDb.CONFIG_DB['NTP'] = {'global': {'vrf': 'mgmt', 'src_intf': 'eth0'}}
         MockConfigDb.CONFIG_DB['NTP_SERVER'] = {'0.debian.pool.ntp.org': {}}
+        self.conf_dir = tempfile.mkdtemp()
+        self.conf_file_patcher = mock.patch.object(hostcfgd.NtpCfg, 'NTP_CONF_FILE',
+                                                   os.path.join(self.conf_dir, 'ntp.conf'))
+        self.conf_file_patcher.start()
 
     def tearDown(self):
         MockConfigDb.CONFIG_DB = {}
+        self.conf_file_patcher.stop()
+        shutil.rmtree(self.conf_dir)
+
+    def mock_subprocess(self, mocked_subprocess):
+        popen_mock = mock.Mock()
+        attrs = {'communicate.return_value': ('output', 'error')}
+        popen_mock.configure_mock(**attrs)
+        mocked_subprocess.Popen.return_value = popen_mock
+        mocked_subprocess.check_output.return_value = self.NTP_CONF
 
     def test_ntp_global_update_with_no_servers(self):
         with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
-            popen_mock = mock.Mock()
-            attrs = {'communicate.return_value': ('output', 'error')}
-            popen_mock.configure_mock(**attrs)
-            mocked_subprocess.Popen.return_value = popen_mock
+            self.mock_subprocess(mocked_subprocess)
 
             ntpcfgd = hostcfgd.NtpCfg()
             ntpcfgd.ntp_global_update('global', MockConfigDb.CONFIG_DB['NTP']['global'])
+            ntpcfgd.update_ntp_config()
 
             mocked_subprocess.check_call.assert_not_called()
 
     def test_ntp_global_update_ntp_servers(self):
         with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
-            popen_mock = mock.Mock()
-            attrs = {'communicate.return_value': ('output', 'error')}
-            popen_mock.configure_mock(**attrs)
-            mocked_subprocess.Popen.return_value = popen_mock
+            self.mock_subprocess(mocked_subprocess)
 
             ntpcfgd = hostcfgd.NtpCfg()
             ntpcfgd.ntp_global_update('global', MockConfigDb.CONFIG_DB['NTP']['global'])
             ntpcfgd.ntp_server_update('0.debian.pool.ntp.org', 'SET')
+            # Nothing is restarted until the pending changes are applied
+            mocked_subprocess.check_call.assert_not_called()
+            ntpcfgd.update_ntp_config()
             mocked_subprocess.check_call.assert_has_calls([call('systemctl restart ntp-config', shell=True)])
 
     def test_loopback_update(self):
         with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
-            popen_mock = mock.Mock()
-            attrs = {'communicate.return_value': ('output', 'error')}
-            popen_mock.configure_mock(**attrs)
-            mocked_subprocess.Popen.return_value = popen_mock
+            self.mock_subprocess(mocked_subprocess)
 
             ntpcfgd = hostcfgd.NtpCfg()
             ntpcfgd.ntp_global = MockConfigDb.CONFIG_DB['NTP']['global']
             ntpcfgd.ntp_servers.add('0.debian.pool.ntp.org')
 
             ntpcfgd.handle_ntp_source_intf_chg('eth0')
+            ntpcfgd.update_ntp_config()
             mocked_subprocess.check_call.assert_has_calls([call('systemctl restart ntp-config', shell=True)])
 
+    def test_ntp_restarts_coalesced(self):
+        with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
+            self.mock_subprocess(mocked_subprocess)
+
+            ntpcfgd = hostcfgd.NtpCfg()
+            for idx in range(8):
+                ntpcfgd.ntp_server_update('{}.debian.pool.ntp.org'.format(idx), 'SET')
+            ntpcfgd.handle_ntp_source_intf_chg('Loopback0')
+            ntpcfgd.update_ntp_config()
+            mocked_subprocess.check_call.assert_called_once_with('systemctl restart ntp-config', shell=True)
+            assert ntpcfgd.restart_count == 1
+            assert ntpcfgd.restarts_avoided == 7
+
+            # ntp-config is not restarted if the rendered ntp.conf is unchanged
+            mocked_subprocess.check_call.reset_mock()
+            with open(hostcfgd.NtpCfg.NTP_CONF_FILE, 'wb') as f:
+                f.write(self.NTP_CONF)
+            ntpcfgd.load(MockConfigDb.CONFIG_DB['NTP'], MockConfigDb.CONFIG_DB['NTP_SERVER'])
+            ntpcfgd.update_ntp_config()
+            mocked_subprocess.check_call.assert_not_called()
+            assert ntpcfgd.restart_count == 1
+            assert ntpcfgd.restarts_avoided == 8
+
+            # an address change of the source interface does not change ntp.conf,
+            # ntp-config is restarted anyway for ntpd to use the new address
+            ntpcfgd.handle_ntp_source_intf_chg('eth0')
+            ntpcfgd.update_ntp_config()
+            mocked_subprocess.check_call.assert_called_once_with('systemctl restart ntp-config', shell=True)
+            assert ntpcfgd.restart_count == 2
+
+            # the vrf is not part of ntp.conf, ntp is restarted
+            mocked_subprocess.check_call.reset_mock()
+            ntpcfgd.ntp_global_update('global', {'vrf': 'default', 'src_intf': 'eth0'})
+            ntpcfgd.update_ntp_config()
+            mocked_subprocess.check_call.assert_called_once_with('service ntp restart', shell=True)
+
+    def test_ntp_update_timer(self):
+        with mock.patch('hostcfgd.subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd.NtpCfg, 'CONF_UPDATE_DELAY_SECS', 0.05):
+            self.mock_subprocess(mocked_subprocess)
+
+            ntpcfgd = hostcfgd.NtpCfg()
+            ntpcfgd.ntp_server_update('0.debian.pool.ntp.org', 'SET')
+            ntpcfgd.ntp_server_update('1.debian.pool.ntp.org', 'SET')
+            deadline = time.time() + 5
+            while ntpcfgd.restart_count == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            mocked_subprocess.check_call.assert_called_once_with('systemctl restart ntp-config', shell=True)
+            assert ntpcfgd.update_timer is None
+
 
 class TestHostcfgdDaemon(TestCase):
 
@@ -278,6 +419,8 @@ class TestHostcfgdDaemon(TestCase):
                                 ('FEATURE', 'mux'),
                                 ('FEATURE', 'telemetry')]
         daemon = hostcfgd.HostConfigDaemon()
+        fake_systemd = FakeSystemd()
+        daemon.feature_handler._systemd = hostcfgd.SystemdManager(fake_systemd)
         daemon.register_callbacks()
         with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
             popen_mock = mock.Mock()
@@ -288,35 +431,44 @@ class TestHostcfgdDaemon(TestCase):
                 daemon.start()
             except TimeoutError:
                 pass
-            expected = [call('sudo systemctl daemon-reload', shell=True),
-                        call('sudo systemctl unmask dhcp_relay.service', shell=True),
-                        call('sudo systemctl enable dhcp_relay.service', shell=True),
-                        call('sudo systemctl start dhcp_relay.service', shell=True),
-                        call('sudo systemctl daemon-reload', shell=True),
-                        call('sudo systemctl unmask mux.service', shell=True),
-                        call('sudo systemctl enable mux.service', shell=True),
-                        call('sudo systemctl start mux.service', shell=True),
-                        call('sudo systemctl daemon-reload', shell=True),
-                        call('sudo systemctl unmask telemetry.service', shell=True),
-                        call('sudo systemctl unmask telemetry.timer', shell=True),
-                        call('sudo systemctl enable telemetry.timer', shell=True),
-                        call('sudo systemctl start telemetry.timer', shell=True)]
-            mocked_subprocess.check_call.assert_has_calls(expected)
+            assert fake_systemd.unit_files == {'dhcp_relay.service': 'enabled',
+                                               'mux.service': 'enabled',
+                                               'telemetry.timer': 'enabled'}
+            expected = [('UnmaskUnitFiles', (['dhcp_relay.service'], False)),
+                        ('EnableUnitFiles', (['dhcp_relay.service'], False, False)),
+                        ('Reload', ()),
+                        ('StartUnit', ('dhcp_relay.service', 'replace')),
+                        ('UnmaskUnitFiles', (['mux.service'], False)),
+                        ('EnableUnitFiles', (['mux.service'], False, False)),
+                        ('Reload', ()),
+                        ('StartUnit', ('mux.service', 'replace')),
+                        ('UnmaskUnitFiles', (['telemetry.service', 'telemetry.timer'], False)),
+                        ('EnableUnitFiles', (['telemetry.timer'], False, False)),
+                        ('Reload', ()),
+                        ('StartUnit', ('telemetry.timer', 'replace'))]
+            assert self.unit_calls(fake_systemd) == expected
 
             # Change the state to disabled
+            del fake_systemd.calls[:]
             MockConfigDb.CONFIG_DB['FEATURE']['telemetry']['state'] = 'disabled'
             MockConfigDb.event_queue = [('FEATURE', 'telemetry')]
             try:
                 daemon.start()
             except TimeoutError:
                 pass
-            expected = [call('sudo systemctl stop telemetry.timer', shell=True),
-                        call('sudo systemctl disable telemetry.timer', shell=True),
-                        call('sudo systemctl mask telemetry.timer', shell=True),
-                        call('sudo systemctl stop telemetry.service', shell=True),
-                        call('sudo systemctl disable telemetry.timer', shell=True),
-                        call('sudo systemctl mask telemetry.timer', shell=True)]
-            mocked_subprocess.check_call.assert_has_calls(expected)
+            expected = [('StopUnit', ('telemetry.timer', 'replace')),
+                        ('StopUnit', ('telemetry.service', 'replace')),
+                        ('DisableUnitFiles', (['telemetry.timer'], False)),
+                        ('MaskUnitFiles', (['telemetry.timer'], False, False)),
+                        ('Reload', ())]
+            assert self.unit_calls(fake_systemd) == expected
+            assert fake_systemd.unit_files['telemetry.timer'] == 'masked'
+            assert fake_systemd.active_states['telemetry.timer'] == 'inactive'
+
+    def unit_calls(self, fake_systemd):
+        """ Returns the calls of the fake systemd, which change units """
+        return [(method, method_args) for method, method_args in fake_systemd.calls
+                if method not in ('Subscribe', 'Get', 'ListUnitFiles', 'GetUnitFileState', 'ListUnitsByNames')]
 
     def test_loopback_events(self):
         MockConfigDb.set_config_db(HOSTCFG_DAEMON_CFG_DB)
@@ -327,17 +479,26 @@ class TestHostcfgdDaemon(TestCase):
         daemon.register_callbacks()
         with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
             popen_mock = mock.Mock()
-            attrs = {'communicate.return_value': ('output', 'error')}
+            attrs = {'communicate.return_value': ('', ''), 'returncode': 0}
             popen_mock.configure_mock(**attrs)
             mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.check_output.return_value = b''
             try:
                 daemon.start()
             except TimeoutError:
                 pass
-            expected = [call('systemctl restart ntp-config', shell=True),
-            call('iptables -t mangle --append PREROUTING -p tcp --tcp-flags SYN SYN -d 10.184.8.233 -j TCPMSS --set-mss 1460', shell=True),
-            call('iptables -t mangle --append POSTROUTING -p tcp --tcp-flags SYN SYN -s 10.184.8.233 -j TCPMSS --set-mss 1460', shell=True)]
+            with mock.patch.object(hostcfgd.NtpCfg, 'NTP_CONF_FILE', '/nonexistent/ntp.conf'):
+                daemon.ntpcfg.update_ntp_config()
+            expected = [call('systemctl restart ntp-config', shell=True)]
             mocked_subprocess.check_call.assert_has_calls(expected, any_order=True)
+            mocked_subprocess.Popen.assert_any_call('iptables-restore --noflush', shell=True,
+                                                    universal_newlines=True, stdin=mocked_subprocess.PIPE,
+                                                    stdout=mocked_subprocess.PIPE, stderr=mocked_subprocess.PIPE)
+            popen_mock.communicate.assert_any_call(input=(
+                '*mangle\n'
+                '-A PREROUTING -d 10.184.8.233/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+                '-A POSTROUTING -s 10.184.8.233/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+                'COMMIT\n'))
 
     def test_kdump_event(self):
         MockConfigDb.set_config_db(HOSTCFG_DAEMON_CFG_DB)
@@ -357,3 +518,113 @@ class TestHostcfgdDaemon(TestCase):
                         call('sonic-kdump-config --num_dumps 3', shell=True),
                         call('sonic-kdump-config --memory 0M-2G:256M,2G-4G:320M,4G-8G:384M,8G-:448M', shell=True)]
             mocked_subprocess.check_call.assert_has_calls(expected, any_order=True)
+
+
+class TestIptables(TestCase):
+    """Test TCPMSS mangle rules of loopback addresses programmed by `Iptables`.
+    """
+    MANGLE_TABLES = {
+        'iptables-save -t mangle': '\n'.join([
+            '*mangle',
+            ':PREROUTING ACCEPT [0:0]',
+            ':POSTROUTING ACCEPT [0:0]',
+            '-A PREROUTING -d 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460',
+            '-A PREROUTING -d 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460',
+            '-A PREROUTING -d 10.1.0.9/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460',
+            '-A PREROUTING -d 10.2.0.0/16 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1400',
+            '-A POSTROUTING -s 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460',
+            'COMMIT', '']),
+        'ip6tables-save -t mangle': '\n'.join([
+            '*mangle',
+            '-A PREROUTING -d fc00:1::32/128 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1440',
+            '-A POSTROUTING -s fc00:1::32/128 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1440',
+            'COMMIT', '']),
+    }
+
+    def run_iptables(self, restore_returncodes=()):
+        """ Returns a mock of subprocess, which prints MANGLE_TABLES for iptables-save and records
+        commands and restore input in `commands` """
+        mocked_subprocess = mock.Mock()
+        commands = []
+        returncodes = list(restore_returncodes)
+
+        def popen(cmd, **kwargs):
+            proc = mock.Mock()
+            if 'restore' in cmd:
+                proc.returncode = returncodes.pop(0) if returncodes else 0
+                proc.communicate.side_effect = lambda input: commands.append((cmd, input)) or ('', '')
+            else:
+                commands.append((cmd, None))
+                proc.returncode = 0
+                proc.communicate.return_value = (self.MANGLE_TABLES[cmd], '')
+            return proc
+
+        mocked_subprocess.Popen.side_effect = popen
+        return mocked_subprocess, commands
+
+    def lpbk_table(self):
+        return {('Loopback0', '10.1.0.1/32'): {}, ('Loopback0', 'FC00:1::32/128'): {},
+                ('Loopback1', '10.1.0.2/32'): {}, 'Loopback0': {}}
+
+    def test_load(self):
+        iptables = hostcfgd.Iptables()
+        mocked_subprocess, commands = self.run_iptables()
+        with mock.patch('hostcfgd.subprocess', mocked_subprocess):
+            iptables.load(self.lpbk_table())
+        assert commands == [
+            ('iptables-save -t mangle', None),
+            ('iptables-restore --noflush',
+             '*mangle\n'
+             '-D PREROUTING -d 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+             '-D PREROUTING -d 10.1.0.9/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+             '-A PREROUTING -d 10.1.0.2/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+             '-A POSTROUTING -s 10.1.0.2/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+             'COMMIT\n'),
+            ('ip6tables-save -t mangle', None)]
+
+        # Loading the same table again does not change the mangle table
+        del commands[:]
+        with mock.patch('hostcfgd.subprocess', mocked_subprocess):
+            iptables.load(self.lpbk_table())
+        assert commands == []
+
+    def test_loopback_events(self):
+        iptables = hostcfgd.Iptables()
+        mocked_subprocess, commands = self.run_iptables()
+        with mock.patch('hostcfgd.subprocess', mocked_subprocess):
+            iptables.load(self.lpbk_table())
+            del commands[:]
+            iptables.iptables_handler(('Loopback1', '10.1.0.2/32'), {}, add=False)
+            iptables.iptables_handler(('Loopback1', '10.1.0.2/32'), {}, add=False)
+            iptables.iptables_handler(('Loopback2', 'fc00:1::33/128'), {}, add=True)
+            iptables.iptables_handler('Loopback2', {}, add=True)
+        assert commands == [
+            ('iptables-restore --noflush',
+             '*mangle\n'
+             '-D PREROUTING -d 10.1.0.2/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+             '-D POSTROUTING -s 10.1.0.2/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+             'COMMIT\n'),
+            ('ip6tables-restore --noflush',
+             '*mangle\n'
+             '-A PREROUTING -d fc00:1::33/128 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1440\n'
+             '-A POSTROUTING -s fc00:1::33/128 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1440\n'
+             'COMMIT\n')]
+
+    def test_restore_failure(self):
+        iptables = hostcfgd.Iptables()
+        iptables.loopback_ips['4'].add('10.1.0.1')
+        iptables.mangle_rules['4'] = []
+        mocked_subprocess, commands = self.run_iptables(restore_returncodes=[1])
+        with mock.patch('hostcfgd.subprocess', mocked_subprocess):
+            assert iptables.update_mangle_rules('4') == 2
+        # the failed restore is retried with the rules read with iptables-save
+        assert [cmd for cmd, _ in commands] == ['iptables-restore --noflush', 'iptables-save -t mangle',
+                                                'iptables-restore --noflush']
+        assert commands[-1][1] == (
+            '*mangle\n'
+            '-D PREROUTING -d 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+            '-D PREROUTING -d 10.1.0.9/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460\n'
+            'COMMIT\n')
+        assert iptables.mangle_rules['4'] == [
+            '-A PREROUTING -d 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460',
+            '-A POSTROUTING -s 10.1.0.1/32 -p tcp -m tcp --tcp-flags SYN SYN -j TCPMSS --set-mss 1460']
@@ -1,5 +1,3 @@
-from unittest.mock import call
-
 """
     hostcfgd test vector
 """
@@ -84,24 +82,17 @@ HOSTCFGD_TEST_VECTOR = [
                     },
                 },
             },
-            "enable_feature_subprocess_calls": [
-                call("sudo systemctl unmask dhcp_relay.service", shell=True),
-                call("sudo systemctl enable dhcp_relay.service", shell=True),
-                call("sudo systemctl start dhcp_relay.service", shell=True),
-                call("sudo systemctl unmask mux.service", shell=True),
-                call("sudo systemctl enable mux.service", shell=True),
-                call("sudo systemctl start mux.service", shell=True),
-                call("sudo systemctl unmask telemetry.service", shell=True),
-                call("sudo systemctl unmask telemetry.timer", shell=True),
-                call("sudo systemctl enable telemetry.timer", shell=True),
-                call("sudo systemctl start telemetry.timer", shell=True),
-            ],
-            "daemon_reload_subprocess_call": [
-                call("sudo systemctl daemon-reload", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error')
+            "unit_files": {},
+            "expected_unit_files": {
+                "dhcp_relay.service": "enabled",
+                "mux.service": "enabled",
+                "telemetry.timer": "enabled",
             },
+            "expected_started_units": [
+                "dhcp_relay.service",
+                "mux.service",
+                "telemetry.timer",
+            ],
         },
     ],
     [
@@ -201,24 +192,17 @@ HOSTCFGD_TEST_VECTOR = [
                     },
                 },
             },
-            "enable_feature_subprocess_calls": [
-                call("sudo systemctl stop mux.service", shell=True),
-                call("sudo systemctl disable mux.service", shell=True),
-                call("sudo systemctl mask mux.service", shell=True),
-                call("sudo systemctl unmask telemetry.service", shell=True),
-                call("sudo systemctl unmask telemetry.timer", shell=True),
-                call("sudo systemctl enable telemetry.timer", shell=True),
-                call("sudo systemctl start telemetry.timer", shell=True),
-                call("sudo systemctl unmask sflow.service", shell=True),
-                call("sudo systemctl enable sflow.service", shell=True),
-                call("sudo systemctl start sflow.service", shell=True),
-            ],
-            "daemon_reload_subprocess_call": [
-                call("sudo systemctl daemon-reload", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error')
+            "unit_files": {},
+            "expected_unit_files": {
+                "dhcp_relay.service": "masked",
+                "mux.service": "masked",
+                "telemetry.timer": "enabled",
+                "sflow.service": "enabled",
             },
+            "expected_started_units": [
+                "sflow.service",
+                "telemetry.timer",
+            ],
         },
     ],
     [
@@ -300,21 +284,15 @@ HOSTCFGD_TEST_VECTOR = [
                     },
                 },
             },
-            "enable_feature_subprocess_calls": [
-                call("sudo systemctl stop mux.service", shell=True),
-                call("sudo systemctl disable mux.service", shell=True),
-                call("sudo systemctl mask mux.service", shell=True),
-                call("sudo systemctl unmask telemetry.service", shell=True),
-                call("sudo systemctl unmask telemetry.timer", shell=True),
-                call("sudo systemctl enable telemetry.timer", shell=True),
-                call("sudo systemctl start telemetry.timer", shell=True),
-            ],
-            "daemon_reload_subprocess_call": [
-                call("sudo systemctl daemon-reload", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error')
+            "unit_files": {},
+            "expected_unit_files": {
+                "dhcp_relay.service": "masked",
+                "mux.service": "masked",
+                "telemetry.timer": "enabled",
             },
+            "expected_started_units": [
+                "telemetry.timer",
+            ],
         },
     ],
     [
@@ -396,24 +374,16 @@ HOSTCFGD_TEST_VECTOR = [
                     },
                 },
             },
-            "enable_feature_subprocess_calls": [
-                call("sudo systemctl unmask dhcp_relay.service", shell=True),
-                call("sudo systemctl enable dhcp_relay.service", shell=True),
-                call("sudo systemctl start dhcp_relay.service", shell=True),
-                call("sudo systemctl stop mux.service", shell=True),
-                call("sudo systemctl disable mux.service", shell=True),
-                call("sudo systemctl mask mux.service", shell=True),
-                call("sudo systemctl unmask telemetry.service", shell=True),
-                call("sudo systemctl unmask telemetry.timer", shell=True),
-                call("sudo systemctl enable telemetry.timer", shell=True),
-                call("sudo systemctl start telemetry.timer", shell=True),
-            ],
-            "daemon_reload_subprocess_call": [
-                call("sudo systemctl daemon-reload", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('output', 'error')
+            "unit_files": {},
+            "expected_unit_files": {
+                "dhcp_relay.service": "enabled",
+                "mux.service": "masked",
+                "telemetry.timer": "enabled",
             },
+            "expected_started_units": [
+                "dhcp_relay.service",
+                "telemetry.timer",
+            ],
         },
     ],
     [
@@ -496,13 +466,17 @@ HOSTCFGD_TEST_VECTOR = [
                     },
                 },
             },
-            "enable_feature_subprocess_calls": [],
-            "daemon_reload_subprocess_call": [
-                call("sudo systemctl daemon-reload", shell=True),
-            ],
-            "popen_attributes": {
-                'communicate.return_value': ('enabled', 'error')
+            "unit_files": {
+                "dhcp_relay.service": "enabled",
+                "mux.service": "enabled",
+                "telemetry.timer": "enabled",
+            },
+            "expected_unit_files": {
+                "dhcp_relay.service": "enabled",
+                "mux.service": "enabled",
+                "telemetry.timer": "enabled",
             },
+            "expected_started_units": [],
         }
     ]
 ]